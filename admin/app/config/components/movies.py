@@ -0,0 +1,5 @@
+from config.components.base import env
+
+# Список фильмов из материализованного представления film_work_read вместо
+# соединения таблиц; представление обновляет команда refresh_film_work_read
+MOVIES_READ_MODEL = env.bool("MOVIES_READ_MODEL", False)
@@ -26,4 +26,5 @@ include(
     "components/redis.py",
     "components/constance.py",
     "components/auth_service.py",
+    "components/movies.py",
 )
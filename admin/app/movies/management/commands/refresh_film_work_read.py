@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from movies.models import FilmWorkRead
+
+
+class Command(BaseCommand):
+    help = "Обновить материализованное представление film_work_read"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--blocking",
+            action="store_true",
+            help="обновить без CONCURRENTLY: быстрее, но блокирует чтение",
+        )
+
+    def handle(self, *args, **options):
+        # CONCURRENTLY не блокирует чтение списка на время обновления
+        concurrently = "" if options["blocking"] else " CONCURRENTLY"
+        table = connection.ops.quote_name(FilmWorkRead._meta.db_table)
+        started = time.perf_counter()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"REFRESH MATERIALIZED VIEW{concurrently} {table}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{FilmWorkRead._meta.db_table} обновлено "
+                f"за {time.perf_counter() - started:.1f}s"
+            )
+        )
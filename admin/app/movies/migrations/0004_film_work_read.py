@@ -0,0 +1,76 @@
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+def persons(role):
+    return f"""
+        ARRAY(
+            SELECT p.full_name
+            FROM "content.person_film_work" pfw
+            JOIN "content.person" p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id AND pfw.role = '{role}'
+            ORDER BY p.full_name
+        )"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0003_etl_indexes'),
+    ]
+
+    operations = [
+        # Уникальный индекс по id нужен для REFRESH MATERIALIZED VIEW CONCURRENTLY
+        migrations.RunSQL(
+            f"""
+            CREATE MATERIALIZED VIEW "content.film_work_read" AS
+            SELECT
+                fw.id,
+                fw.title,
+                fw.description,
+                fw.creation_date,
+                fw.rating,
+                fw.type,
+                fw.updated_at,
+                ARRAY(
+                    SELECT g.name
+                    FROM "content.genre_film_work" gfw
+                    JOIN "content.genre" g ON g.id = gfw.genre_id
+                    WHERE gfw.film_work_id = fw.id
+                    ORDER BY g.name
+                ) AS genres,
+                {persons('actor')} AS actors,
+                {persons('writer')} AS writers,
+                {persons('director')} AS directors
+            FROM "content.film_work" fw;
+
+            CREATE UNIQUE INDEX film_work_read_id_idx
+                ON "content.film_work_read" (id);
+            CREATE INDEX film_work_read_updated_id_idx
+                ON "content.film_work_read" (updated_at, id);
+            """,
+            """
+            DROP MATERIALIZED VIEW IF EXISTS "content.film_work_read";
+            """,
+        ),
+        migrations.CreateModel(
+            name='FilmWorkRead',
+            fields=[
+                ('id', models.UUIDField(primary_key=True, serialize=False)),
+                ('title', models.TextField()),
+                ('description', models.TextField()),
+                ('creation_date', models.DateField(null=True)),
+                ('rating', models.FloatField(null=True)),
+                ('type', models.TextField()),
+                ('updated_at', models.DateTimeField()),
+                ('genres', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), size=None)),
+                ('actors', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), size=None)),
+                ('writers', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), size=None)),
+                ('directors', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), size=None)),
+            ],
+            options={
+                'db_table': 'content.film_work_read',
+                'managed': False,
+            },
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.fields import ArrayField
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.utils.translation import gettext_lazy as _
@@ -54,11 +55,31 @@ class Genre(UUIDMixin, CreatedModifiedMixin):
         db_table = "content.genre"  # fmt: skip
         verbose_name = _("Genre")
         verbose_name_plural = _("Genres")
+        indexes = [
+            models.Index(fields=["updated_at", "id"], name="genre_updated_id_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
 
+class FilmWorkQuerySet(models.QuerySet):
+    def with_relations(self):
+        """Жанры и персоны всех фильмов выборки двумя запросами на страницу."""
+        return self.prefetch_related(
+            models.Prefetch(
+                "genrefilmwork_set",
+                queryset=GenreFilmwork.objects.select_related("genre"),
+                to_attr="genre_links",
+            ),
+            models.Prefetch(
+                "personfilmwork_set",
+                queryset=PersonFilmwork.objects.select_related("person"),
+                to_attr="person_links",
+            ),
+        )
+
+
 class FilmWork(UUIDMixin, CreatedModifiedMixin):
     class Type(models.TextChoices):
         MOVIE = "movie", _("movie")
@@ -83,10 +104,15 @@ class FilmWork(UUIDMixin, CreatedModifiedMixin):
         "Person", through="PersonFilmwork", related_name="film_works"
     )
 
+    objects = FilmWorkQuerySet.as_manager()
+
     class Meta:
         db_table = "content.film_work"  # fmt: skip
         verbose_name = _("FilmWork")
         verbose_name_plural = _("FilmWorks")
+        indexes = [
+            models.Index(fields=["updated_at", "id"], name="film_work_updated_id_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -105,6 +131,10 @@ class GenreFilmwork(UUIDMixin, CreatedMixin):
         verbose_name = _("Filmwork genre")
         verbose_name_plural = _("Filmworks genres")
         unique_together = [["film_work", "genre"]]
+        indexes = [
+            models.Index(fields=["genre", "film_work"], name="gfw_genre_film_work_idx"),
+            models.Index(fields=["created_at", "id"], name="gfw_created_id_idx"),
+        ]
 
     def __str__(self):
         return f"{self.film_work} - {self.genre}"
@@ -117,6 +147,9 @@ class Person(UUIDMixin, CreatedModifiedMixin):
         db_table = "content.person"  # fmt: skip
         verbose_name = _("Person")
         verbose_name_plural = _("Persons")
+        indexes = [
+            models.Index(fields=["updated_at", "id"], name="person_updated_id_idx"),
+        ]
 
     def __str__(self):
         return self.full_name
@@ -142,6 +175,33 @@ class PersonFilmwork(UUIDMixin, CreatedMixin):
         verbose_name_plural = _("Filmworks persons")
         unique_together = [["person", "film_work", "role"]]
         index_together = [["person", "role"]]
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="pfw_created_id_idx"),
+        ]
 
     def __str__(self):
         return f"{self.film_work} - {self.person} - {self.role}"
+
+
+class FilmWorkRead(models.Model):
+    """
+    Материализованное представление: фильм с уже собранными жанрами и
+    персонами по ролям. Создаётся миграцией, обновляется командой
+    refresh_film_work_read и до обновления отстаёт от таблиц.
+    """
+
+    id = models.UUIDField(primary_key=True)
+    title = models.TextField()
+    description = models.TextField()
+    creation_date = models.DateField(null=True)
+    rating = models.FloatField(null=True)
+    type = models.TextField()
+    updated_at = models.DateTimeField()
+    genres = ArrayField(models.TextField())
+    actors = ArrayField(models.TextField())
+    writers = ArrayField(models.TextField())
+    directors = ArrayField(models.TextField())
+
+    class Meta:
+        managed = False
+        db_table = "content.film_work_read"  # fmt: skip
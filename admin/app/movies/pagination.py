@@ -0,0 +1,65 @@
+import uuid
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+class FilmWorkCursorPagination(CursorPagination):
+    """
+    Постраничный обход по ключу (updated_at, id): курсор хранит ключ
+    последнего фильма страницы, следующая страница выбирается условием
+    (updated_at, id) > курсор по индексу, без COUNT(*) и OFFSET, поэтому
+    глубокие страницы не медленнее первых. CursorPagination из DRF хранит
+    в курсоре только updated_at и пропускает OFFSET строк с тем же
+    временем, здесь такого пропуска нет. Обход только вперёд, total в
+    ответе нет.
+    """
+
+    ordering = ("updated_at", "id")
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            updated_at, pk = self.parse_position(cursor.position)
+            # updated_at >= курсор задаёт начало обхода индекса, условие с OR
+            # только отсеивает уже показанные фильмы с тем же updated_at
+            queryset = queryset.filter(updated_at__gte=updated_at).filter(
+                Q(updated_at__gt=updated_at) | Q(id__gt=pk)
+            )
+
+        # Лишний фильм показывает, есть ли следующая страница
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+        self.has_next = len(results) > self.page_size
+        self.has_previous = False
+        return self.page
+
+    def parse_position(self, position: str | None) -> tuple[datetime, uuid.UUID]:
+        try:
+            updated_at, pk = position.split("|")
+            return datetime.fromisoformat(updated_at), uuid.UUID(pk)
+        except (AttributeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+
+        last = self.page[-1]
+        position = f"{last.updated_at.isoformat()}|{last.pk}"
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        return None
@@ -1,5 +1,4 @@
-from django.db.models import Prefetch
-from movies.models import FilmWork, Genre, GenreFilmwork, Person, PersonFilmwork
+from movies.models import FilmWork, FilmWorkRead, Genre, Person, PersonFilmwork
 from rest_framework import serializers
 
 
@@ -16,63 +15,47 @@ class PersonSerializer(serializers.ModelSerializer):
 
 
 class FilmWorkSerializer(serializers.ModelSerializer):
-    genres = serializers.SerializerMethodField("get_genres")
-    actors = serializers.SerializerMethodField("get_actors")
-    writers = serializers.SerializerMethodField("get_writers")
-    directors = serializers.SerializerMethodField("get_directors")
+    """
+    Связи читаются из genre_links и person_links, которые заполняет
+    FilmWork.objects.with_relations(): страница собирается за постоянное
+    число запросов, а не за несколько запросов на каждый фильм.
+    """
 
-    def get_genres(self, obj):
-        return Prefetch(
-            "genrefilmwork_set",
-            queryset=GenreFilmwork.objects.filter(film_work=obj),
-            to_attr="all_genres",
-        )
+    genres = serializers.SerializerMethodField()
+    actors = serializers.SerializerMethodField()
+    writers = serializers.SerializerMethodField()
+    directors = serializers.SerializerMethodField()
 
-    def get_actors(self, obj):
-        return Prefetch(
-            "personfilmwork_set",
-            queryset=PersonFilmwork.objects.filter(role=PersonFilmwork.Role.ACTOR),
-            to_attr="actors",
-        )
+    @staticmethod
+    def get_genre_links(obj):
+        if hasattr(obj, "genre_links"):
+            return obj.genre_links
+        return obj.genrefilmwork_set.select_related("genre")
 
-    def get_writers(self, obj):
-        return Prefetch(
-            "personfilmwork_set",
-            queryset=PersonFilmwork.objects.filter(role=PersonFilmwork.Role.WRITER),
-            to_attr="writers",
-        )
+    @staticmethod
+    def get_person_links(obj):
+        if hasattr(obj, "person_links"):
+            return obj.person_links
+        return obj.personfilmwork_set.select_related("person")
 
-    def get_directors(self, obj):
-        return Prefetch(
-            "personfilmwork_set",
-            queryset=PersonFilmwork.objects.filter(role=PersonFilmwork.Role.DIRECTOR),
-            to_attr="directors",
-        )
+    def get_persons(self, obj, role):
+        return [
+            personfilmwork.person.full_name
+            for personfilmwork in self.get_person_links(obj)
+            if personfilmwork.role == role
+        ]
 
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
+    def get_genres(self, obj):
+        return [genrefilmwork.genre.name for genrefilmwork in self.get_genre_links(obj)]
 
-        instance = FilmWork.objects.prefetch_related(
-            representation["genres"],
-            representation["actors"],
-            representation["writers"],
-            representation["directors"],
-        ).get(pk=instance.pk)
+    def get_actors(self, obj):
+        return self.get_persons(obj, PersonFilmwork.Role.ACTOR)
 
-        representation["genres"] = [
-            genrefilmwork.genre.name for genrefilmwork in instance.all_genres
-        ]
-        representation["actors"] = [
-            personfilnwork.person.full_name for personfilnwork in instance.actors
-        ]
-        representation["writers"] = [
-            personfilnwork.person.full_name for personfilnwork in instance.writers
-        ]
-        representation["directors"] = [
-            personfilnwork.person.full_name for personfilnwork in instance.directors
-        ]
+    def get_writers(self, obj):
+        return self.get_persons(obj, PersonFilmwork.Role.WRITER)
 
-        return representation
+    def get_directors(self, obj):
+        return self.get_persons(obj, PersonFilmwork.Role.DIRECTOR)
 
     class Meta:
         model = FilmWork
@@ -88,3 +71,11 @@ class FilmWorkSerializer(serializers.ModelSerializer):
             "writers",
             "directors",
         )
+
+
+class FilmWorkReadSerializer(serializers.ModelSerializer):
+    """Тот же ответ, что у FilmWorkSerializer, из film_work_read одним запросом."""
+
+    class Meta:
+        model = FilmWorkRead
+        fields = FilmWorkSerializer.Meta.fields
@@ -1,3 +1,235 @@
-from django.test import TestCase
+"""
+Нужен Postgres из настроек POSTGRES_*: миграции создают материализованное
+представление, а тесты сверяют планы запросов, на других СУБД они пропускаются.
+"""
+import io
+import uuid
+from datetime import datetime, timezone
+from unittest import skipUnless
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from movies.models import FilmWork, Genre, GenreFilmwork, Person, PersonFilmwork, User
+from movies.views import FilmWorkCursorListView, FilmWorkDetailView, FilmWorkListView
+
+ZERO_ID = uuid.UUID(int=0)
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+requires_postgres = skipUnless(connection.vendor == "postgresql", "нужен Postgres")
+
+
+@requires_postgres
+class EtlQueryPlanTests(TestCase):
+    """
+    Выборки по ключам (updated_at, id) и (created_at, id) и поиск фильмов
+    жанров и персон должны идти по своим индексам. С enable_seqscan = off
+    Postgres всё равно может взять полный обход первичного ключа или
+    уникального индекса, поэтому проверяется имя индекса в плане.
+    Запросы самого ETL по схеме movies_database.ddl проверяет
+    content/etl/tests/test_query_plans.py.
+    """
+
+    def explain(self, query: str, params: tuple) -> str:
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off;")
+            cursor.execute(f"EXPLAIN {query}", params)
+            return "\n".join(row[0] for row in cursor.fetchall())
+
+    def assertUsesIndex(self, index: str, query: str, params: tuple) -> None:
+        plan = self.explain(query, params)
+        self.assertIn(index, plan, plan)
+
+    @staticmethod
+    def table(model) -> str:
+        return connection.ops.quote_name(model._meta.db_table)
+
+    @staticmethod
+    def unique_index(model, columns: list[str]) -> str:
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, model._meta.db_table
+            )
+        return next(
+            name
+            for name, info in constraints.items()
+            if info["unique"] and info["columns"] == columns
+        )
+
+    def test_modified_rows_use_index(self):
+        for model, index in (
+            (FilmWork, "film_work_updated_id_idx"),
+            (Genre, "genre_updated_id_idx"),
+            (Person, "person_updated_id_idx"),
+        ):
+            with self.subTest(model=model.__name__):
+                self.assertUsesIndex(
+                    index,
+                    f"""
+                    SELECT id, updated_at FROM {self.table(model)}
+                    WHERE (updated_at, id) > (%s, %s)
+                    ORDER BY updated_at, id
+                    LIMIT %s;
+                    """,
+                    (EPOCH, ZERO_ID, 1000),
+                )
+
+    def test_new_links_use_index(self):
+        for model, index in (
+            (GenreFilmwork, "gfw_created_id_idx"),
+            (PersonFilmwork, "pfw_created_id_idx"),
+        ):
+            with self.subTest(model=model.__name__):
+                self.assertUsesIndex(
+                    index,
+                    f"""
+                    SELECT id, created_at, film_work_id FROM {self.table(model)}
+                    WHERE (created_at, id) > (%s, %s)
+                    ORDER BY created_at, id
+                    LIMIT %s;
+                    """,
+                    (EPOCH, ZERO_ID, 1000),
+                )
+
+    def test_linked_films_use_index(self):
+        # У персон ключ (person_id, film_work_id) - начало уникального индекса
+        person_index = self.unique_index(
+            PersonFilmwork, ["person_id", "film_work_id", "role"]
+        )
+        for model, column, index in (
+            (GenreFilmwork, "genre_id", "gfw_genre_film_work_idx"),
+            (PersonFilmwork, "person_id", person_index),
+        ):
+            with self.subTest(model=model.__name__):
+                self.assertUsesIndex(
+                    index,
+                    f"""
+                    SELECT DISTINCT film_work_id FROM {self.table(model)}
+                    WHERE {column} = ANY(%s::uuid[]) AND film_work_id > %s
+                    ORDER BY film_work_id
+                    LIMIT %s;
+                    """,
+                    ([uuid.uuid4()], ZERO_ID, 1000),
+                )
+
+
+@requires_postgres
+class FilmWorkApiQueriesTests(TestCase):
+    """Число запросов страницы API не должно зависеть от числа фильмов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        genres = Genre.objects.bulk_create([Genre(name=f"Genre {i}") for i in range(3)])
+        persons = Person.objects.bulk_create(
+            [Person(full_name=f"Person {i}") for i in range(6)]
+        )
+        roles = list(PersonFilmwork.Role)
+        cls.films = FilmWork.objects.bulk_create(
+            [FilmWork(title=f"Film {i}", type=FilmWork.Type.MOVIE) for i in range(15)]
+        )
+
+        GenreFilmwork.objects.bulk_create(
+            [
+                GenreFilmwork(film_work=film, genre=genre)
+                for film in cls.films
+                for genre in genres
+            ]
+        )
+        PersonFilmwork.objects.bulk_create(
+            [
+                PersonFilmwork(
+                    film_work=film, person=person, role=roles[i % len(roles)]
+                )
+                for film in cls.films
+                for i, person in enumerate(persons)
+            ]
+        )
+
+    def get(self, view, path="/", **kwargs):
+        request = APIRequestFactory().get(path)
+        force_authenticate(request, user=User(email="admin@example.com"))
+        return view.as_view()(request, **kwargs)
+
+    def test_list_page(self):
+        # Количество, страница фильмов, жанры и персоны страницы
+        with self.assertNumQueries(4):
+            response = self.get(FilmWorkListView)
+
+        self.assertEqual(len(response.data["results"]), 10)
+        film = response.data["results"][0]
+        self.assertCountEqual(film["genres"], ["Genre 0", "Genre 1", "Genre 2"])
+        self.assertCountEqual(film["actors"], ["Person 0", "Person 3"])
+        self.assertCountEqual(film["directors"], ["Person 1", "Person 4"])
+        self.assertCountEqual(film["writers"], ["Person 2", "Person 5"])
+
+    def test_detail(self):
+        with self.assertNumQueries(3):
+            response = self.get(FilmWorkDetailView, pk=self.films[0].pk)
+
+        self.assertEqual(response.data["title"], "Film 0")
+        self.assertEqual(len(response.data["actors"]), 2)
+
+    def walk_cursor(self) -> list[str]:
+        seen = []
+        path = "/?page_size=4"
+
+        while path:
+            # Страница фильмов, жанры и персоны страницы - без COUNT(*) и OFFSET
+            with self.assertNumQueries(3) as queries:
+                response = self.get(FilmWorkCursorListView, path)
+            self.assertNotIn("OFFSET", queries.captured_queries[0]["sql"])
+            seen.extend(film["id"] for film in response.data["results"])
+            path = response.data["next"]
+
+        return seen
+
+    def test_cursor_walks_catalogue(self):
+        films = sorted(self.films, key=lambda film: (film.updated_at, film.id))
+        self.assertEqual(self.walk_cursor(), [str(film.id) for film in films])
+
+    def test_cursor_walks_equal_timestamps(self):
+        # Фильмы с одинаковым updated_at различает id, а не смещение
+        FilmWork.objects.update(updated_at=EPOCH)
+
+        films = sorted(self.films, key=lambda film: film.id)
+        self.assertEqual(self.walk_cursor(), [str(film.id) for film in films])
+
+    def test_cursor_page_starts_in_index(self):
+        # Обход индекса начинается с курсора, а не с первого фильма каталога
+        path = self.get(FilmWorkCursorListView, "/?page_size=4").data["next"]
+        with CaptureQueriesContext(connection) as queries:
+            self.get(FilmWorkCursorListView, path)
+
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off;")
+            cursor.execute(f"EXPLAIN {queries.captured_queries[0]['sql']}")
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+
+        self.assertIn("film_work_updated_id_idx", plan)
+        self.assertIn("Index Cond: (updated_at >=", plan)
+
+    def test_cursor_rejects_invalid_position(self):
+        path = "/?cursor=cD1ub3QtYS1rZXk%3D"  # p=not-a-key
+
+        response = self.get(FilmWorkCursorListView, path)
+        self.assertEqual(response.status_code, 404)
+
+    def test_read_model_matches_tables(self):
+        path = f"/?page_size={len(self.films)}"
+        expected = self.get(FilmWorkCursorListView, path).data["results"]
+        call_command("refresh_film_work_read", stdout=io.StringIO())
+
+        with override_settings(MOVIES_READ_MODEL=True):
+            # Вся страница - один запрос к представлению
+            with self.assertNumQueries(1):
+                results = self.get(FilmWorkCursorListView, path).data["results"]
+
+        self.assertEqual(len(results), len(expected))
+        for read, film in zip(results, expected):
+            self.assertEqual(read["id"], film["id"])
+            self.assertEqual(read["title"], film["title"])
+            for field in ("genres", "actors", "writers", "directors"):
+                self.assertCountEqual(read[field], film[field])
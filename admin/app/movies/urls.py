@@ -1,7 +1,8 @@
 from django.urls import path
-from movies.views import FilmWorkDetailView, FilmWorkListView
+from movies.views import FilmWorkCursorListView, FilmWorkDetailView, FilmWorkListView
 
 urlpatterns = [
     path("", FilmWorkListView.as_view(), name="movies"),
+    path("cursor", FilmWorkCursorListView.as_view(), name="movies-cursor"),
     path("<uuid:pk>", FilmWorkDetailView.as_view(), name="movie"),
 ]
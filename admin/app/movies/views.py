@@ -1,7 +1,9 @@
+from django.conf import settings
 from django.utils.decorators import method_decorator
 from drf_spectacular.utils import extend_schema
-from movies.models import FilmWork
-from movies.serializers import FilmWorkSerializer
+from movies.models import FilmWork, FilmWorkRead
+from movies.pagination import FilmWorkCursorPagination
+from movies.serializers import FilmWorkReadSerializer, FilmWorkSerializer
 from rest_framework import generics
 from movies.authentication import Authentication
 
@@ -15,9 +17,30 @@ from movies.authentication import Authentication
 )
 class FilmWorkListView(generics.ListAPIView):
     authentication_classes = [Authentication]
-    queryset = FilmWork.objects.all()
+    queryset = FilmWork.objects.with_relations()
     serializer_class = FilmWorkSerializer
 
+    def get_queryset(self):
+        if settings.MOVIES_READ_MODEL:
+            return FilmWorkRead.objects.all()
+        return super().get_queryset()
+
+    def get_serializer_class(self):
+        if settings.MOVIES_READ_MODEL:
+            return FilmWorkReadSerializer
+        return super().get_serializer_class()
+
+
+@method_decorator(
+    name="get",
+    decorator=extend_schema(
+        tags=["Киноленты"],
+        description="Обойти все киноленты по курсору в порядке (updated_at, id)",
+    ),
+)
+class FilmWorkCursorListView(FilmWorkListView):
+    pagination_class = FilmWorkCursorPagination
+
 
 @method_decorator(
     name="get",
@@ -25,5 +48,5 @@ class FilmWorkListView(generics.ListAPIView):
 )
 class FilmWorkDetailView(generics.RetrieveAPIView):
     authentication_classes = [Authentication]
-    queryset = FilmWork.objects.all()
+    queryset = FilmWork.objects.with_relations()
     serializer_class = FilmWorkSerializer
@@ -0,0 +1,90 @@
+"""
+Сравнение режимов выборки фильмов (ETL_EXTRACT_MODE):
+rows - join с отдельной строкой на каждую пару (персона, жанр),
+aggregated - документ фильма собирается в Postgres через jsonb_agg.
+
+Запуск из content/etl на заполненной базе:
+    python -m benchmarks.extract_modes --films 5000 --repeat 3
+"""
+import argparse
+import time
+
+import psycopg
+from psycopg.rows import dict_row
+
+from etl_process.extract_data import FILMS_AGGREGATED_QUERY, FILMS_QUERY, chunked
+from etl_process.settings import PostgresSettings
+from etl_process.transform_data import DataTransform
+
+
+def run_mode(conn, query: str, transform, films_id: list, batch_size: int) -> dict:
+    rows = documents = 0
+    fetch_time = transform_time = 0.0
+
+    for ids_chunk in chunked(films_id, batch_size):
+        started = time.perf_counter()
+        raw_data = conn.execute(query, (ids_chunk,)).fetchall()
+        fetched = time.perf_counter()
+        documents += len(transform(raw_data))
+
+        fetch_time += fetched - started
+        transform_time += time.perf_counter() - fetched
+        rows += len(raw_data)
+
+    return {
+        "rows": rows,
+        "documents": documents,
+        "fetch_s": fetch_time,
+        "transform_s": transform_time,
+        "total_s": fetch_time + transform_time,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--films", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    settings = PostgresSettings()
+    transformer = DataTransform()
+    modes = {
+        "rows": (FILMS_QUERY, transformer.transform_movies_pgdata_to_esdata),
+        "aggregated": (FILMS_AGGREGATED_QUERY, transformer.transform_aggregated_movies),
+    }
+
+    with psycopg.connect(
+        dbname=settings.db_name,
+        user=settings.db_user,
+        password=settings.db_password,
+        host=settings.db_host,
+        port=settings.db_port,
+        row_factory=dict_row,
+    ) as conn:
+        films_id = [
+            row["id"]
+            for row in conn.execute(
+                "SELECT id FROM content.film_work ORDER BY id LIMIT %s;", (args.films,)
+            )
+        ]
+        print(f"films: {len(films_id)}, batch size: {args.batch_size}")
+
+        for mode, (query, transform) in modes.items():
+            # Лучший из повторов: первый прогон прогревает кэш Postgres
+            result = min(
+                (
+                    run_mode(conn, query, transform, films_id, args.batch_size)
+                    for _ in range(args.repeat)
+                ),
+                key=lambda r: r["total_s"],
+            )
+            print(
+                f"{mode:>10}: {result['rows']:>8} rows, {result['documents']:>6} docs, "
+                f"fetch {result['fetch_s']:.3f}s, transform {result['transform_s']:.3f}s, "
+                f"{len(films_id) / result['total_s']:.0f} films/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
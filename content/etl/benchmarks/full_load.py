@@ -0,0 +1,197 @@
+"""
+Полная загрузка каталога PostgresExtractor -> DataTransform -> Elasticsearch
+с отчётом в JSON: пропускная способность, пиковый RSS, время этапов из метрик
+ETL и коммит, на котором сделан замер.
+
+--target stub поднимает локальный эндпоинт _bulk, который принимает всё:
+замеряются выборка, преобразование и сериализация без Elasticsearch.
+--target es пишет во временные индексы рядом с алиасами и удаляет их.
+Настройки ETL (ETL_EXTRACT_MODE, ETL_TRANSFORM_WORKERS и т.д.) берутся
+из окружения, как у основного процесса.
+
+Запуск из content/etl на базе, заполненной benchmarks.seed --schema etl:
+    python -m benchmarks.full_load --target stub --output result.json
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from elasticsearch import Elasticsearch
+from prometheus_client import REGISTRY
+
+from etl_process.es_loader import INDEX_SCHEMAS, ElasticsearchLoader
+from etl_process.extract_data import PostgresExtractor
+from etl_process.metrics import EXTRACT, LOAD, TRANSFORM
+from etl_process.settings import EtlSettings
+from etl_process.transform_data import DataTransform
+
+
+class NoVersions:
+    """Замеры не должны сбрасывать кэши API."""
+
+    def bump(self, index_name: str) -> None:
+        pass
+
+
+class BulkStubHandler(BaseHTTPRequestHandler):
+    """Отвечает на _bulk успехом для каждого документа."""
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        lines = body.splitlines()
+        items = []
+
+        # Строка действия, за ней документ (для index и update)
+        for line in lines[::2]:
+            (op_type, meta), = json.loads(line).items()
+            items.append(
+                {op_type: {"_index": meta["_index"], "_id": meta["_id"], "status": 200}}
+            )
+
+        self.send_json({"took": 0, "errors": False, "items": items})
+
+    do_PUT = do_POST
+
+    def send_json(self, response: dict) -> None:
+        payload = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("X-Elastic-Product", "Elasticsearch")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class StubLoader(ElasticsearchLoader):
+    """Загрузчик без управления индексами: пишет только в заглушку _bulk."""
+
+    def set_connection(self):
+        self.connection = Elasticsearch(f"http://{self.host}:{self.port}")
+
+    def create_index(self):
+        pass
+
+
+def start_stub() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BulkStubHandler)
+    threading.Thread(target=server.serve_forever, name="bulk-stub", daemon=True).start()
+
+    os.environ["ELASTIC_HOST"], os.environ["ELASTIC_PORT"] = map(
+        str, server.server_address
+    )
+    return server
+
+
+def get_commit() -> Optional[str]:
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], text=True)
+        commit = commit.strip()
+        dirty = subprocess.check_output(["git", "status", "--porcelain"], text=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return f"{commit}-dirty" if dirty.strip() else commit
+
+
+def collect_stages(aliases: list[str]) -> dict:
+    """Суммарное время и число элементов этапов по метрикам ETL."""
+    get_sample = REGISTRY.get_sample_value
+    stages = {}
+
+    for alias in aliases:
+        for stage in (EXTRACT, TRANSFORM, LOAD):
+            labels = {"stage": stage, "index": alias}
+            stages.setdefault(alias, {})[stage] = {
+                "seconds": get_sample("etl_stage_duration_seconds_sum", labels),
+                "batches": get_sample("etl_stage_duration_seconds_count", labels),
+                "items": get_sample("etl_stage_items_total", labels),
+            }
+
+    return stages
+
+
+def peak_rss_mb() -> dict:
+    # ru_maxrss в Linux - в килобайтах; дочерние процессы - пул преобразования
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }
+
+
+def run(target: str, aliases: list[str]) -> dict:
+    settings = EtlSettings()
+
+    if target == "stub":
+        server = start_stub()
+        loader = StubLoader(NoVersions())
+    else:
+        server = None
+        loader = ElasticsearchLoader(NoVersions())
+        loader.targets = {
+            alias: loader.index_manager.create_index(alias, bulk=True) for alias in aliases
+        }
+
+    extractor = PostgresExtractor(
+        loader, DataTransform(validate=settings.etl_validate_documents)
+    )
+    started_at = datetime.now(timezone.utc).isoformat()
+    started = time.perf_counter()
+
+    try:
+        loaded = extractor.reindex_all(aliases)
+        elapsed = time.perf_counter() - started
+    finally:
+        extractor.close()
+        for index in loader.targets.values():
+            loader.index_manager.drop(index)
+        if server is not None:
+            server.shutdown()
+
+    stages = collect_stages(aliases)
+    documents = sum(stages[alias][LOAD]["items"] or 0 for alias in aliases)
+
+    return {
+        "commit": get_commit(),
+        "started_at": started_at,
+        "target": target,
+        "settings": settings.model_dump(),
+        "loaded": loaded,
+        "seconds": elapsed,
+        "documents": documents,
+        "documents_per_second": documents / elapsed if elapsed else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": stages,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--target", choices=("stub", "es"), default="stub")
+    parser.add_argument(
+        "--index", action="append", choices=list(INDEX_SCHEMAS), help="по умолчанию все"
+    )
+    parser.add_argument("--output", help="файл отчёта, по умолчанию stdout")
+    args = parser.parse_args()
+
+    report = run(args.target, args.index or list(INDEX_SCHEMAS))
+    output = json.dumps(report, indent=2, default=str)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
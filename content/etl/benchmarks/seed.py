@@ -0,0 +1,193 @@
+"""
+Синтетический каталог для бенчмарков ETL: фильмы, персоны, жанры и «широкие»
+составы фильмов. Одинаковые параметры и --seed дают одни и те же данные,
+поэтому результаты бенчмарков сравнимы между коммитами.
+
+--schema etl (по умолчанию) пишет в схему content из movies_database.ddl,
+с колонками created и modified: эти таблицы читает ETL, на них замеряет
+benchmarks.full_load. --schema django пишет в таблицы миграций admin/app
+("content.film_work" и т.д., created_at/updated_at) базы из DB_* и обновляет
+film_work_read: для замеров API админки. Запуск из content/etl:
+    python -m benchmarks.seed --films 10000 --persons 20000 --cast 30 --truncate
+    python -m benchmarks.seed --schema django --truncate
+"""
+import argparse
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import NamedTuple
+
+import psycopg
+
+from etl_process.settings import PostgresSettings
+from etl_process.transform_data import ROLES
+
+TABLES = ("person_film_work", "genre_film_work", "film_work", "person", "genre")
+LINK_TABLES = ("person_film_work", "genre_film_work")
+FILM_TYPES = ("movie", "tv_show")
+BASE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class Schema(NamedTuple):
+    """Имена таблиц каталога и колонки времени создания и изменения в них."""
+
+    table: str
+    stamps: tuple[str, ...]
+    link_stamps: tuple[str, ...]
+    views: tuple[str, ...] = ()
+
+    def name(self, table: str) -> str:
+        return self.table.format(table)
+
+    def columns(self, table: str, *columns: str) -> str:
+        stamps = self.link_stamps if table in LINK_TABLES else self.stamps
+        return f"{self.name(table)} ({', '.join(columns + stamps)})"
+
+    def moments(self, table: str, moment: datetime) -> tuple[datetime, ...]:
+        stamps = self.link_stamps if table in LINK_TABLES else self.stamps
+        return (moment,) * len(stamps)
+
+
+SCHEMAS = {
+    "etl": Schema(
+        table="content.{}",
+        stamps=("created", "modified"),
+        link_stamps=("created", "modified"),
+    ),
+    # Django держит таблицы с точкой в имени в схеме public, у связей нет updated_at
+    "django": Schema(
+        table='"content.{}"',
+        stamps=("created_at", "updated_at"),
+        link_stamps=("created_at",),
+        views=('"content.film_work_read"',),
+    ),
+}
+
+
+def make_uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def timestamp(number: int) -> datetime:
+    """Строки получают разные modified: watermark двигается как на живой базе."""
+    return BASE_TIME + timedelta(seconds=number)
+
+
+def seed(
+    conn: psycopg.Connection, args: argparse.Namespace, schema: Schema
+) -> dict[str, int]:
+    rng = random.Random(args.seed)
+    counts = dict.fromkeys(TABLES, 0)
+
+    genres = [make_uuid(rng) for _ in range(args.genres)]
+    persons = [make_uuid(rng) for _ in range(args.persons)]
+    films = [make_uuid(rng) for _ in range(args.films)]
+
+    with conn.cursor() as cursor:
+        columns = schema.columns("genre", "id", "name", "description")
+        with cursor.copy(f"COPY {columns} FROM STDIN") as copy:
+            for number, genre_id in enumerate(genres):
+                moments = schema.moments("genre", timestamp(number))
+                copy.write_row((genre_id, f"Genre {number}", "", *moments))
+        counts["genre"] = len(genres)
+
+        columns = schema.columns("person", "id", "full_name")
+        with cursor.copy(f"COPY {columns} FROM STDIN") as copy:
+            for number, person_id in enumerate(persons):
+                moments = schema.moments("person", timestamp(number))
+                copy.write_row((person_id, f"Person {number}", *moments))
+        counts["person"] = len(persons)
+
+        columns = schema.columns(
+            "film_work", "id", "title", "description", "creation_date", "rating", "type"
+        )
+        with cursor.copy(f"COPY {columns} FROM STDIN") as copy:
+            for number, film_id in enumerate(films):
+                copy.write_row(
+                    (
+                        film_id,
+                        f"Film {number}",
+                        f"Synthetic film number {number}",
+                        date(1950, 1, 1) + timedelta(days=rng.randrange(27000)),
+                        round(rng.uniform(1, 10), 1),
+                        rng.choice(FILM_TYPES),
+                        *schema.moments("film_work", timestamp(number)),
+                    )
+                )
+        counts["film_work"] = len(films)
+
+        cast_size = min(args.cast, len(persons))
+        columns = schema.columns(
+            "person_film_work", "id", "film_work_id", "person_id", "role"
+        )
+        with cursor.copy(f"COPY {columns} FROM STDIN") as copy:
+            for number, film_id in enumerate(films):
+                moments = schema.moments("person_film_work", timestamp(number))
+                for position, person_id in enumerate(rng.sample(persons, cast_size)):
+                    copy.write_row(
+                        (
+                            make_uuid(rng),
+                            film_id,
+                            person_id,
+                            ROLES[position % len(ROLES)],
+                            *moments,
+                        )
+                    )
+        counts["person_film_work"] = len(films) * cast_size
+
+        genres_per_film = min(args.genres_per_film, len(genres))
+        columns = schema.columns("genre_film_work", "id", "film_work_id", "genre_id")
+        with cursor.copy(f"COPY {columns} FROM STDIN") as copy:
+            for number, film_id in enumerate(films):
+                moments = schema.moments("genre_film_work", timestamp(number))
+                for genre_id in rng.sample(genres, genres_per_film):
+                    copy.write_row((make_uuid(rng), film_id, genre_id, *moments))
+        counts["genre_film_work"] = len(films) * genres_per_film
+
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--films", type=int, default=10000)
+    parser.add_argument("--persons", type=int, default=20000)
+    parser.add_argument("--genres", type=int, default=30)
+    parser.add_argument("--cast", type=int, default=30, help="персон на фильм")
+    parser.add_argument("--genres-per-film", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--schema", choices=SCHEMAS, default="etl", help="куда писать каталог"
+    )
+    parser.add_argument(
+        "--truncate", action="store_true", help="очистить таблицы каталога перед загрузкой"
+    )
+    args = parser.parse_args()
+    schema = SCHEMAS[args.schema]
+
+    settings = PostgresSettings()
+    started = time.perf_counter()
+
+    with psycopg.connect(
+        dbname=settings.db_name,
+        user=settings.db_user,
+        password=settings.db_password,
+        host=settings.db_host,
+        port=settings.db_port,
+    ) as conn:
+        tables = ", ".join(schema.name(table) for table in TABLES)
+        if args.truncate:
+            conn.execute(f"TRUNCATE {tables} CASCADE;")
+        counts = seed(conn, args, schema)
+        for view in schema.views:
+            conn.execute(f"REFRESH MATERIALIZED VIEW {view};")
+        conn.execute(f"ANALYZE {', '.join((tables, *schema.views))};")
+
+    print(
+        ", ".join(f"{table}: {count}" for table, count in counts.items())
+        + f" in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Микробенчмарк DataTransform на синтетических «широких» фильмах:
+каждый фильм даёт cast x genres строк join.
+
+Запуск из content/etl:
+    python -m benchmarks.transform --films 200 --cast 40 --genres 5
+"""
+import argparse
+import time
+import uuid
+
+from etl_process.transform_data import ROLES, DataTransform
+
+
+def generate_rows(films: int, cast: int, genres: int) -> list[dict]:
+    rows = []
+
+    for film_number in range(films):
+        film_id = uuid.uuid4()
+        persons = [
+            (uuid.uuid4(), f"Person {i}", ROLES[i % len(ROLES)]) for i in range(cast)
+        ]
+        film_genres = [(uuid.uuid4(), f"Genre {i}") for i in range(genres)]
+
+        for person_id, full_name, role in persons:
+            for genre_id, genre_name in film_genres:
+                rows.append(
+                    {
+                        "fw_id": film_id,
+                        "title": f"Film {film_number}",
+                        "description": None,
+                        "rating": 7.5,
+                        "type": "movie",
+                        "creation_date": None,
+                        "file_path": None,
+                        "role": role,
+                        "id": person_id,
+                        "full_name": full_name,
+                        "name": genre_name,
+                        "g_id": genre_id,
+                        "g_description": None,
+                    }
+                )
+
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--films", type=int, default=200)
+    parser.add_argument("--cast", type=int, default=40)
+    parser.add_argument("--genres", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = generate_rows(args.films, args.cast, args.genres)
+    print(f"films: {args.films}, rows: {len(rows)}")
+
+    for validate in (True, False):
+        transformer = DataTransform(validate=validate)
+        timings = []
+
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            transformer.transform_movies_pgdata_to_esdata(rows)
+            timings.append(time.perf_counter() - started)
+
+        best = min(timings)
+        print(
+            f"validate={validate!s:>5}: best {best:.4f}s, "
+            f"{len(rows) / best:.0f} rows/s, {args.films / best:.0f} films/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+import asyncio
+import logging
+import time
+from contextlib import aclosing, asynccontextmanager
+from typing import AsyncIterator, Callable, Iterable, Optional, Tuple
+
+import elastic_transport
+import psycopg
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import async_streaming_bulk
+from psycopg.rows import dict_row
+
+from state.watermark import ZERO_ID, Watermark
+
+from .backoff import backoff
+from .es_loader import INDEX_SCHEMAS, BulkJob, ElasticsearchLoader
+from .extract_data import (
+    CHANGE_TABLES,
+    FILM_WORK,
+    FILMS_AGGREGATED_QUERY,
+    FILMS_GENRES_QUERY,
+    FILMS_PERSONS_QUERY,
+    FILMS_QUERY,
+    GENRE,
+    GENRES_QUERY,
+    LINKED_FILMS_QUERY,
+    MODIFIED_ROWS_QUERY,
+    PERSON,
+    PERSON_FILM_WORK,
+    PERSONS_FILMS_QUERY,
+    PERSONS_QUERY,
+    WATERMARK_TABLES,
+    ChangedDocuments,
+    PostgresExtractor,
+    chunked,
+    get_modified_links_query,
+    split_last_group,
+)
+from .metrics import EXTRACT, LOAD, TRANSFORM, observe_stage
+from .settings import EtlSettings, PostgresSettings
+from .shards import ShardSet
+from .transform_data import DataTransform
+
+
+class AsyncBulkLoader:
+    """
+    Загрузка в Elasticsearch через AsyncElasticsearch и async_streaming_bulk.
+    Индексы, двойная запись на время пересборки, разбор ответов и dead-letter
+    файл берутся у синхронного ElasticsearchLoader.
+    """
+
+    def __init__(self, loader: ElasticsearchLoader):
+        self.loader = loader
+        self.connection = AsyncElasticsearch(f"http://{loader.host}:{loader.port}")
+        self.logger = logging.getLogger("es")
+
+    async def close(self) -> None:
+        await self.connection.close()
+
+    async def bulk_index(self, index_name: str, actions: Iterable[dict]):
+        """То же, что ElasticsearchLoader.bulk_index, но без блокировки цикла событий."""
+        job = BulkJob(self.loader, index_name, actions)
+
+        for delay in job.attempts():
+            await asyncio.sleep(delay)
+
+            results = async_streaming_bulk(self.connection, job.pending, **job.options)
+            actions = iter(job.pending)
+            try:
+                async for ok, item in results:
+                    job.add_result(next(actions), ok, item)
+            except elastic_transport.TransportError as err:
+                self.logger.exception(err)
+                return None, None
+
+        # Запись dead-letter файла и версия индекса в Redis - короткие и синхронные
+        return await asyncio.to_thread(job.finish)
+
+    async def index(self, alias: str, documents: list):
+        return await self.bulk_index(alias, self.loader.generate_actions(alias, documents))
+
+    async def update(self, alias: str, documents: list):
+        return await self.bulk_index(alias, self.loader.generate_updates(alias, documents))
+
+
+class AsyncPostgresExtractor:
+    """
+    Асинхронный вариант PostgresExtractor для инкрементальной загрузки.
+    Источники изменений опрашиваются, а документы выбираются и загружаются
+    одновременно, не больше etl_async_concurrency запросов к Postgres сразу:
+    у каждого запроса своё соединение из небольшого пула. Преобразование
+    выполняется в потоке, поэтому ожидание Postgres и Elasticsearch
+    перекрывается. Методы collect_changes и process_changes совпадают
+    с синхронными, поэтому основной цикл ETL не меняется.
+    """
+
+    def __init__(self, es_loader: ElasticsearchLoader, data_transformer: DataTransform):
+        settings = EtlSettings()
+
+        self.es_loader = es_loader
+        self.data_transformer = data_transformer
+        self.batch_size = settings.etl_batch_size
+        self.itersize = settings.etl_itersize
+        self.aggregated = settings.etl_extract_mode == "aggregated"
+        self.concurrency = settings.etl_async_concurrency
+        self.dsn = self.get_settings_dsn()
+        self.loop = asyncio.new_event_loop()
+        self.pool: Optional[asyncio.Queue] = None
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.loader: Optional[AsyncBulkLoader] = None
+        self.logger = logging.getLogger("postgres")
+
+        self.loop.run_until_complete(self.connect())
+
+    @staticmethod
+    def get_settings_dsn() -> dict:
+        settings = PostgresSettings()
+
+        return {
+            "dbname": settings.db_name,
+            "user": settings.db_user,
+            "password": settings.db_password,
+            "host": settings.db_host,
+            "port": settings.db_port,
+        }
+
+    def get_dsn(self) -> dict:
+        return self.dsn
+
+    @backoff()
+    async def make_db_connection(self) -> Optional[psycopg.AsyncConnection]:
+        try:
+            return await psycopg.AsyncConnection.connect(
+                **self.dsn, row_factory=dict_row, autocommit=True
+            )
+        except psycopg.OperationalError:
+            self.logger.exception("Ошибка подключения к Postgres!")
+            return None
+
+    async def open_connection(self) -> psycopg.AsyncConnection:
+        """Соединение с повторами backoff: если они исчерпаны, OperationalError."""
+        conn = await self.make_db_connection()
+
+        if conn is None:
+            raise psycopg.OperationalError("Не удалось подключиться к Postgres")
+
+        return conn
+
+    async def connect(self) -> None:
+        self.logger.info("Подключение к Postgres...")
+        self.pool = asyncio.Queue()
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+
+        for _ in range(self.concurrency):
+            self.pool.put_nowait(await self.open_connection())
+
+        self.loader = AsyncBulkLoader(self.es_loader)
+        self.logger.info(f"Открыто {self.concurrency} соединений с Postgres")
+
+    async def aclose(self) -> None:
+        while not self.pool.empty():
+            await self.pool.get_nowait().close()
+
+        await self.loader.close()
+
+    def close(self) -> None:
+        self.loop.run_until_complete(self.aclose())
+        self.loop.close()
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[psycopg.AsyncConnection]:
+        """
+        Соединение из пула: пока все заняты, запрос ждёт. Закрытое соединение
+        открывается заново, а если подключиться не удалось, в пул возвращается
+        прежнее закрытое, и следующий запрос попробует снова.
+        """
+        conn = await self.pool.get()
+
+        try:
+            if conn.closed:
+                conn = await self.open_connection()
+            yield conn
+        finally:
+            self.pool.put_nowait(conn)
+
+    async def fetch(self, query: str, params: tuple) -> list[dict]:
+        """Короткие запросы: не больше batch_size строк."""
+        async with self.connection() as conn:
+            cursor = await conn.execute(query, params)
+            return await cursor.fetchall()
+
+    async def stream_rows(
+        self, conn: psycopg.AsyncConnection, query: str, params: tuple, key: str
+    ) -> AsyncIterator[list[dict]]:
+        """
+        То же, что PostgresExtractor.stream_rows: строки через серверный курсор
+        пачками примерно по itersize, строки одной сущности не разрываются.
+        """
+        async with conn.transaction():
+            async with conn.cursor(name=f"etl_{key}") as cursor:
+                cursor.itersize = self.itersize
+                await cursor.execute(query, params)
+                tail = []
+
+                while rows := await cursor.fetchmany(self.itersize):
+                    rows, tail = split_last_group(tail + rows, key)
+                    if rows:
+                        yield rows
+
+                if tail:
+                    yield tail
+
+    def collect_changes(
+        self, watermarks: dict[str, Watermark]
+    ) -> Tuple[dict[str, set], dict[str, Watermark]]:
+        return self.loop.run_until_complete(self.collect_changes_async(watermarks))
+
+    def process_changes(
+        self,
+        changes: dict[str, set],
+        aliases: Iterable[str] = INDEX_SCHEMAS,
+        shards: Optional[ShardSet] = None,
+    ) -> bool:
+        return self.loop.run_until_complete(
+            self.process_changes_async(changes, aliases, shards)
+        )
+
+    async def collect_changes_async(
+        self, watermarks: dict[str, Watermark]
+    ) -> Tuple[dict[str, set], dict[str, Watermark]]:
+        """Опросить все источники изменений одновременно."""
+        results = await asyncio.gather(
+            *(
+                self.fetch_changed_rows(table_name, watermarks[table_name])
+                for table_name in WATERMARK_TABLES
+            )
+        )
+        changes, new_watermarks = {}, {}
+
+        for table_name, rows in zip(WATERMARK_TABLES, results):
+            if not rows:
+                continue
+
+            last_row = rows[-1]
+            new_watermarks[table_name] = Watermark(
+                str(last_row["modified"]), str(last_row["id"])
+            )
+
+            if table_name in CHANGE_TABLES:
+                changes[table_name] = {str(row["id"]) for row in rows}
+            elif table_name == PERSON_FILM_WORK:
+                changes[table_name] = {
+                    (str(row["film_work_id"]), str(row["person_id"])) for row in rows
+                }
+            else:
+                changes[table_name] = {str(row["film_work_id"]) for row in rows}
+
+        return changes, new_watermarks
+
+    async def fetch_changed_rows(self, table_name: str, watermark: Watermark) -> list:
+        if table_name in CHANGE_TABLES:
+            query = MODIFIED_ROWS_QUERY.format(table_name=table_name)
+        else:
+            query = get_modified_links_query(table_name)
+
+        return await self.fetch(query, (watermark.modified, watermark.id, self.batch_size))
+
+    async def get_changed_filmworks_id(self, table_name: str, rows_id: list) -> set[str]:
+        query = LINKED_FILMS_QUERY.format(table_name=table_name)
+        films_id, last_id = set(), ZERO_ID
+
+        while rows := await self.fetch(query, (rows_id, last_id, self.batch_size)):
+            films_id.update(str(row["film_work_id"]) for row in rows)
+            last_id = rows[-1]["film_work_id"]
+
+        return films_id
+
+    async def process_changes_async(
+        self,
+        changes: dict[str, set],
+        aliases: Iterable[str] = INDEX_SCHEMAS,
+        shards: Optional[ShardSet] = None,
+    ) -> bool:
+        """Тот же разбор изменений, что в PostgresExtractor.process_changes."""
+        films_id = set(changes.get(FILM_WORK, ()))
+
+        if "movies" in aliases:
+            for linked_films_id in await asyncio.gather(
+                *(
+                    self.get_changed_filmworks_id(table_name, list(changes[table_name]))
+                    for table_name in (GENRE, PERSON)
+                    if changes.get(table_name)
+                )
+            ):
+                films_id.update(linked_films_id)
+
+        documents = ChangedDocuments.from_changes(changes, films_id, shards)
+        transformer = self.data_transformer
+        loads = []
+
+        if "movies" in aliases:
+            if self.aggregated:
+                query = FILMS_AGGREGATED_QUERY
+                transform = transformer.transform_aggregated_movies
+            else:
+                query = FILMS_QUERY
+                transform = transformer.transform_movies_pgdata_to_esdata
+            loads += [
+                self.load(query, documents.films, transform, "movies", "fw_id"),
+                self.load(
+                    FILMS_PERSONS_QUERY,
+                    documents.cast_films,
+                    transformer.transform_films_persons,
+                    "movies",
+                    "film_id",
+                    partial=True,
+                ),
+                self.load(
+                    FILMS_GENRES_QUERY,
+                    documents.genre_films,
+                    transformer.transform_films_genres,
+                    "movies",
+                    "film_id",
+                    partial=True,
+                ),
+            ]
+
+        if "persons" in aliases:
+            loads += [
+                self.load(
+                    PERSONS_QUERY,
+                    documents.persons,
+                    transformer.transform_persons_pgdata_to_esdata,
+                    "persons",
+                    "person_id",
+                ),
+                self.load(
+                    PERSONS_FILMS_QUERY,
+                    documents.linked_persons,
+                    transformer.transform_persons_films,
+                    "persons",
+                    "person_id",
+                    partial=True,
+                ),
+            ]
+
+        if "genres" in aliases:
+            loads.append(
+                self.load(
+                    GENRES_QUERY,
+                    documents.genres,
+                    transformer.transform_genres_pgdata_to_esdata,
+                    "genres",
+                    "id",
+                )
+            )
+
+        return all(await asyncio.gather(*loads))
+
+    async def load(
+        self,
+        query: str,
+        ids: list,
+        transform: Callable[[list[dict]], list],
+        alias: str,
+        key: str,
+        partial: bool = False,
+    ) -> bool:
+        """
+        Выбрать, преобразовать и загрузить документы пачками по batch_size id.
+        Одновременно обрабатывается не больше concurrency пачек всех загрузок.
+        Строки запроса отсортированы по key.
+        """
+        results = await asyncio.gather(
+            *(
+                self.load_chunk(query, ids_chunk, transform, alias, key, partial)
+                for ids_chunk in chunked(ids, self.batch_size)
+            )
+        )
+        return all(results)
+
+    async def load_chunk(
+        self,
+        query: str,
+        ids: list,
+        transform: Callable[[list[dict]], list],
+        alias: str,
+        key: str,
+        partial: bool,
+    ) -> bool:
+        """
+        Пачка id читается с курсора частями по itersize строк: в памяти
+        не вся пачка с составом и жанрами, а одна часть.
+        """
+        loaded = True
+
+        async with self.semaphore, self.connection() as conn:
+            async with aclosing(self.stream_rows(conn, query, (ids,), key)) as batches:
+                started = time.perf_counter()
+
+                async for rows in batches:
+                    elapsed = time.perf_counter() - started
+                    observe_stage(EXTRACT, alias, elapsed, len(rows))
+                    loaded = await self.load_rows(rows, transform, alias, partial) and loaded
+                    started = time.perf_counter()
+
+        return loaded
+
+    async def load_rows(
+        self,
+        rows: list[dict],
+        transform: Callable[[list[dict]], list],
+        alias: str,
+        partial: bool,
+    ) -> bool:
+        started = time.perf_counter()
+        documents = await asyncio.to_thread(transform, rows)
+        observe_stage(TRANSFORM, alias, time.perf_counter() - started, len(documents))
+
+        started = time.perf_counter()
+        if partial:
+            result = await self.loader.update(alias, documents)
+        else:
+            result = await self.loader.index(alias, documents)
+        observe_stage(LOAD, alias, time.perf_counter() - started, len(documents))
+
+        return PostgresExtractor.is_loaded(result)
@@ -1,3 +1,5 @@
+import asyncio
+import inspect
 import time
 from functools import wraps
 
@@ -22,9 +24,32 @@ def backoff(
     :param border_sleep_time: максимальное время ожидания
     :param exception_types:  список типов исключений, при которых вызов функции надо повторять
     :return: результат выполнения функции
+
+    Корутины ждут через asyncio.sleep и не блокируют цикл событий.
     """
 
     def func_wrapper(func):
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_inner(*args, **kwargs):
+                num = 0
+                t = start_sleep_time
+                conn = None
+
+                while t <= border_sleep_time:
+                    conn = await func(*args, **kwargs)
+
+                    if conn is not None:
+                        break
+
+                    t = start_sleep_time * factor**num
+                    num = num + 1
+                    await asyncio.sleep(t)
+                return conn
+
+            return async_inner
+
         @wraps(func)
         def inner(*args, **kwargs):
             num = 0
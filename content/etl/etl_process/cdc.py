@@ -0,0 +1,97 @@
+import json
+import logging
+import os
+import select
+from collections import defaultdict
+from typing import Optional
+
+import psycopg
+
+from .backoff import backoff
+
+CHANNEL = "content_changes"
+TRIGGERS_FILE = os.path.join(os.path.dirname(__file__), "..", "cdc_triggers.ddl")
+
+
+class ChangeListener:
+    """
+    Источник изменений на LISTEN/NOTIFY.
+    Триггеры из cdc_triggers.ddl отправляют в канал id изменённой строки
+    (для таблиц связей - id фильма и персоны),
+    слушатель копит их по таблицам, пока ETL не заберёт пачку через wait().
+    Уведомления, отправленные без подписки, теряются, поэтому после каждого
+    подключения ETL догоняет изменения сканированием по watermark.
+    Удаления строк не уведомляются, см. cdc_triggers.ddl.
+    """
+
+    def __init__(self, dsn: dict):
+        self.dsn = dsn
+        self.conn = None
+        self.changes: dict[str, set] = defaultdict(set)
+        self.logger = logging.getLogger("cdc")
+
+    @backoff()
+    def make_db_connection(self) -> Optional[psycopg.Connection]:
+        self.logger.info("Подписка на изменения в Postgres...")
+
+        try:
+            connection = psycopg.connect(**self.dsn, autocommit=True)
+            connection.add_notify_handler(self.on_notify)
+            connection.execute(f"LISTEN {CHANNEL}")
+            self.logger.info("Подписка на изменения установлена")
+        except psycopg.OperationalError:
+            connection = None
+            self.logger.exception("Ошибка подключения к Postgres!")
+
+        return connection
+
+    def connect(self) -> None:
+        self.close()
+        self.conn = self.make_db_connection()
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+        self.changes.clear()
+
+    def install_triggers(self) -> None:
+        with open(TRIGGERS_FILE) as f:
+            ddl = f.read()
+
+        with psycopg.connect(**self.dsn) as conn:
+            conn.execute(ddl)
+
+        self.logger.info("Триггеры уведомлений установлены")
+
+    def wait(self, timeout: float) -> dict[str, set]:
+        """
+        Дождаться уведомлений не дольше timeout секунд и вернуть накопленные id
+        по таблицам. При обрыве соединения поднимается psycopg.OperationalError.
+        """
+        if not self.changes:
+            ready, _, _ = select.select([self.conn.fileno()], [], [], timeout)
+
+            if ready:
+                # psycopg разбирает уведомления только во время выполнения запроса
+                self.conn.execute("SELECT 1")
+
+        changes, self.changes = dict(self.changes), defaultdict(set)
+        return changes
+
+    def on_notify(self, notify: psycopg.Notify) -> None:
+        try:
+            payload = json.loads(notify.payload)
+            table_name = payload["table"]
+
+            if table_name == "person_film_work":
+                change = (payload["film_work_id"], payload["person_id"])
+            elif table_name == "genre_film_work":
+                change = payload["film_work_id"]
+            else:
+                change = payload["id"]
+
+            self.changes[table_name].add(change)
+        except (ValueError, KeyError):
+            self.logger.warning(f"Некорректное уведомление: {notify.payload}")
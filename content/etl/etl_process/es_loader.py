@@ -1,25 +1,118 @@
 import json
 import logging
 import os
-from typing import Optional
+import threading
+import time
+from typing import Iterable, Iterator, Optional
 
 import elastic_transport
 import elasticsearch
 from elasticsearch import Elasticsearch
-from elasticsearch.helpers import bulk
+from elasticsearch.helpers import streaming_bulk
+from pydantic import BaseModel
 
 from .backoff import backoff
+from .index_manager import IndexManager
+from .metrics import BULK_FAILURES, BULK_RETRIES
 from .settings import ElasticsearchSettings
+from .versions import IndexVersions
+
+# Алиас -> файл с настройками и маппингом индекса
+INDEX_SCHEMAS = {
+    "movies": "index.json",
+    "persons": "index_persons.json",
+    "genres": "index_genres.json",
+}
+
+# Ответы, после которых документ имеет смысл отправить повторно
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+
+class BulkJob:
+    """
+    Одна загрузка bulk_index: документы, которые ещё нужно отправить,
+    повторы с задержкой и итоги. Отправку выполняет вызывающий код -
+    синхронный streaming_bulk или асинхронный async_streaming_bulk.
+    """
+
+    def __init__(
+        self, loader: "ElasticsearchLoader", index_name: str, actions: Iterable[dict]
+    ):
+        self.loader = loader
+        self.index_name = index_name
+        self.pending = list(actions)
+        self.retry: list[dict] = []
+        self.dead_letters: list[tuple[dict, dict]] = []
+        self.success = 0
+        self.size = sum(len(json.dumps(action, default=str)) for action in self.pending)
+        self.started = time.perf_counter()
+
+    @property
+    def options(self) -> dict:
+        """Параметры streaming_bulk: ошибки разбираются по документам."""
+        return {
+            "chunk_size": self.loader.chunk_size,
+            "max_chunk_bytes": self.loader.max_chunk_bytes,
+            "raise_on_error": False,
+            "raise_on_exception": False,
+        }
+
+    def attempts(self) -> Iterator[float]:
+        """
+        Задержка перед каждой попыткой отправить pending, у первой - 0.
+        Следующая попытка отправляет документы с ответом 429/5xx, пока
+        они есть и не исчерпаны повторы.
+        """
+        for attempt in range(self.loader.max_retries + 1):
+            delay = 0.0
+            if attempt:
+                delay = self.loader.get_retry_delay(attempt)
+                BULK_RETRIES.labels(self.index_name).inc(len(self.pending))
+                self.loader.logger.warning(
+                    f"Retrying {len(self.pending)} documents in {self.index_name} "
+                    f"after {delay}s"
+                )
+
+            yield delay
+
+            self.pending, self.retry = self.retry, []
+            if not self.pending:
+                return
+
+    def add_result(self, action: dict, ok: bool, item: dict) -> None:
+        self.success += self.loader.sort_result(
+            action, ok, item, self.retry, self.dead_letters
+        )
+
+    def finish(self) -> tuple[int, list]:
+        return self.loader.finish_bulk(
+            self.index_name,
+            self.success,
+            self.pending,
+            self.dead_letters,
+            self.size,
+            self.started,
+        )
 
 
 class ElasticsearchLoader:
     """Загрузка данных в подготовленном формате в Elasticsearch."""
 
-    def __init__(self):
+    def __init__(self, versions: IndexVersions):
+        self.versions = versions
         self.host = None
         self.port = None
         self.connection = None
-        self.file_name = "index.json"
+        self.chunk_size = None
+        self.max_chunk_bytes = None
+        self.max_retries = None
+        self.initial_backoff = None
+        self.max_backoff = None
+        self.dead_letter_file = None
+        self.dead_letter_lock = threading.Lock()
+        self.index_manager = None
+        self.targets: dict[str, str] = {}
+        self.rebuilds: dict[str, str] = {}
         self.index_name = "movies"
         self.logger = logging.getLogger("es")
 
@@ -38,6 +131,12 @@ class ElasticsearchLoader:
 
         self.host = settings.elastic_host
         self.port = settings.elastic_port
+        self.chunk_size = settings.elastic_chunk_size
+        self.max_chunk_bytes = settings.elastic_max_chunk_bytes
+        self.max_retries = settings.elastic_max_retries
+        self.initial_backoff = settings.elastic_initial_backoff
+        self.max_backoff = settings.elastic_max_backoff
+        self.dead_letter_file = settings.elastic_dead_letter_file
 
     @backoff()
     def make_es_connection(self):
@@ -68,80 +167,174 @@ class ElasticsearchLoader:
             self.logger.exception(err)
 
     def create_index(self):
-        self.logger.info(f"Creating an index {self.index_name}")
+        schemas = {}
 
-        mappings = self.get_index_schema(self.file_name)
-        mappings_persons = self.get_index_schema("index_genres.json")
+        for alias, file_name in INDEX_SCHEMAS.items():
+            schemas[alias] = self.get_index_schema(file_name)
+            if schemas[alias] is None:
+                self.logger.warning(
+                    f"Index {alias} will be created without settings and mappings!"
+                )
 
-        if mappings is None:
-            self.logger.warning("Index will be created without settings and mappings!")
+        self.index_manager = IndexManager(self.connection, schemas)
 
-        try:
-            response = self.connection.indices.create(
-                index=self.index_name, body=mappings
-            )
-            response = self.connection.indices.create(
-                index="persons", body=mappings_persons
-            )
-            if response.body["acknowledged"]:
-                self.logger.info(f"Index {self.index_name} created")
-        except elasticsearch.BadRequestError as err:
-            self.logger.exception(err)
+        for alias in INDEX_SCHEMAS:
+            try:
+                self.index_manager.ensure_alias(alias)
+            except elasticsearch.BadRequestError as err:
+                self.logger.exception(err)
 
-    def generate_data(self, data: list):
-        for movie in data:
-            yield {
-                "_index": self.index_name,
-                "_id": movie.id,
-                "id": movie.id,
-                "imdb_rating": movie.imdb_rating,
-                "creation_date": movie.creation_date,
-                "file_path": movie.file_path,
-                "genres": movie.genres,
-                "title": movie.title,
-                "description": movie.description,
-                "directors_names": movie.directors_names,
-                "actors_names": movie.actors_names,
-                "writers_names": movie.writers_names,
-                "directors": movie.directors,
-                "actors": movie.actors,
-                "writers": movie.writers,
-            }
-
-    def generate_persons(self, data: list):
-        for person in data:
-            yield {
-                "_index": "persons",
-                "_id": person.id,
-                "id": person.id,
-                "full_name": person.full_name,
-                "films": person.films,
-            }
+    def get_targets(self, alias: str) -> list[str]:
+        """
+        Индексы для записи документов алиаса. Загрузчик пересборки пишет
+        только в новую версию (targets), основной - в алиас и, пока идёт
+        пересборка, ещё и в новую версию (rebuilds).
+        """
+        targets = [self.targets.get(alias, alias)]
 
-    def index_documents(self, index_documents):
-        self.logger.info("Indexing documents...")
-        success, errors = None, None
+        rebuild_index = self.rebuilds.get(alias)
+        if rebuild_index is not None:
+            targets.append(rebuild_index)
 
-        try:
-            success, errors = bulk(self.connection, self.generate_data(index_documents))
-        except elastic_transport.SerializationError as err:
-            self.logger.exception(err)
-        except elasticsearch.helpers.BulkIndexError as err:
-            self.logger.exception(err)
+        return targets
+
+    @staticmethod
+    def get_source(document) -> dict:
+        """Документ для индексации: pydantic-модель или словарь после DataTransform."""
+        if isinstance(document, BaseModel):
+            return document.model_dump()
+        return document
+
+    def generate_actions(self, alias: str, data: list):
+        targets = self.get_targets(alias)
+
+        for document in data:
+            source = self.get_source(document)
+            for index in targets:
+                yield {"_index": index, "_id": source["id"], **source}
+
+    def generate_updates(self, alias: str, data: list):
+        targets = self.get_targets(alias)
+
+        for document in data:
+            fields = {key: value for key, value in document.items() if key != "id"}
+            for index in targets:
+                yield {
+                    "_op_type": "update",
+                    "_index": index,
+                    "_id": document["id"],
+                    "doc": fields,
+                }
+
+    def bulk_index(self, index_name: str, actions: Iterable[dict]):
+        """
+        Загрузить документы через streaming_bulk пачками не больше chunk_size
+        документов и max_chunk_bytes байт.
+        Документы с ответом 429/5xx повторяются с экспоненциальной задержкой.
+        Остальные ошибки не исправить повтором: такие документы пишутся в
+        dead-letter файл и не задерживают watermark. Документы, не загруженные
+        после всех повторов, возвращаются в errors.
+        """
+        job = BulkJob(self, index_name, actions)
+
+        for delay in job.attempts():
+            time.sleep(delay)
+
+            try:
+                # streaming_bulk отвечает по документам в порядке отправки
+                results = streaming_bulk(self.connection, job.pending, **job.options)
+                for action, (ok, item) in zip(job.pending, results):
+                    job.add_result(action, ok, item)
+            except elastic_transport.TransportError as err:
+                self.logger.exception(err)
+                return None, None
+
+        return job.finish()
+
+    def get_retry_delay(self, attempt: int) -> float:
+        return min(self.initial_backoff * 2 ** (attempt - 1), self.max_backoff)
+
+    def sort_result(
+        self, action: dict, ok: bool, item: dict, retry: list, dead_letters: list
+    ) -> int:
+        """Разобрать ответ по документу: 1, если он загружен."""
+        _, info = item.popitem()
+
+        if ok:
+            return 1
+        if self.is_missing_for_update(action, info):
+            # Документа ещё нет в индексе: он будет загружен целиком
+            return 0
+        if info.get("status") in RETRYABLE_STATUSES:
+            retry.append(action)
+        else:
+            dead_letters.append((info, action))
+        return 0
+
+    def finish_bulk(
+        self,
+        index_name: str,
+        success: int,
+        pending: list,
+        dead_letters: list,
+        size: int,
+        started: float,
+    ) -> tuple[int, list]:
+        if dead_letters:
+            BULK_FAILURES.labels(index_name, "dead_letter").inc(len(dead_letters))
+            self.write_dead_letters(dead_letters)
+
+        errors = [action["_id"] for action in pending]
+        if errors:
+            BULK_FAILURES.labels(index_name, "failed").inc(len(errors))
+            self.logger.error(f"{len(errors)} documents were not indexed to {index_name}")
+
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        self.logger.info(
+            f"Indexed {success} documents to {index_name} in {elapsed:.2f}s: "
+            f"{success / elapsed:.0f} docs/s, {size / elapsed / 2**20:.2f} MB/s"
+        )
+
+        if success and index_name not in self.targets:
+            self.versions.bump(index_name)
 
         return success, errors
 
-    def index_persons(self, index_documents):
+    @staticmethod
+    def is_missing_for_update(action: dict, info: dict) -> bool:
+        return action.get("_op_type") == "update" and info.get("status") == 404
+
+    def write_dead_letters(self, dead_letters: list[tuple[dict, dict]]) -> None:
+        self.logger.error(
+            f"{len(dead_letters)} documents rejected, see {self.dead_letter_file}"
+        )
+
+        with self.dead_letter_lock, open(self.dead_letter_file, "a") as f:
+            for info, action in dead_letters:
+                record = {
+                    "index": info.get("_index"),
+                    "id": info.get("_id"),
+                    "status": info.get("status"),
+                    "error": info.get("error"),
+                    "document": action,
+                }
+                f.write(json.dumps(record, default=str) + "\n")
+
+    def index_documents(self, index_documents):
         self.logger.info("Indexing documents...")
-        success, errors = None, None
+        return self.bulk_index(
+            self.index_name, self.generate_actions(self.index_name, index_documents)
+        )
 
-        try:
-            success, errors = bulk(
-                self.connection, self.generate_persons(index_documents)
-            )
-        except elastic_transport.SerializationError as err:
-            self.logger.exception(err)
-        except elasticsearch.helpers.BulkIndexError as err:
-            self.logger.exception(err)
+    def update_documents(self, alias: str, documents: list):
+        """Частично обновить документы: в documents только id и изменённые поля."""
+        self.logger.info("Updating documents...")
+        return self.bulk_index(alias, self.generate_updates(alias, documents))
 
-        return success, errors
+    def index_persons(self, index_documents):
+        self.logger.info("Indexing documents...")
+        return self.bulk_index("persons", self.generate_actions("persons", index_documents))
+
+    def index_genres(self, index_documents):
+        self.logger.info("Indexing genres...")
+        return self.bulk_index("genres", self.generate_actions("genres", index_documents))
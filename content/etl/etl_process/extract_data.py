@@ -1,12 +1,17 @@
 import logging
-from typing import Tuple, Union
+from itertools import islice
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
 
 import psycopg
 from psycopg.rows import dict_row
 
+from state.watermark import ZERO_ID, Watermark
+
 from .backoff import backoff
-from .es_loader import ElasticsearchLoader
-from .settings import PostgresSettings
+from .es_loader import INDEX_SCHEMAS, ElasticsearchLoader
+from .pipeline import Pipeline, prefetch
+from .settings import EtlSettings, PostgresSettings
+from .shards import ShardSet
 from .transform_data import DataTransform
 
 GENRE = "genre"
@@ -15,6 +20,211 @@ PERSON = "person"
 GENRE_FILM_WORK = "genre_film_work"
 PERSON_FILM_WORK = "person_film_work"
 
+# Таблицы, изменения которых ETL отслеживает по watermark
+CHANGE_TABLES = (GENRE, PERSON, FILM_WORK)
+# Таблицы связей: изменённые строки отслеживаются по modified, документы,
+# которые не загружаются целиком, обновляются частично. Удаление связи
+# помечает изменёнными её фильм и персону (триггер movies_database.ddl)
+LINK_TABLES = (PERSON_FILM_WORK, GENRE_FILM_WORK)
+WATERMARK_TABLES = CHANGE_TABLES + LINK_TABLES
+
+# Строка на каждую пару (персона, жанр) фильма, документ собирает DataTransform
+FILMS_QUERY = """SELECT
+        fw.id as fw_id,
+        fw.title,
+        fw.description,
+        fw.rating,
+        fw.type,
+        fw.creation_date,
+        fw.file_path,
+        pfw.role,
+        p.id,
+        p.full_name,
+        g.name,
+        g.id as g_id,
+        g.description as g_description
+    FROM content.film_work as fw
+    LEFT JOIN content.person_film_work as pfw ON pfw.film_work_id = fw.id
+    LEFT JOIN content.person as p ON p.id = pfw.person_id
+    LEFT JOIN content.genre_film_work as gfw ON gfw.film_work_id = fw.id
+    LEFT JOIN content.genre as g ON g.id = gfw.genre_id
+    WHERE fw.id = ANY(%s::uuid[])
+    ORDER BY fw_id;"""
+
+# Строка на фильм: персоны и жанры собираются в Postgres
+FILMS_AGGREGATED_QUERY = """SELECT
+        fw.id as fw_id,
+        fw.title,
+        fw.description,
+        fw.rating,
+        fw.type,
+        fw.creation_date,
+        fw.file_path,
+        COALESCE(g.genres, '[]') as genres,
+        COALESCE(p.directors, '[]') as directors,
+        COALESCE(p.actors, '[]') as actors,
+        COALESCE(p.writers, '[]') as writers
+    FROM content.film_work as fw
+    LEFT JOIN LATERAL (
+        SELECT jsonb_agg(
+            jsonb_build_object('id', g.id, 'name', g.name, 'description', g.description)
+        ) as genres
+        FROM content.genre_film_work as gfw
+        JOIN content.genre as g ON g.id = gfw.genre_id
+        WHERE gfw.film_work_id = fw.id
+    ) as g ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT
+            jsonb_agg(DISTINCT jsonb_build_object('id', p.id, 'name', p.full_name))
+                FILTER (WHERE pfw.role = 'director') as directors,
+            jsonb_agg(DISTINCT jsonb_build_object('id', p.id, 'name', p.full_name))
+                FILTER (WHERE pfw.role = 'actor') as actors,
+            jsonb_agg(DISTINCT jsonb_build_object('id', p.id, 'name', p.full_name))
+                FILTER (WHERE pfw.role = 'writer') as writers
+        FROM content.person_film_work as pfw
+        JOIN content.person as p ON p.id = pfw.person_id
+        WHERE pfw.film_work_id = fw.id
+    ) as p ON TRUE
+    WHERE fw.id = ANY(%s::uuid[])
+    ORDER BY fw_id;"""
+
+
+# Изменённые строки таблицы после watermark (modified, id)
+MODIFIED_ROWS_QUERY = """SELECT id, modified
+    FROM content.{table_name}
+    WHERE (modified, id) > (%s, %s)
+    ORDER BY modified, id
+    LIMIT %s;"""
+
+# Изменённые строки таблицы связей после watermark (modified, id)
+MODIFIED_LINKS_QUERY = """SELECT id, modified, film_work_id{person_column}
+    FROM content.{table_name}
+    WHERE (modified, id) > (%s, %s)
+    ORDER BY modified, id
+    LIMIT %s;"""
+
+# Фильмы, связанные с изменёнными жанрами или персонами, пачкой по ключу
+LINKED_FILMS_QUERY = """SELECT DISTINCT film_work_id
+    FROM content.{table_name}_film_work
+    WHERE {table_name}_id = ANY(%s::uuid[]) AND film_work_id > %s
+    ORDER BY film_work_id
+    LIMIT %s;"""
+
+# Частичные обновления документов
+FILMS_PERSONS_QUERY = """SELECT
+        pfw.film_work_id as film_id,
+        pfw.role,
+        p.id,
+        p.full_name
+    FROM content.person_film_work as pfw
+    JOIN content.person as p ON p.id = pfw.person_id
+    WHERE pfw.film_work_id = ANY(%s::uuid[])
+    ORDER BY film_id;"""
+
+FILMS_GENRES_QUERY = """SELECT
+        gfw.film_work_id as film_id,
+        g.id,
+        g.name,
+        g.description
+    FROM content.genre_film_work as gfw
+    JOIN content.genre as g ON g.id = gfw.genre_id
+    WHERE gfw.film_work_id = ANY(%s::uuid[])
+    ORDER BY film_id;"""
+
+PERSONS_FILMS_QUERY = """SELECT
+        pfw.person_id,
+        pfw.role,
+        pfw.film_work_id as film_id
+    FROM content.person_film_work as pfw
+    WHERE pfw.person_id = ANY(%s::uuid[])
+    ORDER BY person_id;"""
+
+# Документы персон и жанров целиком
+PERSONS_QUERY = """SELECT
+        p.id as person_id,
+        p.full_name,
+        pfw.role,
+        pfw.film_work_id as film_id
+    FROM content.person as p
+    JOIN content.person_film_work as pfw ON pfw.person_id = p.id
+    WHERE p.id = ANY(%s::uuid[])
+    ORDER BY person_id;"""
+
+GENRES_QUERY = """SELECT
+        g.id,
+        g.name,
+        g.description
+    FROM content.genre as g
+    WHERE g.id = ANY(%s::uuid[])
+    ORDER BY g.id;"""
+
+
+def get_modified_links_query(table_name: str) -> str:
+    person_column = ", person_id" if table_name == PERSON_FILM_WORK else ""
+    return MODIFIED_LINKS_QUERY.format(table_name=table_name, person_column=person_column)
+
+
+def chunked(ids: Iterable, size: int) -> Iterator[list]:
+    """Разбить последовательность id на списки не длиннее size."""
+    iterator = iter(ids)
+
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def split_last_group(rows: list[dict], key: str) -> Tuple[list[dict], list[dict]]:
+    """
+    Отделить строки последней сущности пачки, отсортированной по key:
+    её строки могут продолжиться в следующей пачке курсора.
+    """
+    last_key = rows[-1][key]
+    split = len(rows)
+
+    while split and rows[split - 1][key] == last_key:
+        split -= 1
+
+    return rows[:split], rows[split:]
+
+
+class ChangedDocuments(NamedTuple):
+    """Id документов, которые нужно загрузить целиком или обновить частично."""
+
+    films: list
+    cast_films: list
+    genre_films: list
+    persons: list
+    linked_persons: list
+    genres: list
+
+    @classmethod
+    def from_changes(
+        cls,
+        changes: dict[str, set],
+        films_id: set[str],
+        shards: Optional[ShardSet] = None,
+    ) -> "ChangedDocuments":
+        """
+        films_id - изменённые фильмы вместе с фильмами изменённых жанров и персон.
+        Связи меняют только часть полей: фильмы и персоны, которые
+        и так загружаются целиком, частично не обновляются.
+        """
+        persons_id = set(changes.get(PERSON, ()))
+        links = changes.get(PERSON_FILM_WORK, ())
+
+        documents = cls(
+            films=list(films_id),
+            cast_films=list({film_id for film_id, _ in links} - films_id),
+            genre_films=list(set(changes.get(GENRE_FILM_WORK, ())) - films_id),
+            persons=list(persons_id),
+            linked_persons=list({person_id for _, person_id in links} - persons_id),
+            genres=list(changes.get(GENRE, ())),
+        )
+
+        if shards is None:
+            return documents
+
+        return cls(*(shards.filter(ids) for ids in documents))
+
 
 class PostgresExtractor:
     """Получение данных из Postgres, преобразование во внутренний формат, передача в Elasticsearch."""
@@ -29,15 +239,16 @@ class PostgresExtractor:
         self.password = None
         self.host = None
         self.port = None
+        self.batch_size = None
+        self.itersize = None
+        self.prefetch_depth = None
+        self.aggregated = None
+        self.pipeline = None
         self.logger = logging.getLogger("postgres")
 
         self.init_env()
         self.set_connection_cursor()
 
-    @staticmethod
-    def get_placeholders(data: list[str]) -> str:
-        return ", ".join(["%s"] * len(data))
-
     @backoff()
     def make_db_connection(self, dsn):
         self.logger.info("Подключение к Postgres...")
@@ -51,15 +262,17 @@ class PostgresExtractor:
 
         return connection
 
-    def set_connection_cursor(self):
-        dsn = {
+    def get_dsn(self) -> dict:
+        return {
             "dbname": self.db,
             "user": self.user,
             "password": self.password,
             "host": self.host,
             "port": self.port,
         }
-        self.conn = self.make_db_connection(dsn)
+
+    def set_connection_cursor(self):
+        self.conn = self.make_db_connection(self.get_dsn())
         self.cursor = self.conn.cursor()
 
     def init_env(self):
@@ -71,151 +284,305 @@ class PostgresExtractor:
         self.host = settings.db_host
         self.port = settings.db_port
 
-    def fetch_movies_if_genres_changed(self, last_updated):
-        self.logger.info('Fetch from "genre" if data modified')
-        genres_info = self.check_if_data_modified(last_updated, GENRE)
-
-        if genres_info is None:
-            self.logger.info("There are no modifications.")
-            return
-
-        self.logger.info("Fetched.")
-        films_id, film_placeholders = self.get_changed_filmworks_id(
-            GENRE, genres_info[0], genres_info[1]
+        etl_settings = EtlSettings()
+        self.batch_size = etl_settings.etl_batch_size
+        self.itersize = etl_settings.etl_itersize
+        self.prefetch_depth = etl_settings.etl_prefetch_depth
+        self.aggregated = etl_settings.etl_extract_mode == "aggregated"
+        self.pipeline = Pipeline(
+            transform_workers=etl_settings.etl_transform_workers,
+            load_workers=etl_settings.etl_load_workers,
+            queue_size=etl_settings.etl_pipeline_queue_size,
         )
-        self.get_all_films_info(films_id, film_placeholders)
-
-    def fetch_movies_if_persons_changed(self, last_updated):
-        self.logger.info('Fetch from "person" if data modified')
 
-        persons_info = self.check_if_data_modified(last_updated, PERSON)
+    def close(self) -> None:
+        self.pipeline.shutdown()
+        self.conn.close()
+
+    def collect_changes(
+        self, watermarks: dict[str, Watermark]
+    ) -> Tuple[dict[str, set[str]], dict[str, Watermark]]:
+        """
+        Изменённые строки каждой таблицы после её watermark, одним запросом
+        на таблицу за цикл. Возвращает id по таблицам (для person_film_work -
+        пары id фильма и персоны) и новые watermark.
+        """
+        changes, new_watermarks = {}, {}
+
+        for table_name in CHANGE_TABLES:
+            changed_info = self.check_if_data_modified(watermarks[table_name], table_name)
+
+            if changed_info is None:
+                continue
+
+            rows_id, new_watermarks[table_name] = changed_info
+            changes[table_name] = {str(i) for i in rows_id}
+
+        for table_name in LINK_TABLES:
+            changed_info = self.check_if_links_modified(watermarks[table_name], table_name)
+
+            if changed_info is None:
+                continue
+
+            rows, new_watermarks[table_name] = changed_info
+            if table_name == PERSON_FILM_WORK:
+                changes[table_name] = {
+                    (str(row["film_work_id"]), str(row["person_id"])) for row in rows
+                }
+            else:
+                changes[table_name] = {str(row["film_work_id"]) for row in rows}
+
+        return changes, new_watermarks
+
+    def process_changes(
+        self,
+        changes: dict[str, set[str]],
+        aliases: Iterable[str] = INDEX_SCHEMAS,
+        shards: Optional[ShardSet] = None,
+    ) -> bool:
+        """
+        Переиндексировать документы, затронутые изменёнными строками.
+        Фильмы изменённых жанров и персон объединяются с изменёнными фильмами,
+        поэтому каждый документ загружается за цикл один раз.
+        С shards загружаются только документы этих шардов: затронутые
+        документы выводятся из всех изменений, а отбираются по своему id.
+        True, если все документы загружены.
+        """
+        genres_id = list(changes.get(GENRE, ()))
+        persons_id = list(changes.get(PERSON, ()))
+        films_id = set(changes.get(FILM_WORK, ()))
+        self.logger.info(
+            f"Changes received: {len(genres_id)} genres, "
+            f"{len(persons_id)} persons, {len(films_id)} films"
+        )
 
-        if persons_info is None:
-            self.logger.info("There are no modifications.")
-            return
+        for table_name, rows_id in ((GENRE, genres_id), (PERSON, persons_id)):
+            if rows_id and "movies" in aliases:
+                for changed_films_id in self.get_changed_filmworks_id(table_name, rows_id):
+                    films_id.update(str(i) for i in changed_films_id)
 
-        self.logger.info("Fetched.")
-        films_id, film_placeholders = self.get_changed_filmworks_id(
-            PERSON, persons_info[0], persons_info[1]
-        )
-        self.get_all_films_info(films_id, film_placeholders)
+        documents = ChangedDocuments.from_changes(changes, films_id, shards)
+        loaded = True
 
-    def fetch_movies_if_films_changed(self, last_updated):
-        self.logger.info('Fetch from "film_work" if data modified')
+        if "movies" in aliases:
+            loaded = self.get_all_films_info(documents.films) and loaded
+            loaded = self.update_films_persons(documents.cast_films) and loaded
+            loaded = self.update_films_genres(documents.genre_films) and loaded
 
-        films_info = self.check_if_data_modified(last_updated, FILM_WORK)
+        if "persons" in aliases:
+            loaded = self.get_all_persons_info(documents.persons) and loaded
+            loaded = self.update_persons_films(documents.linked_persons) and loaded
 
-        if films_info is None:
-            self.logger.info("There are no modifications.")
-            return
+        if "genres" in aliases:
+            loaded = self.get_all_genres_info(documents.genres) and loaded
 
-        self.logger.info("Fetched.")
-        self.get_all_films_info(films_info[0], films_info[1])
+        return loaded
 
-    def fetch_persons_if_persons_changed(self, last_updated):
-        self.logger.info('Fetch from "person" if data modified')
+    def get_all_ids(self, table_name) -> Iterator[list]:
+        """Все id таблицы пачками по batch_size с выборкой по ключу."""
+        query = f"""
+                SELECT id
+                FROM content.{table_name}
+                WHERE id > %s
+                ORDER BY id
+                LIMIT %s;
+                """
+        last_id = ZERO_ID
 
-        persons_info = self.check_if_data_modified(last_updated, PERSON)
+        while True:
+            self.cursor.execute(query, (last_id, self.batch_size))
+            rows_id = [i.get("id") for i in self.cursor.fetchall()]
 
-        if persons_info is None:
-            self.logger.info("There are no modifications.")
-            return
+            if not rows_id:
+                break
 
-        self.logger.info("Fetched.")
-        self.get_all_persons_info(persons_info[0], persons_info[1])
+            yield rows_id
+            last_id = rows_id[-1]
+
+    def reindex_all(
+        self, aliases: Iterable[str], shards: Optional[ShardSet] = None
+    ) -> bool:
+        """
+        Загрузить все документы указанных индексов (с shards - только
+        документы этих шардов). True, если загружено всё.
+        """
+        loaded = True
+
+        for alias, table_name, load in (
+            ("movies", FILM_WORK, self.get_all_films_info),
+            ("persons", PERSON, self.get_all_persons_info),
+            ("genres", GENRE, self.get_all_genres_info),
+        ):
+            if alias not in aliases:
+                continue
+
+            for rows_id in self.get_all_ids(table_name):
+                if shards is not None:
+                    rows_id = shards.filter(rows_id)
+                if rows_id:
+                    loaded = load(rows_id) and loaded
+
+        return loaded
 
     def check_if_data_modified(
-        self, last_updated, table_name
-    ) -> Union[Tuple[list, str], None]:
-        query = f"""
-                SELECT id, modified
-                FROM content.{table_name}
-                WHERE modified > %s
-                ORDER BY modified;
-                """
-        self.cursor.execute(query, (last_updated,))
+        self, watermark: Watermark, table_name
+    ) -> Union[Tuple[list, Watermark], None]:
+        """
+        Пачка изменённых строк таблицы после watermark, не больше batch_size.
+        Новый watermark - пара (modified, id) последней строки пачки.
+        """
+        query = MODIFIED_ROWS_QUERY.format(table_name=table_name)
+        self.cursor.execute(query, (watermark.modified, watermark.id, self.batch_size))
         changed_rows = self.cursor.fetchall()
 
         if not changed_rows:
             return None
 
         changed_rows_id = [i.get("id") for i in changed_rows]
-        placeholders = self.get_placeholders(changed_rows_id)
+        last_row = changed_rows[-1]
+
+        return changed_rows_id, Watermark(str(last_row["modified"]), str(last_row["id"]))
+
+    def check_if_links_modified(
+        self, watermark: Watermark, table_name
+    ) -> Union[Tuple[list, Watermark], None]:
+        """
+        Пачка изменённых строк таблицы связей после watermark: новые связи
+        и смена роли. Watermark строится по modified, как у остальных таблиц.
+        """
+        query = get_modified_links_query(table_name)
+        self.cursor.execute(query, (watermark.modified, watermark.id, self.batch_size))
+        changed_rows = self.cursor.fetchall()
 
-        return changed_rows_id, placeholders
+        if not changed_rows:
+            return None
 
-    def get_changed_filmworks_id(
-        self, table_name, changed_rows_id, placeholders
-    ) -> Tuple[list, str]:
-        query = f"""
-                SELECT fw.id, fw.modified
-                FROM content.film_work as fw
-                LEFT JOIN content.{table_name}_film_work as gfw ON gfw.film_work_id = fw.id
-                WHERE gfw.{table_name}_id IN ({placeholders})
-                ORDER BY fw.modified;
-                """
-        self.cursor.execute(query, changed_rows_id)
-        changed_films_chunk = self.cursor.fetchall()
-        changed_films_id = [i.get("id") for i in changed_films_chunk]
-        film_placeholders = self.get_placeholders(changed_films_id)
-        return changed_films_id, film_placeholders
+        last_row = changed_rows[-1]
 
-    def get_all_films_info(self, films_id, film_placeholders) -> None:
-        self.logger.info("Fetching all films information")
-        query = f"""SELECT
-                        fw.id as fw_id, 
-                        fw.title, 
-                        fw.description, 
-                        fw.rating, 
-                        fw.type, 
-                        fw.creation_date, 
-                        fw.file_path, 
-                        pfw.role, 
-                        p.id, 
-                        p.full_name,
-                        g.name,
-                        g.id as g_id,
-                        g.description as g_description
-                    FROM content.film_work as fw
-                    LEFT JOIN content.person_film_work as pfw ON pfw.film_work_id = fw.id
-                    LEFT JOIN content.person as p ON p.id = pfw.person_id
-                    LEFT JOIN content.genre_film_work as gfw ON gfw.film_work_id = fw.id
-                    LEFT JOIN content.genre as g ON g.id = gfw.genre_id
-                    WHERE fw.id IN ({film_placeholders})
-                    ORDER BY fw_id;"""
-        self.cursor.execute(query, films_id)
+        return changed_rows, Watermark(str(last_row["modified"]), str(last_row["id"]))
+
+    def get_changed_filmworks_id(self, table_name, changed_rows_id) -> Iterator[list]:
+        """
+        Id фильмов, связанных с изменёнными строками, пачками по batch_size.
+        Пачки выбираются по ключу film_work_id, поэтому в памяти не больше одной.
+        """
+        query = LINKED_FILMS_QUERY.format(table_name=table_name)
+        last_id = ZERO_ID
 
         while True:
-            changed_films_chunk = self.cursor.fetchmany(1000)
+            self.cursor.execute(query, (changed_rows_id, last_id, self.batch_size))
+            changed_films_id = [i.get("film_work_id") for i in self.cursor.fetchall()]
 
-            if not changed_films_chunk:
+            if not changed_films_id:
                 break
 
-            data_to_load = self.data_transformer.transform_movies_pgdata_to_esdata(
-                raw_data=changed_films_chunk
-            )
-            self.load_data.index_documents(data_to_load)
+            yield changed_films_id
+            last_id = changed_films_id[-1]
+
+    def stream_rows(self, query: str, params: tuple, key: str) -> Iterator[list[dict]]:
+        """
+        Строки запроса через серверный курсор пачками примерно по itersize.
+        Запрос должен быть отсортирован по key: строки одной сущности
+        не разрываются между пачками.
+        """
+        with self.conn.cursor(name=f"etl_{key}") as cursor:
+            cursor.itersize = self.itersize
+            cursor.execute(query, params)
+            tail = []
+
+            while rows := cursor.fetchmany(self.itersize):
+                rows, tail = split_last_group(tail + rows, key)
+                if rows:
+                    yield rows
+
+            if tail:
+                yield tail
+
+        self.conn.commit()
+
+    def stream_by_ids(self, query: str, ids: list, key: str) -> Iterator[list[dict]]:
+        """Строки запроса для всех ids: id передаются в запрос частями по batch_size."""
+        chunks = (
+            rows
+            for ids_chunk in chunked(ids, self.batch_size)
+            for rows in self.stream_rows(query, (ids_chunk,), key)
+        )
+        return prefetch(chunks, self.prefetch_depth)
+
+    @property
+    def transform_movies(self) -> Callable[[list[dict]], list]:
+        """Метод DataTransform для строк фильмов в текущем режиме выборки."""
+        if self.aggregated:
+            return self.data_transformer.transform_aggregated_movies
+
+        return self.data_transformer.transform_movies_pgdata_to_esdata
+
+    @staticmethod
+    def is_loaded(result: tuple) -> bool:
+        success, errors = result
+        return success is not None and not errors
+
+    def get_all_films_info(self, films_id: list) -> bool:
+        """Загрузить фильмы в Elasticsearch. True, если все пачки проиндексированы."""
+        self.logger.info("Fetching all films information")
+        query = FILMS_AGGREGATED_QUERY if self.aggregated else FILMS_QUERY
+
+        return self.pipeline.run(
+            self.stream_by_ids(query, films_id, "fw_id"),
+            self.transform_movies,
+            lambda documents: self.is_loaded(self.load_data.index_documents(documents)),
+            index="movies",
+        )
+
+    def update_films_persons(self, films_id: list) -> bool:
+        """Обновить у фильмов только списки режиссёров, актёров и сценаристов."""
+        return self.pipeline.run(
+            self.stream_by_ids(FILMS_PERSONS_QUERY, films_id, "film_id"),
+            self.data_transformer.transform_films_persons,
+            lambda documents: self.is_loaded(
+                self.load_data.update_documents(self.load_data.index_name, documents)
+            ),
+            index="movies",
+        )
+
+    def update_films_genres(self, films_id: list) -> bool:
+        """Обновить у фильмов только список жанров."""
+        return self.pipeline.run(
+            self.stream_by_ids(FILMS_GENRES_QUERY, films_id, "film_id"),
+            self.data_transformer.transform_films_genres,
+            lambda documents: self.is_loaded(
+                self.load_data.update_documents(self.load_data.index_name, documents)
+            ),
+            index="movies",
+        )
+
+    def update_persons_films(self, persons_id: list) -> bool:
+        """Обновить у персон только список фильмов с ролями."""
+        return self.pipeline.run(
+            self.stream_by_ids(PERSONS_FILMS_QUERY, persons_id, "person_id"),
+            self.data_transformer.transform_persons_films,
+            lambda documents: self.is_loaded(
+                self.load_data.update_documents("persons", documents)
+            ),
+            index="persons",
+        )
 
-    def get_all_persons_info(self, persons_id: list, persons_placeholders: str):
+    def get_all_persons_info(self, persons_id: list) -> bool:
         self.logger.info("Fetching all persons information")
-        query = f"""SELECT
-                    p.id as person_id, 
-                    p.full_name,
-                    pfw.role, 
-                    pfw.film_work_id as film_id
-                FROM content.person as p
-                JOIN content.person_film_work as pfw ON pfw.person_id = p.id
-                WHERE p.id IN ({persons_placeholders})
-                ORDER BY person_id;"""
-        self.cursor.execute(query, persons_id)
 
-        while True:
-            changed_films_chunk = self.cursor.fetchmany(1000)
+        return self.pipeline.run(
+            self.stream_by_ids(PERSONS_QUERY, persons_id, "person_id"),
+            self.data_transformer.transform_persons_pgdata_to_esdata,
+            lambda documents: self.is_loaded(self.load_data.index_persons(documents)),
+            index="persons",
+        )
 
-            if not changed_films_chunk:
-                break
+    def get_all_genres_info(self, genres_id: list) -> bool:
+        self.logger.info("Fetching all genres information")
 
-            data_to_load = self.data_transformer.transform_persons_pgdata_to_esdata(
-                raw_data=changed_films_chunk
-            )
-            self.load_data.index_persons(data_to_load)
+        return self.pipeline.run(
+            self.stream_by_ids(GENRES_QUERY, genres_id, "id"),
+            self.data_transformer.transform_genres_pgdata_to_esdata,
+            lambda documents: self.is_loaded(self.load_data.index_genres(documents)),
+            index="genres",
+        )
@@ -0,0 +1,119 @@
+import copy
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+
+import elasticsearch
+from elasticsearch import Elasticsearch
+
+# Настройки на время полной загрузки: без обновления поиска и без реплик
+BULK_SETTINGS = {"refresh_interval": "-1", "number_of_replicas": 0}
+
+
+class IndexManager:
+    """
+    Версионные индексы за алиасами movies, persons и genres.
+    Читатели и загрузчик обращаются к алиасу, а конкретный индекс
+    ``<алиас>_<время создания>`` можно пересобрать и подменить атомарно.
+    """
+
+    def __init__(self, connection: Elasticsearch, schemas: dict[str, dict]):
+        self.connection = connection
+        self.schemas = schemas
+        self.logger = logging.getLogger("es")
+
+    def schema_hash(self, alias: str) -> str:
+        schema = self.schemas.get(alias) or {}
+        return hashlib.sha256(json.dumps(schema, sort_keys=True).encode()).hexdigest()
+
+    def has_drift(self, alias: str) -> bool:
+        """
+        Отличается ли схема индекса за алиасом от JSON-файла. Хэш файла
+        сохраняется в _meta маппинга при создании версии; у индекса без
+        хэша схема считается устаревшей.
+        """
+        indices = self.get_indices(alias)
+        if not indices:
+            return False
+
+        mappings = self.connection.indices.get_mapping(index=indices[0]).body
+        meta = next(iter(mappings.values()))["mappings"].get("_meta", {})
+        return meta.get("schema_hash") != self.schema_hash(alias)
+
+    @staticmethod
+    def new_index_name(alias: str) -> str:
+        return f"{alias}_{datetime.now(timezone.utc):%Y%m%d%H%M%S%f}"
+
+    def get_indices(self, alias: str) -> list[str]:
+        """
+        Индексы за алиасом. Индекс, созданный до перехода на алиасы,
+        называется так же, как алиас, и возвращается как есть.
+        """
+        try:
+            return list(self.connection.indices.get_alias(name=alias).body)
+        except elasticsearch.NotFoundError:
+            pass
+
+        if self.connection.indices.exists(index=alias):
+            return [alias]
+
+        return []
+
+    def ensure_alias(self, alias: str) -> None:
+        if self.get_indices(alias):
+            return
+
+        index = self.create_index(alias)
+        self.connection.indices.put_alias(index=index, name=alias)
+        self.logger.info(f"Index {index} created behind alias {alias}")
+
+    def create_index(self, alias: str, bulk: bool = False) -> str:
+        schema = copy.deepcopy(self.schemas.get(alias) or {})
+        if bulk:
+            schema.setdefault("settings", {}).update(BULK_SETTINGS)
+        schema.setdefault("mappings", {}).setdefault("_meta", {})[
+            "schema_hash"
+        ] = self.schema_hash(alias)
+
+        index = self.new_index_name(alias)
+        self.connection.indices.create(index=index, body=schema)
+        return index
+
+    def finalize(self, alias: str, index: str) -> None:
+        """Вернуть настройки после полной загрузки, слить сегменты и переключить алиас."""
+        settings = (self.schemas.get(alias) or {}).get("settings", {})
+        self.connection.indices.put_settings(
+            index=index,
+            settings={
+                "refresh_interval": settings.get("refresh_interval", "1s"),
+                "number_of_replicas": settings.get("number_of_replicas", 1),
+            },
+        )
+        self.connection.indices.refresh(index=index)
+        self.connection.options(request_timeout=3600).indices.forcemerge(
+            index=index, max_num_segments=1
+        )
+        self.switch_alias(alias, index)
+
+    def switch_alias(self, alias: str, index: str) -> None:
+        """Одним запросом перевести алиас на index и убрать прежние индексы."""
+        old_indices = [old for old in self.get_indices(alias) if old != index]
+        actions = [{"add": {"index": index, "alias": alias}}]
+
+        for old in old_indices:
+            if old == alias:
+                # Индекс без версии занимает имя алиаса: удаляется в том же запросе
+                actions.append({"remove_index": {"index": old}})
+            else:
+                actions.append({"remove": {"index": old, "alias": alias}})
+
+        self.connection.indices.update_aliases(actions=actions)
+        self.logger.info(f"Alias {alias} switched to {index}")
+
+        for old in old_indices:
+            if old != alias:
+                self.connection.indices.delete(index=old)
+
+    def drop(self, index: str) -> None:
+        self.connection.indices.delete(index=index, ignore_unavailable=True)
@@ -0,0 +1,106 @@
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from prometheus_client import (
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    push_to_gateway,
+    start_http_server,
+)
+
+from state.watermark import Watermark
+
+logger = logging.getLogger("main")
+
+# Этапы пачки: выборка из Postgres, сборка документов, загрузка в Elasticsearch
+EXTRACT = "extract"
+TRANSFORM = "transform"
+LOAD = "load"
+
+STAGE_SECONDS = Histogram(
+    "etl_stage_duration_seconds",
+    "Время обработки одной пачки на этапе ETL",
+    ["stage", "index"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+STAGE_ITEMS = Counter(
+    "etl_stage_items_total",
+    "Строки, прочитанные из Postgres, и документы, собранные и загруженные",
+    ["stage", "index"],
+)
+BULK_RETRIES = Counter(
+    "etl_bulk_retries_total",
+    "Документы, отправленные в Elasticsearch повторно после 429/5xx",
+    ["index"],
+)
+BULK_FAILURES = Counter(
+    "etl_bulk_failures_total",
+    "Документы, не загруженные в Elasticsearch: dead_letter - отклонены, "
+    "failed - не загружены после всех повторов",
+    ["index", "reason"],
+)
+PIPELINE_IN_FLIGHT = Gauge(
+    "etl_pipeline_in_flight_batches",
+    "Пачки, которые сейчас преобразуются или загружаются",
+)
+WATERMARK_AGE = Gauge(
+    "etl_watermark_age_seconds",
+    "Отставание источника: возраст watermark, 0 - новых изменений нет",
+    ["source"],
+)
+CYCLE_SECONDS = Histogram(
+    "etl_cycle_duration_seconds",
+    "Время одного цикла инкрементальной загрузки",
+)
+
+
+def observe_stage(stage: str, index: str, seconds: float, items: int) -> None:
+    STAGE_SECONDS.labels(stage, index).observe(seconds)
+    STAGE_ITEMS.labels(stage, index).inc(items)
+
+
+@contextmanager
+def timed(histogram: Histogram) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - started)
+
+
+def set_watermark_age(source: str, watermark: Optional[Watermark]) -> None:
+    """Возраст watermark источника; None - источник догнан."""
+    if watermark is None:
+        WATERMARK_AGE.labels(source).set(0)
+        return
+
+    modified = datetime.fromisoformat(watermark.modified)
+    if modified.tzinfo is None:
+        modified = modified.replace(tzinfo=timezone.utc)
+
+    WATERMARK_AGE.labels(source).set(
+        (datetime.now(timezone.utc) - modified).total_seconds()
+    )
+
+
+def start_metrics_server(port: int) -> None:
+    """Отдавать метрики по HTTP на /metrics; port 0 - не отдавать."""
+    if port:
+        start_http_server(port)
+        logger.info(f"Метрики доступны на порту {port}")
+
+
+def push_metrics(gateway: Optional[str], job: str) -> None:
+    """Отправить метрики в Pushgateway, если он настроен."""
+    if not gateway:
+        return
+
+    try:
+        push_to_gateway(gateway, job=job, registry=REGISTRY)
+    except OSError as err:
+        logger.warning(f"Не удалось отправить метрики в {gateway}: {err}")
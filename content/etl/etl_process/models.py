@@ -23,3 +23,9 @@ class Person(BaseModel):
     id: str
     full_name: str
     films: Any
+
+
+class Genre(BaseModel):
+    id: str
+    name: str
+    description: Optional[str]
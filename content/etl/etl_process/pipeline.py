@@ -0,0 +1,187 @@
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, NamedTuple, TypeVar
+
+from .metrics import EXTRACT, LOAD, PIPELINE_IN_FLIGHT, TRANSFORM, observe_stage
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _Failure(NamedTuple):
+    error: BaseException
+
+
+def _timed_transform(transform: Callable[[list[dict]], list], batch: list[dict]):
+    """Преобразовать пачку и вернуть документы вместе со временем работы."""
+    started = time.perf_counter()
+    documents = transform(batch)
+    return documents, time.perf_counter() - started
+
+
+def _timed_batches(batches: Iterable[list[dict]], index: str) -> Iterator[list[dict]]:
+    """Пачки источника со временем ожидания каждой в метрике extract."""
+    iterator = iter(batches)
+
+    while True:
+        started = time.perf_counter()
+        batch = next(iterator, None)
+        if batch is None:
+            return
+
+        observe_stage(EXTRACT, index, time.perf_counter() - started, len(batch))
+        yield batch
+
+
+def prefetch(items: Iterable[T], depth: int) -> Iterator[T]:
+    """
+    Читать items в отдельном потоке, держа наготове до depth элементов.
+    Пока потребитель преобразует и загружает очередную пачку, поток уже
+    выбирает следующую из Postgres. При depth <= 0 items читаются как есть.
+    Исключение источника поднимается у потребителя.
+    """
+    if depth <= 0:
+        yield from items
+        return
+
+    buffer = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    iterator = iter(items)
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in iterator:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as err:
+            put(_Failure(err))
+        finally:
+            # Генератор закрывается в своём потоке: серверный курсор не останется открытым
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=produce, name="etl-prefetch", daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item = buffer.get()
+
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+class Pipeline:
+    """
+    Этапы ETL, работающие одновременно: пока очередная пачка строк читается
+    из Postgres, предыдущие преобразуются в пуле процессов (pydantic упирается
+    в GIL) и загружаются в Elasticsearch в пуле потоков.
+    В работе одновременно не больше queue_size пачек: источник не читается
+    дальше, пока самая старая пачка не загружена. Результаты собираются в
+    порядке пачек, поэтому watermark сдвигается, только если загружены все.
+    """
+
+    def __init__(self, transform_workers: int, load_workers: int, queue_size: int):
+        self.queue_size = max(queue_size, 1)
+        self.transform_pool = None
+        if transform_workers > 0:
+            # forkserver: рабочие процессы не наследуют потоки и соединения ETL
+            self.transform_pool = ProcessPoolExecutor(
+                max_workers=transform_workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        self.load_pool = ThreadPoolExecutor(
+            max_workers=max(load_workers, 1), thread_name_prefix="etl-load"
+        )
+
+    def run(
+        self,
+        batches: Iterable[list[dict]],
+        transform: Callable[[list[dict]], list],
+        load: Callable[[list], bool],
+        index: str = "",
+    ) -> bool:
+        """
+        Прогнать пачки через transform и load. transform выполняется в другом
+        процессе и должен быть picklable (например, метод DataTransform).
+        index - алиас, под которым время этапов попадает в метрики.
+        """
+        loaded = True
+        in_flight = deque()
+
+        for batch in _timed_batches(batches, index):
+            if self.transform_pool is not None:
+                transformed = self.transform_pool.submit(_timed_transform, transform, batch)
+                in_flight.append(
+                    self.load_pool.submit(self._load, transformed, load, index)
+                )
+            else:
+                in_flight.append(
+                    self.load_pool.submit(
+                        self._transform_and_load, batch, transform, load, index
+                    )
+                )
+            PIPELINE_IN_FLIGHT.set(len(in_flight))
+
+            if len(in_flight) >= self.queue_size:
+                loaded = in_flight.popleft().result() and loaded
+
+        while in_flight:
+            loaded = in_flight.popleft().result() and loaded
+            PIPELINE_IN_FLIGHT.set(len(in_flight))
+
+        return loaded
+
+    @classmethod
+    def _load(cls, transformed: Future, load: Callable[[list], bool], index: str) -> bool:
+        return cls._observe_and_load(*transformed.result(), load, index)
+
+    @classmethod
+    def _transform_and_load(
+        cls,
+        batch: list[dict],
+        transform: Callable[[list[dict]], list],
+        load: Callable[[list], bool],
+        index: str,
+    ) -> bool:
+        return cls._observe_and_load(*_timed_transform(transform, batch), load, index)
+
+    @staticmethod
+    def _observe_and_load(
+        documents: list, elapsed: float, load: Callable[[list], bool], index: str
+    ) -> bool:
+        observe_stage(TRANSFORM, index, elapsed, len(documents))
+
+        started = time.perf_counter()
+        loaded = load(documents)
+        observe_stage(LOAD, index, time.perf_counter() - started, len(documents))
+
+        return loaded
+
+    def shutdown(self) -> None:
+        if self.transform_pool is not None:
+            self.transform_pool.shutdown()
+        self.load_pool.shutdown()
@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from state.state import State
+from state.watermark import Watermark, get_state_key
+
+from .es_loader import ElasticsearchLoader
+from .extract_data import WATERMARK_TABLES, PostgresExtractor
+
+# Повторы незагруженной пачки при догоняющем проходе
+CATCH_UP_RETRIES = 5
+CATCH_UP_START_SLEEP = 1
+CATCH_UP_MAX_SLEEP = 30
+
+
+class IndexRebuilder:
+    """
+    Пересборка индексов в новые версии без остановки поиска.
+    Пока версия собирается, основной загрузчик пишет изменения и в неё.
+    После полной загрузки изменения с момента старта догоняются по watermark,
+    снятым перед началом, и алиас переключается одним запросом.
+    Если догнать изменения не удалось, алиас не переключается, а новые
+    версии удаляются.
+    """
+
+    def __init__(
+        self,
+        live_loader: ElasticsearchLoader,
+        state: State,
+        make_extractor: Callable[[ElasticsearchLoader], PostgresExtractor],
+    ):
+        self.live_loader = live_loader
+        self.state = state
+        self.make_extractor = make_extractor
+        self.thread: Optional[threading.Thread] = None
+        self.logger = logging.getLogger("rebuild")
+
+    def get_drifted(self) -> list[str]:
+        """Алиасы, схема которых отличается от JSON-файлов ETL."""
+        manager = self.live_loader.index_manager
+        return [alias for alias in manager.schemas if manager.has_drift(alias)]
+
+    def start(self, aliases: list[str], default_watermark: Watermark) -> None:
+        """Пересобрать индексы в фоновом потоке."""
+        if self.thread is not None and self.thread.is_alive():
+            self.logger.warning("Rebuild is already running")
+            return
+
+        self.thread = threading.Thread(
+            target=self.rebuild,
+            args=(aliases, default_watermark),
+            name="etl-rebuild",
+            daemon=True,
+        )
+        self.thread.start()
+
+    def rebuild(self, aliases: list[str], default_watermark: Watermark) -> bool:
+        self.logger.info(f"Rebuilding {', '.join(aliases)}")
+
+        loader = ElasticsearchLoader(self.live_loader.versions)
+        extractor = self.make_extractor(loader)
+        manager = loader.index_manager
+        # Watermark снимаются до начала двойной записи: всё, что изменится
+        # позже, попадёт в новую версию при догоняющем проходе
+        watermarks = {
+            table_name: Watermark.from_state(
+                self.state.get_state(get_state_key(table_name)), default_watermark
+            )
+            for table_name in WATERMARK_TABLES
+        }
+        new_indices = {alias: manager.create_index(alias, bulk=True) for alias in aliases}
+        loader.targets = dict(new_indices)
+        self.live_loader.rebuilds.update(new_indices)
+        loaded = False
+
+        try:
+            loaded = extractor.reindex_all(aliases)
+
+            if loaded:
+                self.logger.info("Full load finished, catching up")
+                loaded = self.catch_up(extractor, aliases, watermarks)
+
+            if loaded:
+                for alias, index in new_indices.items():
+                    manager.finalize(alias, index)
+                    self.live_loader.rebuilds.pop(alias, None)
+                    self.live_loader.versions.bump(alias)
+        finally:
+            for alias, index in new_indices.items():
+                if self.live_loader.rebuilds.pop(alias, None) is not None:
+                    manager.drop(index)
+
+            extractor.close()
+
+        if loaded:
+            self.logger.info(f"Rebuild of {', '.join(aliases)} finished")
+        else:
+            self.logger.error("Rebuild failed, aliases were not switched")
+
+        return loaded
+
+    def catch_up(
+        self,
+        extractor: PostgresExtractor,
+        aliases: list[str],
+        watermarks: dict[str, Watermark],
+    ) -> bool:
+        """
+        Загрузить изменения после watermark, пока они не закончатся.
+        Watermark сдвигаются только после загрузки пачки, незагруженная пачка
+        повторяется с паузой. False, если пачку так и не удалось загрузить.
+        """
+        failures = 0
+
+        while True:
+            changes, new_watermarks = extractor.collect_changes(watermarks)
+            if not changes:
+                return True
+
+            if extractor.process_changes(changes, aliases):
+                watermarks.update(new_watermarks)
+                failures = 0
+                continue
+
+            failures += 1
+            if failures >= CATCH_UP_RETRIES:
+                self.logger.error(f"Catch-up failed {failures} times, giving up")
+                return False
+
+            delay = min(CATCH_UP_START_SLEEP * 2 ** (failures - 1), CATCH_UP_MAX_SLEEP)
+            self.logger.warning(f"Catch-up batch was not loaded, retrying in {delay}s")
+            time.sleep(delay)
@@ -0,0 +1,27 @@
+import logging
+import time
+
+
+class PollScheduler:
+    """
+    Интервал опроса Postgres.
+    Пока изменения есть, следующий цикл запускается сразу. Если изменений нет,
+    ожидание растёт в factor раз до max_interval и сбрасывается при первых
+    же изменениях.
+    """
+
+    def __init__(self, interval: float, max_interval: float, factor: float = 2):
+        self.interval = interval
+        self.max_interval = max_interval
+        self.factor = factor
+        self.current = interval
+        self.logger = logging.getLogger("main")
+
+    def wait(self, changed: bool) -> None:
+        if changed:
+            self.current = self.interval
+            return
+
+        self.logger.debug(f"No changes, sleeping {self.current}s")
+        time.sleep(self.current)
+        self.current = min(self.current * self.factor, self.max_interval)
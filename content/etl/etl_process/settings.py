@@ -1,5 +1,7 @@
 import os
+from typing import Literal, Optional
 
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -27,3 +29,57 @@ class ElasticsearchSettings(BaseSettings):
 
     elastic_host: str
     elastic_port: int
+    elastic_chunk_size: int = 500
+    elastic_max_chunk_bytes: int = 10 * 1024 * 1024
+    elastic_max_retries: int = 3
+    elastic_initial_backoff: float = 1.0
+    elastic_max_backoff: float = 30.0
+    elastic_dead_letter_file: str = "dead_letter.jsonl"
+
+
+class RedisSettings(BaseSettings):
+    model_config = SettingsConfigDict(extra="ignore", env_file=env_path)
+
+    redis_host: str
+    redis_port: int = 6379
+
+
+class EtlSettings(BaseSettings):
+    model_config = SettingsConfigDict(extra="ignore", env_file=env_path)
+
+    etl_poll_interval: float = 1.0
+    etl_max_poll_interval: float = 30.0
+    etl_batch_size: int = 1000
+    etl_cdc_enabled: bool = False
+    etl_itersize: int = 1000
+    etl_prefetch_depth: int = 0
+    # rows - строка на каждую пару (персона, жанр), aggregated - документ собирается в SQL
+    etl_extract_mode: Literal["rows", "aggregated"] = "rows"
+    etl_validate_documents: bool = True
+    etl_transform_workers: int = 0
+    etl_load_workers: int = 1
+    etl_pipeline_queue_size: int = 4
+    # Где хранятся watermark: file - локальный JSON, redis/postgres - общие для реплик
+    etl_state_backend: Literal["file", "redis", "postgres"] = "file"
+    etl_state_file: str = "state_file.json"
+    # Число шардов id документов; больше 1 - воркеры делят шарды через
+    # advisory-блокировки Postgres. Нужно общее хранилище состояния, а
+    # пересборка индексов при шардировании не запускается
+    etl_shards: int = 1
+    # sync - синхронный PostgresExtractor, async - AsyncPostgresExtractor
+    etl_engine: Literal["sync", "async"] = "sync"
+    etl_async_concurrency: int = 4
+    # Порт HTTP-сервера метрик Prometheus, 0 - не запускать
+    etl_metrics_port: int = 9108
+    # Адрес Pushgateway, куда метрики отправляются после каждого цикла
+    etl_metrics_pushgateway: Optional[str] = None
+    etl_metrics_job: str = "etl"
+
+    @model_validator(mode="after")
+    def check_shared_state(self) -> "EtlSettings":
+        # Шард переходит между воркерами вместе с watermark, а файл у каждого свой
+        if self.etl_shards > 1 and self.etl_state_backend == "file":
+            raise ValueError(
+                "ETL_SHARDS > 1 требует общего ETL_STATE_BACKEND: redis или postgres"
+            )
+        return self
@@ -0,0 +1,136 @@
+import logging
+import math
+import uuid
+from typing import Callable, NamedTuple, Optional
+
+import psycopg
+
+from .backoff import backoff
+
+# Первые ключи advisory-блокировок: шард ETL и присутствие воркера
+SHARD_LOCK_NAMESPACE = 7301
+WORKER_LOCK_NAMESPACE = 7302
+
+
+def shard_of(document_id: str, count: int) -> int:
+    """Шард документа: остаток от деления его uuid на число шардов."""
+    return uuid.UUID(str(document_id)).int % count
+
+
+class ShardSet(NamedTuple):
+    """Шарды, документы которых обрабатывает воркер, из count шардов."""
+
+    numbers: frozenset[int]
+    count: int
+
+    def owns(self, document_id: str) -> bool:
+        return shard_of(document_id, self.count) in self.numbers
+
+    def filter(self, ids) -> list:
+        return [i for i in ids if self.owns(i)]
+
+
+class ShardLeases:
+    """
+    Аренда шардов через advisory-блокировки Postgres.
+    Блокировка держится сессией, поэтому шарды упавшего воркера освобождаются
+    вместе с его соединением. Каждый воркер держит разделяемую блокировку
+    присутствия: по их числу rebalance() считает справедливую долю шардов,
+    отдаёт лишние и забирает свободные. Вызывается между циклами ETL, когда
+    watermark шардов уже сохранены. Получив шард, воркер вызывает
+    on_acquire: watermark шарда мог сдвинуть его прежний владелец.
+    """
+
+    def __init__(
+        self,
+        dsn: dict,
+        count: int,
+        on_acquire: Optional[Callable[[], None]] = None,
+    ):
+        self.dsn = dsn
+        self.count = count
+        self.on_acquire = on_acquire
+        self.conn = None
+        self.owned: set[int] = set()
+        self.logger = logging.getLogger("shards")
+
+    @backoff()
+    def make_db_connection(self) -> Optional[psycopg.Connection]:
+        self.logger.info("Регистрация воркера ETL...")
+
+        try:
+            connection = psycopg.connect(**self.dsn, autocommit=True)
+            connection.execute(
+                "SELECT pg_advisory_lock_shared(%s, 0)", (WORKER_LOCK_NAMESPACE,)
+            )
+            self.logger.info("Воркер ETL зарегистрирован")
+        except psycopg.OperationalError:
+            connection = None
+            self.logger.exception("Ошибка подключения к Postgres!")
+
+        return connection
+
+    def connect(self) -> None:
+        self.close()
+        self.conn = self.make_db_connection()
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+        self.owned.clear()
+
+    def count_workers(self) -> int:
+        row = self.conn.execute(
+            """
+            SELECT count(*) FROM pg_locks
+            WHERE locktype = 'advisory' AND classid = %s AND granted;
+            """,
+            (WORKER_LOCK_NAMESPACE,),
+        ).fetchone()
+        return max(row[0], 1)
+
+    def try_acquire(self, shard: int) -> bool:
+        row = self.conn.execute(
+            "SELECT pg_try_advisory_lock(%s, %s)", (SHARD_LOCK_NAMESPACE, shard)
+        ).fetchone()
+        return row[0]
+
+    def release(self, shard: int) -> None:
+        self.conn.execute(
+            "SELECT pg_advisory_unlock(%s, %s)", (SHARD_LOCK_NAMESPACE, shard)
+        )
+
+    def rebalance(self) -> ShardSet:
+        """Привести число арендованных шардов к доле воркера и вернуть их."""
+        if self.conn is None:
+            self.connect()
+
+        acquired = False
+
+        try:
+            share = math.ceil(self.count / self.count_workers())
+
+            while len(self.owned) > share:
+                shard = max(self.owned)
+                self.release(shard)
+                self.owned.discard(shard)
+                self.logger.info(f"Shard {shard} released")
+
+            for shard in range(self.count):
+                if len(self.owned) >= share:
+                    break
+                if shard not in self.owned and self.try_acquire(shard):
+                    self.owned.add(shard)
+                    acquired = True
+                    self.logger.info(f"Shard {shard} acquired")
+        except psycopg.OperationalError:
+            # Вместе с сессией потеряны и блокировки
+            self.logger.exception("Соединение аренды шардов прервано")
+            self.close()
+
+        if acquired and self.on_acquire is not None:
+            self.on_acquire()
+
+        return ShardSet(frozenset(self.owned), self.count)
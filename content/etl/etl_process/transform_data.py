@@ -1,42 +1,199 @@
 import logging
 
-from pydantic import ValidationError
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from .models import Genre, Movie, Person
+
+ROLES = ("director", "actor", "writer")
+
+ADAPTERS = {
+    Movie: TypeAdapter(list[Movie]),
+    Person: TypeAdapter(list[Person]),
+    Genre: TypeAdapter(list[Genre]),
+}
+
+
+class MovieRecord:
+    """Фильм, собираемый из строк join: жанры и персоны по ролям хранятся по id."""
+
+    __slots__ = (
+        "id",
+        "imdb_rating",
+        "title",
+        "creation_date",
+        "description",
+        "file_path",
+        "genres",
+        "persons",
+    )
+
+    def __init__(self, raw_dict: dict):
+        self.id = str(raw_dict["fw_id"])
+        self.imdb_rating = raw_dict["rating"]
+        self.title = raw_dict["title"]
+        self.creation_date = raw_dict["creation_date"]
+        self.description = raw_dict["description"]
+        self.file_path = raw_dict["file_path"]
+        self.genres = {}
+        self.persons = {role: {} for role in ROLES}
+
+    def add(self, raw_dict: dict) -> None:
+        genre_id = raw_dict["g_id"]
+        if genre_id is not None and genre_id not in self.genres:
+            self.genres[genre_id] = {
+                "id": str(genre_id),
+                "name": raw_dict["name"],
+                "description": raw_dict["g_description"],
+            }
+
+        persons = self.persons.get(raw_dict["role"])
+        person_id = raw_dict["id"]
+        if persons is not None and person_id not in persons:
+            persons[person_id] = {"id": str(person_id), "name": raw_dict["full_name"]}
+
+    def to_document(self) -> dict:
+        document = {
+            "id": self.id,
+            "imdb_rating": self.imdb_rating,
+            "title": self.title,
+            "creation_date": self.creation_date,
+            "description": self.description,
+            "file_path": self.file_path,
+            "genres": list(self.genres.values()),
+        }
+
+        for role in ROLES:
+            persons = list(self.persons[role].values())
+            document[f"{role}s"] = persons
+            document[f"{role}s_names"] = [person["name"] for person in persons]
+
+        return document
+
+
+class FilmPersonsRecord:
+    """Персоны фильма по ролям для частичного обновления документа."""
+
+    __slots__ = ("id", "persons")
+
+    def __init__(self, raw_dict: dict):
+        self.id = str(raw_dict["film_id"])
+        self.persons = {role: {} for role in ROLES}
+
+    def add(self, raw_dict: dict) -> None:
+        persons = self.persons.get(raw_dict["role"])
+        person_id = raw_dict["id"]
+        if persons is not None and person_id not in persons:
+            persons[person_id] = {"id": str(person_id), "name": raw_dict["full_name"]}
+
+    def to_document(self) -> dict:
+        document = {"id": self.id}
+
+        for role in ROLES:
+            persons = list(self.persons[role].values())
+            document[f"{role}s"] = persons
+            document[f"{role}s_names"] = [person["name"] for person in persons]
+
+        return document
 
-from .models import Movie, Person
+
+class PersonRecord:
+    """Персона, собираемая из строк join: роли хранятся по id фильма."""
+
+    __slots__ = ("id", "full_name", "films")
+
+    def __init__(self, raw_dict: dict):
+        self.id = str(raw_dict["person_id"])
+        self.full_name = raw_dict.get("full_name")
+        self.films = {}
+
+    def add(self, raw_dict: dict) -> None:
+        roles = self.films.setdefault(raw_dict["film_id"], {})
+        roles[raw_dict["role"]] = None
+
+    def to_document(self) -> dict:
+        return {
+            "id": self.id,
+            "full_name": self.full_name,
+            "films": [
+                {"id": str(film_id), "roles": list(roles)}
+                for film_id, roles in self.films.items()
+            ],
+        }
 
 
 class DataTransform:
     """
     данные преобразуются из формата Postgres в формат, пригодный для Elasticsearch.
     тот этап можно пропустить, если преобразования не требуется.
+
+    validate=False отдаёт загрузчику словари без проверки pydantic-моделями.
     """
 
-    def __init__(self):
+    def __init__(self, validate: bool = True):
+        self.validate_documents = validate
         self.logger = logging.getLogger("data_transform")
 
+    def validate(self, model: type[BaseModel], documents: list[dict]) -> list:
+        """
+        Проверить документы одним вызовом TypeAdapter. Если пачка не прошла,
+        документы проверяются по одному, чтобы отбросить только ошибочные.
+        """
+        if not self.validate_documents:
+            return documents
+
+        try:
+            return ADAPTERS[model].validate_python(documents)
+        except ValidationError:
+            pass
+
+        valid_documents = []
+        for document in documents:
+            try:
+                valid_documents.append(model.model_validate(document))
+            except ValidationError as err:
+                self.logger.exception(err)
+
+        return valid_documents
+
+    @staticmethod
+    def group_records(record_type: type, key: str, raw_data: list[dict]) -> list[dict]:
+        """Свернуть строки join в документы, по записи record_type на значение key."""
+        records = {}
+
+        for dict_ in raw_data:
+            record = records.get(dict_[key])
+            if record is None:
+                record = records[dict_[key]] = record_type(dict_)
+            record.add(dict_)
+
+        return [record.to_document() for record in records.values()]
+
     def transform_movies_pgdata_to_esdata(self, raw_data: list[dict]):
         """Данные преобразуются из формата Postgres в формат, пригодный для Elasticsearch"""
-        data_to_transfer = []
-        schema = {}
-        for dict_ in raw_data:
-            role = dict_["role"]
-            id_ = schema.setdefault("id", str(dict_["fw_id"]))
-
-            if id_ == str(dict_["fw_id"]):
-                self.transform_raw_dict_for_movies(schema, role, dict_)
-            else:
-                try:
-                    data_to_transfer.append(Movie(**schema))
-                except ValidationError as err:
-                    self.logger.exception(err)
-                schema = {}
-                self.transform_raw_dict_for_movies(schema, role, dict_)
+        return self.validate(Movie, self.group_records(MovieRecord, "fw_id", raw_data))
 
-        try:
-            data_to_transfer.append(Movie(**schema))
-        except ValidationError as err:
-            self.logger.exception(err)
-        return data_to_transfer
+    def transform_aggregated_movies(self, raw_data: list[dict]):
+        """Фильмы, собранные в Postgres через jsonb_agg: одна строка - один документ"""
+        documents = []
+
+        for dict_ in raw_data:
+            document = {
+                "id": str(dict_["fw_id"]),
+                "imdb_rating": dict_["rating"],
+                "title": dict_["title"],
+                "creation_date": dict_["creation_date"],
+                "description": dict_["description"],
+                "file_path": dict_["file_path"],
+                "genres": dict_["genres"],
+            }
+            for role in ROLES:
+                persons = dict_[f"{role}s"]
+                document[f"{role}s"] = persons
+                document[f"{role}s_names"] = [person["name"] for person in persons]
+
+            documents.append(document)
+
+        return self.validate(Movie, documents)
 
     def transform_persons_pgdata_to_esdata(self, raw_data: list[dict]):
         """
@@ -45,120 +202,52 @@ class DataTransform:
         person_schema: {id: 22, full_name: George Lucas, films: [{id: 123, roles: 'actor', 'writer'}, ...]}
         film_schema: {id: 123, roles: 'actor', 'writer'}
         """
-        data_to_transfer = []
-        person_schema = {}
-        film_schema = {}
-        role_set = set()
-
-        for dict_ in raw_data:
-            person_schema.setdefault("full_name", dict_["full_name"])
-            person_id = person_schema.setdefault("id", str(dict_["person_id"]))
-
-            if person_id == str(dict_["person_id"]):
-                films_list = person_schema.setdefault("films", [])
-
-                film_id = film_schema.setdefault("id", str(dict_["film_id"]))
-                if film_id == str(dict_["film_id"]):
-                    role_set.add(dict_["role"])
-                    film_schema.update({"roles": [role for role in role_set]})
-                else:
-                    if film_schema not in films_list:
-                        films_list.append(film_schema)
-                    role_set = set()
-                    film_schema = {}
-                    film_schema.setdefault("id", str(dict_["film_id"]))
-                    role_set.add(dict_["role"])
-                    film_schema.update({"roles": [role for role in role_set]})
-            else:
-                if film_schema not in films_list:
-                    films_list.append(film_schema)
-                person_schema.update({"films": films_list})
-                data_to_transfer.append(Person(**person_schema))
-                person_schema = {}
-                film_schema = {}
-                role_set = set()
-
-                film_id = film_schema.setdefault("id", str(dict_["film_id"]))
-
-                if film_id == str(dict_["film_id"]):
-                    role_set.add(dict_["role"])
-                    film_schema.update({"roles": [role for role in role_set]})
-        return data_to_transfer
+        return self.validate(
+            Person, self.group_records(PersonRecord, "person_id", raw_data)
+        )
 
-    @staticmethod
-    def transform_raw_dict_for_movies(schema: dict, role: str, raw_dict: dict) -> None:
-        schema.setdefault("id", str(raw_dict["fw_id"]))
-        schema.setdefault("imdb_rating", raw_dict["rating"])
-        schema.setdefault("title", raw_dict["title"])
-        schema.setdefault("creation_date", raw_dict["creation_date"])
-        schema.setdefault("description", raw_dict["description"])
-        schema.setdefault("file_path", raw_dict["file_path"])
-        schema.setdefault("genres", [])
-        schema.setdefault("directors_names", [])
-        schema.setdefault("actors_names", [])
-        schema.setdefault("writers_names", [])
-        schema.setdefault("directors", [])
-        schema.setdefault("actors", [])
-        schema.setdefault("writers", [])
-
-        value = {"id": str(raw_dict["id"]), "name": raw_dict["full_name"]}
-        value_name = value["name"]
-        genre_value = {
-            "id": str(raw_dict["g_id"]),
-            "name": raw_dict["name"],
-            "description": raw_dict["g_description"],
-        }
+    def transform_films_persons(self, raw_data: list[dict]) -> list[dict]:
+        """Частичные документы фильмов: id и персоны по ролям"""
+        return self.group_records(FilmPersonsRecord, "film_id", raw_data)
 
-        genres_list = schema.setdefault("genres", [genre_value])
-        if genre_value not in genres_list:
-            genres_list.append(genre_value)
-            schema.update({"genres": genres_list})
-
-        if role == "director":
-            directors_list = schema.setdefault("directors", [value])
-            directors_names_list = schema.setdefault("directors_names", [value_name])
-            if value not in directors_list:
-                directors_list.append(value)
-                directors_names_list.append(value_name)
-                schema.update({"directors": directors_list})
-                schema.update({"directors_names": directors_names_list})
-
-        if role == "actor":
-            actors_list = schema.setdefault("actors", [value])
-            actors_names_list = schema.setdefault("actors_names", [value_name])
-            if value not in actors_list:
-                actors_list.append(value)
-                actors_names_list.append(value_name)
-                schema.update({"actors": actors_list})
-                schema.update({"actors_names": actors_names_list})
-
-        if role == "writer":
-            writers_list = schema.setdefault("writers", [value])
-            writers_names_list = schema.setdefault("writers_names", [value_name])
-            if value not in writers_list:
-                writers_list.append(value)
-                writers_names_list.append(value_name)
-                schema.update({"writers": writers_list})
-                schema.update({"writers_names": writers_names_list})
+    def transform_films_genres(self, raw_data: list[dict]) -> list[dict]:
+        """Частичные документы фильмов: id и жанры"""
+        documents = {}
 
-    @staticmethod
-    def transform_raw_dict_for_persons(
-        schema: dict, schema_film: dict, raw_dict: dict
-    ) -> None:
-        schema.setdefault("id", str(raw_dict["person_id"]))
-        schema.setdefault("full_name", raw_dict["full_name"])
-        schema.setdefault("films", [])
-
-        value = {"id": str(raw_dict["id"]), "name": raw_dict["full_name"]}
-        genre_value = {
-            "id": str(raw_dict["g_id"]),
-            "name": raw_dict["name"],
-            "description": raw_dict["g_description"],
-        }
-
-        films_value = {"id": str(raw_dict["film_id"]), "roles": []}
-
-        films_list = schema.setdefault("films", [films_value])
-        if films_value not in films_list:
-            films_list.append(genre_value)
-            schema.update({"films": films_list})
+        for dict_ in raw_data:
+            genres = documents.setdefault(str(dict_["film_id"]), {})
+            genres.setdefault(
+                dict_["id"],
+                {
+                    "id": str(dict_["id"]),
+                    "name": dict_["name"],
+                    "description": dict_["description"],
+                },
+            )
+
+        return [
+            {"id": film_id, "genres": list(genres.values())}
+            for film_id, genres in documents.items()
+        ]
+
+    def transform_persons_films(self, raw_data: list[dict]) -> list[dict]:
+        """Частичные документы персон: id и фильмы с ролями"""
+        documents = self.group_records(PersonRecord, "person_id", raw_data)
+
+        for document in documents:
+            del document["full_name"]
+
+        return documents
+
+    def transform_genres_pgdata_to_esdata(self, raw_data: list[dict]):
+        """Данные преобразуются из формата Postgres в формат, пригодный для Elasticsearch"""
+        documents = [
+            {
+                "id": str(dict_["id"]),
+                "name": dict_["name"],
+                "description": dict_["description"],
+            }
+            for dict_ in raw_data
+        ]
+
+        return self.validate(Genre, documents)
@@ -0,0 +1,38 @@
+import logging
+
+from redis import Redis
+from redis.exceptions import RedisError
+
+from .settings import RedisSettings
+
+VERSION_KEY_PREFIX = "index_version"
+INVALIDATION_CHANNEL = "index_versions"
+
+
+class IndexVersions:
+    """
+    Версии индексов Elasticsearch, которые ETL хранит в Redis.
+    API сравнивает версию со своей локальной копией и перечитывает данные,
+    если индекс изменился. Об изменении версии ETL также сообщает в канал
+    Redis, чтобы воркеры API сразу сбросили локальные кэши.
+    """
+
+    def __init__(self):
+        settings = RedisSettings()
+
+        self.connection = Redis(host=settings.redis_host, port=settings.redis_port)
+        self.logger = logging.getLogger("main")
+
+    @staticmethod
+    def get_key(index_name: str) -> str:
+        return f"{VERSION_KEY_PREFIX}:{index_name}"
+
+    def bump(self, index_name: str) -> None:
+        """Увеличить версию индекса после успешной загрузки документов."""
+        try:
+            pipeline = self.connection.pipeline()
+            pipeline.incr(self.get_key(index_name))
+            pipeline.publish(INVALIDATION_CHANNEL, index_name)
+            pipeline.execute()
+        except RedisError as err:
+            self.logger.exception(f"Не удалось обновить версию индекса {index_name}\n{err}")
@@ -1,34 +1,295 @@
+import argparse
+import enum
 import logging
 import time
-from datetime import datetime
+from typing import Callable, Optional
+
+import psycopg
+from redis import Redis
 
 from config.logging_config import init_logging
-from etl_process.es_loader import ElasticsearchLoader
-from etl_process.extract_data import PostgresExtractor
+from etl_process.async_engine import AsyncPostgresExtractor
+from etl_process.cdc import ChangeListener
+from etl_process.es_loader import INDEX_SCHEMAS, ElasticsearchLoader
+from etl_process.extract_data import WATERMARK_TABLES, PostgresExtractor
+from etl_process.metrics import (
+    CYCLE_SECONDS,
+    push_metrics,
+    set_watermark_age,
+    start_metrics_server,
+    timed,
+)
+from etl_process.rebuild import IndexRebuilder
+from etl_process.scheduler import PollScheduler
+from etl_process.settings import EtlSettings, RedisSettings
+from etl_process.shards import ShardLeases, ShardSet
 from etl_process.transform_data import DataTransform
+from etl_process.versions import IndexVersions
+from state.base_storage import BaseStorage
 from state.json_file_storage import JsonFileStorage
+from state.postgres_storage import PostgresStorage
+from state.redis_storage import RedisStorage
 from state.state import State
+from state.watermark import Watermark, get_state_key
+
+# Ключ состояния, в котором до перехода на watermark хранилась дата последней загрузки
+LEGACY_STATE_KEY = "state_key"
+
+logger = logging.getLogger("main")
+
+
+class CycleResult(enum.Enum):
+    """Итог цикла загрузки."""
+
+    CHANGED = "changed"  # изменения были и загружены
+    IDLE = "idle"  # изменений нет, источник догнан
+    FAILED = "failed"  # изменения есть, но не загружены: watermark не сдвинуты
+
+
+def make_storage(settings: EtlSettings, pg_extractor: PostgresExtractor) -> BaseStorage:
+    """Хранилище состояния по настройке ETL_STATE_BACKEND."""
+    if settings.etl_state_backend == "redis":
+        redis_settings = RedisSettings()
+        return RedisStorage(
+            Redis(host=redis_settings.redis_host, port=redis_settings.redis_port)
+        )
+
+    if settings.etl_state_backend == "postgres":
+        return PostgresStorage(pg_extractor.get_dsn())
+
+    return JsonFileStorage(settings.etl_state_file)
+
+
+def report_watermarks(lagging: dict[str, Watermark], shard: Optional[int]) -> None:
+    """Возраст watermark источников с изменениями, у остальных отставания нет."""
+    for table_name in WATERMARK_TABLES:
+        source = table_name if shard is None else f"{table_name}:{shard}"
+        set_watermark_age(source, lagging.get(table_name))
+
+
+def sync_changes(
+    state: State,
+    pg_extractor: PostgresExtractor,
+    default_watermark: Watermark,
+    shard: Optional[int] = None,
+    shard_count: int = 1,
+) -> CycleResult:
+    """
+    Один цикл: изменения всех таблиц собираются в общий набор, документы
+    загружаются по разу, и только потом сдвигаются watermark.
+    С shard загружаются только документы шарда, а watermark у шарда свои;
+    новый шард начинает с общего watermark.
+    """
+    watermarks = {
+        table_name: Watermark.from_state(
+            state.get_state(get_state_key(table_name, shard))
+            or state.get_state(get_state_key(table_name)),
+            default_watermark,
+        )
+        for table_name in WATERMARK_TABLES
+    }
+    logger.info(f"watermarks: {watermarks}")
+
+    changes, new_watermarks = pg_extractor.collect_changes(watermarks)
+
+    if not changes:
+        logger.info("There are no modifications.")
+        report_watermarks({}, shard)
+        return CycleResult.IDLE
+
+    shards = None if shard is None else ShardSet(frozenset({shard}), shard_count)
+    if not pg_extractor.process_changes(changes, shards=shards):
+        lagging = {table_name: watermarks[table_name] for table_name in changes}
+        report_watermarks(lagging, shard)
+        return CycleResult.FAILED
+
+    report_watermarks(new_watermarks, shard)
+
+    # Все watermark цикла сохраняются одной записью
+    state.set_states(
+        {
+            get_state_key(table_name, shard): watermark.to_state()
+            for table_name, watermark in new_watermarks.items()
+        }
+    )
+
+    return CycleResult.CHANGED
+
+
+def sync_shards(
+    state: State,
+    pg_extractor: PostgresExtractor,
+    default_watermark: Watermark,
+    leases: Optional[ShardLeases],
+) -> CycleResult:
+    """
+    Цикл по всем шардам воркера (без шардирования - по всем данным).
+    Ошибка любого шарда делает неудачным весь цикл.
+    """
+    if leases is None:
+        return sync_changes(state, pg_extractor, default_watermark)
+
+    shards = leases.rebalance()
+    results = {
+        sync_changes(state, pg_extractor, default_watermark, shard, shards.count)
+        for shard in sorted(shards.numbers)
+    }
+
+    for result in (CycleResult.FAILED, CycleResult.CHANGED):
+        if result in results:
+            return result
+
+    return CycleResult.IDLE
+
+
+def run_cycle(
+    state: State,
+    pg_extractor: PostgresExtractor,
+    default_watermark: Watermark,
+    leases: Optional[ShardLeases],
+    settings: EtlSettings,
+) -> CycleResult:
+    """Цикл по шардам воркера с замером времени и отправкой метрик."""
+    with timed(CYCLE_SECONDS):
+        result = sync_shards(state, pg_extractor, default_watermark, leases)
+
+    push_metrics(settings.etl_metrics_pushgateway, settings.etl_metrics_job)
+    return result
+
+
+def listen_changes(
+    listener: ChangeListener,
+    pg_extractor: PostgresExtractor,
+    timeout: float,
+    sync: Callable[[], CycleResult],
+    leases: Optional[ShardLeases] = None,
+) -> None:
+    """
+    Индексировать изменения из LISTEN/NOTIFY, пока подписка жива.
+    Уведомления не сдвигают watermark, поэтому в паузах без уведомлений и не
+    реже раза в timeout секунд сохранённое состояние догоняет циклами sync,
+    пока изменений не останется: иначе после перезапуска или обрыва подписки
+    сканирование повторило бы всё, что загружено по уведомлениям.
+    Возврат означает, что нужно догнать пропущенное сканированием по watermark:
+    в том числе когда воркеру достались новые шарды.
+    """
+    shards = None if leases is None else leases.rebalance()
+    synced_at = time.monotonic()
+
+    while True:
+        try:
+            changes = listener.wait(timeout)
+        except psycopg.OperationalError:
+            logger.exception("Подписка на изменения прервана")
+            return
+
+        if changes and not pg_extractor.process_changes(changes, shards=shards):
+            logger.warning("Не все изменения загружены, переход к сканированию")
+            return
+
+        if not changes or time.monotonic() - synced_at >= timeout:
+            while (result := sync()) is CycleResult.CHANGED:
+                pass
+            synced_at = time.monotonic()
+
+            if result is CycleResult.FAILED:
+                logger.warning("Не все изменения загружены, переход к сканированию")
+                return
+
+        if leases is not None and leases.rebalance() != shards:
+            logger.info("Шарды воркера изменились, переход к сканированию")
+            return
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--full-reindex",
+        action="store_true",
+        help="перед инкрементальной загрузкой пересобрать индексы целиком",
+    )
+    args = parser.parse_args()
+
     init_logging()
-    logger = logging.getLogger("main")
     logger.info("Starting etl process...")
 
-    state = State(JsonFileStorage("state_file.json"))
-    es_loader = ElasticsearchLoader()
-    data_transformer = DataTransform()
-    pg_extractor = PostgresExtractor(es_loader, data_transformer)
+    settings = EtlSettings()
+    start_metrics_server(settings.etl_metrics_port)
+    es_loader = ElasticsearchLoader(IndexVersions())
+    if settings.etl_engine == "async":
+        pg_extractor = AsyncPostgresExtractor(
+            es_loader, DataTransform(validate=settings.etl_validate_documents)
+        )
+    else:
+        pg_extractor = PostgresExtractor(
+            es_loader, DataTransform(validate=settings.etl_validate_documents)
+        )
+    state = State(make_storage(settings, pg_extractor))
+    scheduler = PollScheduler(settings.etl_poll_interval, settings.etl_max_poll_interval)
+
+    default_watermark = Watermark.initial(state.get_state(LEGACY_STATE_KEY))
+
+    leases = None
+    if settings.etl_shards > 1:
+        leases = ShardLeases(
+            pg_extractor.get_dsn(), settings.etl_shards, on_acquire=state.reload
+        )
+
+    rebuilder = IndexRebuilder(
+        es_loader,
+        state,
+        lambda loader: PostgresExtractor(
+            loader, DataTransform(validate=settings.etl_validate_documents)
+        ),
+    )
+
+    if leases is not None:
+        # Во время пересборки в новую версию пишет только загрузчик самого
+        # пересборщика: изменения шардов других воркеров в неё бы не попали
+        if args.full_reindex:
+            parser.error("--full-reindex не поддерживается при ETL_SHARDS > 1")
+        if drifted := rebuilder.get_drifted():
+            logger.warning(
+                f"Схема {', '.join(drifted)} изменилась, но при шардировании "
+                "индексы не пересобираются: остановите воркеры и запустите "
+                "ETL с ETL_SHARDS=1 --full-reindex"
+            )
+    elif args.full_reindex:
+        rebuilder.rebuild(list(INDEX_SCHEMAS), default_watermark)
+    elif drifted := rebuilder.get_drifted():
+        # Поиск продолжает работать по старым версиям, пока новые собираются
+        rebuilder.start(drifted, default_watermark)
+
+    listener = None
+    if settings.etl_cdc_enabled:
+        listener = ChangeListener(pg_extractor.get_dsn())
+        listener.install_triggers()
 
     while True:
-        last_updated = state.get_state("state_key") or str(datetime.min)
-        logger.info(f"last_updated: {last_updated}")
+        if listener is None:
+            result = run_cycle(state, pg_extractor, default_watermark, leases, settings)
+            scheduler.wait(result is CycleResult.CHANGED)
+            continue
 
-        pg_extractor.fetch_movies_if_genres_changed(last_updated)
-        pg_extractor.fetch_movies_if_persons_changed(last_updated)
-        pg_extractor.fetch_movies_if_films_changed(last_updated)
+        # Подписка оформляется до сканирования: изменения, сделанные во время
+        # сканирования, придут уведомлениями и не потеряются
+        listener.connect()
 
-        pg_extractor.fetch_persons_if_persons_changed(last_updated)
+        # Слушать можно только догнав источник: незагруженные изменения
+        # повторяются сканированием с растущей паузой, а не ждут уведомлений
+        while (
+            result := run_cycle(state, pg_extractor, default_watermark, leases, settings)
+        ) is not CycleResult.IDLE:
+            scheduler.wait(result is CycleResult.CHANGED)
 
-        state.set_state("state_key", str(datetime.now()))
+        if listener.conn is None:
+            scheduler.wait(False)
+            continue
 
-        time.sleep(3600)
+        listen_changes(
+            listener,
+            pg_extractor,
+            settings.etl_max_poll_interval,
+            lambda: run_cycle(state, pg_extractor, default_watermark, leases, settings),
+            leases,
+        )
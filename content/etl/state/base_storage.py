@@ -2,6 +2,10 @@ import abc
 from typing import Any, Dict
 
 
+class StateCorruptedError(Exception):
+    """Сохранённое состояние не читается: продолжать с нуля нельзя."""
+
+
 class BaseStorage(abc.ABC):
     """Абстрактное хранилище состояния."""
 
@@ -12,3 +16,13 @@ class BaseStorage(abc.ABC):
     @abc.abstractmethod
     def retrieve_state(self) -> Dict[str, Any]:
         """Получить состояние из хранилища."""
+
+    def update_state(self, values: Dict[str, Any]) -> None:
+        """
+        Сохранить значения нескольких ключей одной записью, не трогая остальные.
+        Общие хранилища переопределяют метод, чтобы не перезаписывать ключи
+        других реплик ETL.
+        """
+        state = self.retrieve_state()
+        state.update(values)
+        self.save_state(state)
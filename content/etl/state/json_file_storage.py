@@ -1,29 +1,69 @@
 import json
-from typing import Any, Dict
+import os
+import tempfile
+from typing import Any, Dict, Optional
 
-from .base_storage import BaseStorage
+from .base_storage import BaseStorage, StateCorruptedError
 
 
 class JsonFileStorage(BaseStorage):
     """
     Реализация хранилища, использующего локальный файл.
     Формат хранения: JSON
+
+    Файл записывается атомарно: во временный файл рядом, fsync и os.replace,
+    поэтому после сбоя остаётся либо старое, либо новое состояние целиком.
     """
 
     def __init__(self, file_path: str) -> None:
         self.file_path: str = file_path
+        self._state: Optional[Dict[str, Any]] = None
 
     def save_state(self, state: Dict[str, Any]) -> None:
         """Сохранить состояние в хранилище."""
-        with open(self.file_path, "w") as file:
-            json.dump(state, file)
+        directory = os.path.dirname(os.path.abspath(self.file_path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".state-", suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(state, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.file_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        self._fsync_directory(directory)
+        self._state = dict(state)
 
     def retrieve_state(self) -> Dict[str, Any]:
         """Получить состояние из хранилища."""
+        if self._state is None:
+            self._state = self._read()
+
+        return dict(self._state)
+
+    def update_state(self, values: Dict[str, Any]) -> None:
+        self.save_state({**self.retrieve_state(), **values})
+
+    def _read(self) -> Dict[str, Any]:
         try:
             with open(self.file_path, "r") as f:
                 return json.load(f)
         except FileNotFoundError:
             return dict()
-        except json.decoder.JSONDecodeError:
-            return dict()
+        except json.decoder.JSONDecodeError as err:
+            # Пустое состояние означало бы полную перезагрузку с datetime.min
+            raise StateCorruptedError(
+                f"Файл состояния {self.file_path} повреждён: {err}"
+            ) from err
+
+    @staticmethod
+    def _fsync_directory(directory: str) -> None:
+        """Сохранить на диск саму запись о переименовании файла."""
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
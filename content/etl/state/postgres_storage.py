@@ -0,0 +1,51 @@
+from typing import Any, Dict
+
+import psycopg
+from psycopg.types.json import Jsonb
+
+from .base_storage import BaseStorage
+
+CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS content.etl_state (
+    key TEXT PRIMARY KEY,
+    value JSONB NOT NULL,
+    modified TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+);
+"""
+
+UPSERT = """
+INSERT INTO content.etl_state (key, value, modified)
+VALUES (%s, %s, now())
+ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, modified = EXCLUDED.modified;
+"""
+
+
+class PostgresStorage(BaseStorage):
+    """
+    Состояние в таблице content.etl_state той же базы, из которой читает ETL.
+    Несколько ключей сохраняются в одной транзакции, update_state не трогает
+    ключи других реплик.
+    """
+
+    def __init__(self, dsn: dict) -> None:
+        self.connection = psycopg.connect(**dsn, autocommit=True)
+        self.connection.execute(CREATE_TABLE)
+
+    def save_state(self, state: Dict[str, Any]) -> None:
+        with self.connection.transaction():
+            self.connection.execute("DELETE FROM content.etl_state;")
+            self._upsert(state)
+
+    def retrieve_state(self) -> Dict[str, Any]:
+        rows = self.connection.execute("SELECT key, value FROM content.etl_state;")
+        return {key: value for key, value in rows}
+
+    def update_state(self, values: Dict[str, Any]) -> None:
+        with self.connection.transaction():
+            self._upsert(values)
+
+    def _upsert(self, values: Dict[str, Any]) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                UPSERT, [(key, Jsonb(value)) for key, value in values.items()]
+            )
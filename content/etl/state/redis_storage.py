@@ -0,0 +1,38 @@
+import json
+from typing import Any, Dict
+
+from redis import Redis
+
+from .base_storage import BaseStorage
+
+
+class RedisStorage(BaseStorage):
+    """
+    Состояние в хеше Redis: поле - ключ состояния, значение - JSON.
+    Подходит для нескольких реплик ETL: update_state пишет только свои ключи.
+    """
+
+    def __init__(self, connection: Redis, key: str = "etl_state") -> None:
+        self.connection = connection
+        self.key = key
+
+    def save_state(self, state: Dict[str, Any]) -> None:
+        pipeline = self.connection.pipeline(transaction=True)
+        pipeline.delete(self.key)
+        if state:
+            pipeline.hset(self.key, mapping=self._dump(state))
+        pipeline.execute()
+
+    def retrieve_state(self) -> Dict[str, Any]:
+        return {
+            field.decode(): json.loads(value)
+            for field, value in self.connection.hgetall(self.key).items()
+        }
+
+    def update_state(self, values: Dict[str, Any]) -> None:
+        if values:
+            self.connection.hset(self.key, mapping=self._dump(values))
+
+    @staticmethod
+    def _dump(values: Dict[str, Any]) -> Dict[str, str]:
+        return {key: json.dumps(value) for key, value in values.items()}
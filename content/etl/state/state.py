@@ -1,4 +1,7 @@
-from typing import Any
+import threading
+from typing import Any, Dict
+
+from .base_storage import BaseStorage
 
 
 class State:
@@ -6,20 +9,31 @@ class State:
     Класс для работы с состояниями.
     Работает с локальной копией состояния данных.
     Восстановливает состояние во время старта приложения, если такое состояние существовало.
-    {'state_key': '1990-01-01'} - значение является datetime,
-                                  храним последнюю дату, после которой
-                                  мы загружали в ES
+    {'watermark:film_work': {'modified': ..., 'id': ...}} - отдельная контрольная
+                                  точка на каждый источник изменений
+    Чтения идут из копии в памяти, в хранилище пишутся только изменённые ключи.
     """
 
-    def __init__(self, storage) -> None:
+    def __init__(self, storage: BaseStorage) -> None:
         self.storage = storage
+        self._lock = threading.Lock()
+        self._state: Dict[str, Any] = storage.retrieve_state()
 
     def set_state(self, key: str, value: Any) -> None:
         """Установить состояние для определённого ключа."""
-        state = self.storage.retrieve_state()
-        state[key] = value
-        self.storage.save_state(state)
+        self.set_states({key: value})
+
+    def set_states(self, values: Dict[str, Any]) -> None:
+        """Сохранить несколько контрольных точек одной записью."""
+        with self._lock:
+            self.storage.update_state(values)
+            self._state.update(values)
 
     def get_state(self, key: str) -> Any:
         """Получить состояние по определённому ключу."""
-        return self.storage.retrieve_state().get(key)
+        return self._state.get(key)
+
+    def reload(self) -> None:
+        """Перечитать состояние, которое могли изменить другие реплики ETL."""
+        with self._lock:
+            self._state = self.storage.retrieve_state()
@@ -0,0 +1,35 @@
+from datetime import datetime
+from typing import Any, NamedTuple, Optional
+
+ZERO_ID = "00000000-0000-0000-0000-000000000000"
+
+
+def get_state_key(table_name: str, shard: Optional[int] = None) -> str:
+    """Ключ watermark таблицы, у шардированного ETL - свой на каждый шард."""
+    if shard is None:
+        return f"watermark:{table_name}"
+    return f"watermark:{table_name}:{shard}"
+
+
+class Watermark(NamedTuple):
+    """
+    Позиция ETL в таблице: пара (modified, id) последней обработанной строки.
+    Строки сравниваются по паре целиком, поэтому записи с одинаковым
+    modified не теряются на границе пачек.
+    """
+
+    modified: str
+    id: str
+
+    @classmethod
+    def initial(cls, modified: Optional[str] = None) -> "Watermark":
+        return cls(modified or str(datetime.min), ZERO_ID)
+
+    @classmethod
+    def from_state(cls, value: Optional[dict[str, Any]], default: "Watermark") -> "Watermark":
+        if not value:
+            return default
+        return cls(**value)
+
+    def to_state(self) -> dict[str, Any]:
+        return self._asdict()
@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import psycopg
+import pytest
+from pydantic import ValidationError
+
+from etl_process.settings import PostgresSettings
+
+DDL_PATH = Path(__file__).resolve().parents[2] / "movies_database.ddl"
+
+
+@pytest.fixture(scope="module")
+def schema():
+    """
+    Соединение со схемой movies_database.ddl, созданной в транзакции:
+    после тестов модуля она откатывается. Нужен Postgres из настроек DB_*.
+    """
+    try:
+        settings = PostgresSettings()
+        connection = psycopg.connect(
+            dbname=settings.db_name,
+            user=settings.db_user,
+            password=settings.db_password,
+            host=settings.db_host,
+            port=settings.db_port,
+            connect_timeout=3,
+        )
+    except (ValidationError, psycopg.OperationalError) as err:
+        pytest.skip(f"Postgres недоступен: {err}")
+
+    # Роль app из DDL есть только в контейнере базы
+    ddl = DDL_PATH.read_text().split("ALTER ROLE")[0]
+    connection.execute(ddl)
+
+    yield connection
+
+    connection.rollback()
+    connection.close()
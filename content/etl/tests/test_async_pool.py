@@ -0,0 +1,49 @@
+import asyncio
+
+import psycopg
+import pytest
+
+from etl_process.async_engine import AsyncPostgresExtractor
+
+
+class FakeConnection:
+    def __init__(self, closed: bool = False):
+        self.closed = closed
+
+
+def make_extractor(conn: FakeConnection, reconnect) -> AsyncPostgresExtractor:
+    # Без __init__: он подключается к Postgres и заполняет пул
+    extractor = object.__new__(AsyncPostgresExtractor)
+    extractor.pool = asyncio.Queue()
+    extractor.pool.put_nowait(conn)
+
+    async def make_db_connection():
+        return reconnect
+
+    extractor.make_db_connection = make_db_connection
+    return extractor
+
+
+async def use_connection(extractor: AsyncPostgresExtractor):
+    async with extractor.connection() as conn:
+        return conn
+
+
+def test_closed_connection_is_reopened():
+    fresh = FakeConnection()
+    extractor = make_extractor(FakeConnection(closed=True), reconnect=fresh)
+
+    assert asyncio.run(use_connection(extractor)) is fresh
+    assert extractor.pool.get_nowait() is fresh
+
+
+def test_failed_reconnect_raises_and_keeps_pool_size():
+    closed = FakeConnection(closed=True)
+    extractor = make_extractor(closed, reconnect=None)
+
+    with pytest.raises(psycopg.OperationalError):
+        asyncio.run(use_connection(extractor))
+
+    # В пуле снова закрытое соединение, а не None: следующий запрос переподключится
+    assert extractor.pool.get_nowait() is closed
+    assert extractor.pool.empty()
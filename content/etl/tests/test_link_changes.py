@@ -0,0 +1,75 @@
+"""
+Смена роли и удаление связей должны доходить до опроса изменений ETL.
+Нужен Postgres из настроек DB_*, иначе тесты пропускаются.
+"""
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from etl_process.extract_data import (
+    FILM_WORK,
+    MODIFIED_ROWS_QUERY,
+    PERSON,
+    PERSON_FILM_WORK,
+    get_modified_links_query,
+)
+
+# Watermark, после которого опрос видит только изменения теста
+WATERMARK = (datetime(2000, 1, 2, tzinfo=timezone.utc), uuid.UUID(int=0))
+BEFORE = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def link(schema):
+    film_id, person_id, link_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    schema.execute(
+        "INSERT INTO content.film_work (id, title, type, modified) "
+        "VALUES (%s, 'Film', 'movie', %s);",
+        (film_id, BEFORE),
+    )
+    schema.execute(
+        "INSERT INTO content.person (id, full_name, modified) "
+        "VALUES (%s, 'Person', %s);",
+        (person_id, BEFORE),
+    )
+    schema.execute(
+        "INSERT INTO content.person_film_work "
+        "(id, film_work_id, person_id, role, created, modified) "
+        "VALUES (%s, %s, %s, 'actor', %s, %s);",
+        (link_id, film_id, person_id, BEFORE, BEFORE),
+    )
+
+    yield link_id, film_id, person_id
+
+    schema.execute("DELETE FROM content.film_work WHERE id = %s;", (film_id,))
+    schema.execute("DELETE FROM content.person WHERE id = %s;", (person_id,))
+
+
+def modified_ids(schema, query: str) -> set:
+    rows = schema.execute(query, (*WATERMARK, 1000)).fetchall()
+    return {row[0] for row in rows}
+
+
+def test_role_change_is_polled(schema, link):
+    link_id, _, _ = link
+    query = get_modified_links_query(PERSON_FILM_WORK)
+    assert link_id not in modified_ids(schema, query)
+
+    schema.execute(
+        "UPDATE content.person_film_work SET role = 'writer', modified = now() "
+        "WHERE id = %s;",
+        (link_id,),
+    )
+
+    assert link_id in modified_ids(schema, query)
+
+
+def test_deleted_link_marks_film_and_person(schema, link):
+    link_id, film_id, person_id = link
+
+    schema.execute("DELETE FROM content.person_film_work WHERE id = %s;", (link_id,))
+
+    for table_name, row_id in ((FILM_WORK, film_id), (PERSON, person_id)):
+        query = MODIFIED_ROWS_QUERY.format(table_name=table_name)
+        assert row_id in modified_ids(schema, query)
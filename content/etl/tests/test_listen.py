@@ -0,0 +1,75 @@
+import psycopg
+
+from main import CycleResult, listen_changes
+
+
+class FakeListener:
+    """Отдаёт заготовленные пачки уведомлений, затем обрывает подписку."""
+
+    def __init__(self, batches: list[dict]):
+        self.batches = list(batches)
+
+    def wait(self, timeout: float) -> dict:
+        if not self.batches:
+            raise psycopg.OperationalError("connection lost")
+        return self.batches.pop(0)
+
+
+class FakeExtractor:
+    def __init__(self, loaded: bool = True):
+        self.loaded = loaded
+        self.processed = []
+
+    def process_changes(self, changes: dict, shards=None) -> bool:
+        self.processed.append(changes)
+        return self.loaded
+
+
+def make_sync(results: list[CycleResult]):
+    calls = []
+
+    def sync() -> CycleResult:
+        calls.append(len(calls))
+        return results.pop(0) if results else CycleResult.IDLE
+
+    return sync, calls
+
+
+def test_timeout_runs_scan_until_idle():
+    # Уведомления загружены, пауза: watermark догоняются сканированием
+    listener = FakeListener([{"film_work": {"1"}}, {}])
+    extractor = FakeExtractor()
+    sync, calls = make_sync([CycleResult.CHANGED, CycleResult.CHANGED])
+
+    listen_changes(listener, extractor, 60, sync)
+
+    assert extractor.processed == [{"film_work": {"1"}}]
+    assert len(calls) == 3
+
+
+def test_busy_subscription_still_scans():
+    listener = FakeListener([{"film_work": {"1"}}, {"film_work": {"2"}}])
+    sync, calls = make_sync([])
+
+    listen_changes(listener, FakeExtractor(), 0, sync)
+
+    assert len(calls) == 2
+
+
+def test_failed_scan_stops_listening():
+    listener = FakeListener([{}, {}])
+    sync, calls = make_sync([CycleResult.FAILED])
+
+    listen_changes(listener, FakeExtractor(), 60, sync)
+
+    assert len(calls) == 1
+    assert listener.batches == [{}]
+
+
+def test_failed_load_skips_scan():
+    listener = FakeListener([{"film_work": {"1"}}])
+    sync, calls = make_sync([])
+
+    listen_changes(listener, FakeExtractor(loaded=False), 60, sync)
+
+    assert calls == []
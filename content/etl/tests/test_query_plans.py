@@ -0,0 +1,73 @@
+"""
+Запросы опроса изменений ETL должны идти по индексам movies_database.ddl.
+С enable_seqscan = off Postgres всё равно может взять полный обход
+первичного ключа или уникального индекса, поэтому проверяется имя индекса.
+Нужен Postgres из настроек DB_*, иначе тесты пропускаются.
+"""
+from datetime import datetime, timezone
+
+import psycopg
+import pytest
+
+from etl_process.extract_data import (
+    GENRE,
+    LINKED_FILMS_QUERY,
+    MODIFIED_ROWS_QUERY,
+    PERSON,
+    get_modified_links_query,
+)
+from state.watermark import ZERO_ID
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(scope="module")
+def conn(schema):
+    schema.execute("SET LOCAL enable_seqscan = off;")
+    return schema
+
+
+def explain(conn: psycopg.Connection, query: str, params: tuple) -> str:
+    rows = conn.execute(f"EXPLAIN {query}", params).fetchall()
+    return "\n".join(row[0] for row in rows)
+
+
+@pytest.mark.parametrize(
+    "table_name, index",
+    [
+        ("film_work", "idx_film_work_modified_id"),
+        ("genre", "idx_genre_modified_id"),
+        ("person", "idx_person_modified_id"),
+    ],
+)
+def test_modified_rows_use_index(conn, table_name, index):
+    query = MODIFIED_ROWS_QUERY.format(table_name=table_name)
+
+    assert index in explain(conn, query, (EPOCH, ZERO_ID, 1000))
+
+
+@pytest.mark.parametrize(
+    "table_name, index",
+    [
+        ("genre_film_work", "idx_genre_film_work_modified_id"),
+        ("person_film_work", "idx_person_film_work_modified_id"),
+    ],
+)
+def test_modified_links_use_index(conn, table_name, index):
+    query = get_modified_links_query(table_name)
+
+    assert index in explain(conn, query, (EPOCH, ZERO_ID, 1000))
+
+
+@pytest.mark.parametrize(
+    "table_name, index",
+    [
+        (GENRE, "idx_genre_film_work_genre_film_work"),
+        (PERSON, "idx_person_film_work_person_film_work"),
+    ],
+)
+def test_linked_films_use_index(conn, table_name, index):
+    query = LINKED_FILMS_QUERY.format(table_name=table_name)
+    params = ([ZERO_ID], ZERO_ID, 1000)
+
+    assert index in explain(conn, query, params)
@@ -0,0 +1,16 @@
+import pytest
+from pydantic import ValidationError
+
+from etl_process.settings import EtlSettings
+
+
+def test_sharding_requires_shared_state():
+    with pytest.raises(ValidationError):
+        EtlSettings(etl_shards=2, etl_state_backend="file")
+
+
+@pytest.mark.parametrize("backend", ["redis", "postgres"])
+def test_sharding_with_shared_state(backend):
+    settings = EtlSettings(etl_shards=2, etl_state_backend=backend)
+
+    assert settings.etl_shards == 2
@@ -0,0 +1,151 @@
+import uuid
+
+import psycopg
+import pytest
+
+from etl_process.shards import ShardLeases, ShardSet, shard_of
+
+
+class FakeLocks:
+    """Advisory-блокировки Postgres, общие для нескольких воркеров."""
+
+    def __init__(self):
+        self.workers = 0
+        self.shards: dict[int, "FakeConnection"] = {}
+
+
+class FakeResult:
+    def __init__(self, row):
+        self.row = row
+
+    def fetchone(self):
+        return self.row
+
+
+class FakeConnection:
+    def __init__(self, locks: FakeLocks):
+        self.locks = locks
+        self.locks.workers += 1
+        self.broken = False
+
+    def execute(self, query: str, params=()):
+        if self.broken:
+            raise psycopg.OperationalError("connection lost")
+
+        if "count(*)" in query:
+            return FakeResult((self.locks.workers,))
+
+        shard = params[1]
+        if "pg_try_advisory_lock" in query:
+            holder = self.locks.shards.setdefault(shard, self)
+            return FakeResult((holder is self,))
+
+        if "pg_advisory_unlock" in query:
+            del self.locks.shards[shard]
+            return FakeResult((True,))
+
+        raise AssertionError(query)
+
+    def close(self):
+        self.locks.workers -= 1
+        for shard in [s for s, holder in self.locks.shards.items() if holder is self]:
+            del self.locks.shards[shard]
+
+
+def make_leases(locks: FakeLocks, count: int, on_acquire=None) -> ShardLeases:
+    leases = ShardLeases({}, count, on_acquire=on_acquire)
+    leases.make_db_connection = lambda: FakeConnection(locks)
+    return leases
+
+
+def make_id(number: int) -> str:
+    return str(uuid.UUID(int=number))
+
+
+def test_shard_of_is_uuid_modulo():
+    assert shard_of(make_id(10), 4) == 2
+    assert shard_of(uuid.UUID(int=10), 4) == 2
+
+
+def test_shard_set_owns_and_filters():
+    shards = ShardSet(frozenset({0, 3}), 4)
+    ids = [make_id(number) for number in range(8)]
+
+    assert shards.owns(make_id(4))
+    assert not shards.owns(make_id(5))
+    assert shards.filter(ids) == [make_id(0), make_id(3), make_id(4), make_id(7)]
+
+
+def test_single_worker_takes_all_shards():
+    leases = make_leases(FakeLocks(), 4)
+
+    assert leases.rebalance() == ShardSet(frozenset({0, 1, 2, 3}), 4)
+
+
+def test_workers_split_shards_without_overlap():
+    locks = FakeLocks()
+    first, second = make_leases(locks, 4), make_leases(locks, 4)
+
+    first.rebalance()
+    second.rebalance()
+    # Первый воркер отдаёт лишнее только на следующем цикле
+    first_shards = first.rebalance()
+    second_shards = second.rebalance()
+
+    assert len(first_shards.numbers) == len(second_shards.numbers) == 2
+    assert first_shards.numbers.isdisjoint(second_shards.numbers)
+    assert first_shards.numbers | second_shards.numbers == {0, 1, 2, 3}
+
+
+def test_shards_of_closed_worker_are_taken_over():
+    locks = FakeLocks()
+    first, second = make_leases(locks, 4), make_leases(locks, 4)
+    first.rebalance()
+    second.rebalance()
+    first.rebalance()
+    second.rebalance()
+
+    first.close()
+
+    assert second.rebalance().numbers == {0, 1, 2, 3}
+
+
+def test_on_acquire_called_only_for_new_shards():
+    calls = []
+    locks = FakeLocks()
+    leases = make_leases(locks, 4, on_acquire=lambda: calls.append(True))
+
+    leases.rebalance()
+    leases.rebalance()
+    assert len(calls) == 1
+
+    # Второй воркер забрал половину, потом ушёл: шарды возвращаются
+    other = make_leases(locks, 4)
+    other.rebalance()
+    leases.rebalance()
+    other.rebalance()
+    other.close()
+    leases.rebalance()
+
+    assert len(calls) == 2
+
+
+def test_lost_connection_drops_all_shards():
+    locks = FakeLocks()
+    leases = make_leases(locks, 4)
+    leases.rebalance()
+
+    leases.conn.broken = True
+
+    assert leases.rebalance() == ShardSet(frozenset(), 4)
+    assert leases.conn is None
+
+
+@pytest.mark.parametrize("workers, share", [(1, 5), (2, 3), (3, 2), (5, 1), (7, 1)])
+def test_share_is_rounded_up(workers, share):
+    locks = FakeLocks()
+    leases = make_leases(locks, 5)
+    for _ in range(workers - 1):
+        FakeConnection(locks)
+
+    assert len(leases.rebalance().numbers) == share
@@ -1,10 +1,12 @@
 from contextlib import asynccontextmanager
 
-from fastapi_solution.src.api.v1 import films, genres, persons
+from fastapi_solution.src.api.v1 import cache, films, genres, persons
 from fastapi_solution.src.api.v2 import film as films_v2
 from fastapi_solution.src.api.v2 import genre as genres_v2
 from fastapi_solution.src.api.v2 import person as persons_v2
+from fastapi_solution.src.api.http_cache import HTTPCacheMiddleware
 from fastapi_solution.src.db import elastic, redis
+from fastapi_solution.src.repository import genre_registry, index_versions, local_cache
 
 import backoff
 import asyncio
@@ -45,7 +47,29 @@ async def setup_elasticsearch():
 @asynccontextmanager
 async def lifespan(app_):
     await asyncio.gather(setup_redis(), setup_elasticsearch())
+    index_versions.index_versions = index_versions.IndexVersions(redis.redis)
+    index_versions_task = asyncio.create_task(index_versions.index_versions.listen())
+    genre_registry.genre_registry = genre_registry.GenreRegistry(redis.redis, elastic.es)
+    await genre_registry.genre_registry.get_all()
+    versions_task = asyncio.create_task(genre_registry.genre_registry.listen_versions())
+
+    invalidation_task = None
+    if settings.LOCAL_CACHE_ENABLED:
+        local_cache.local_cache = local_cache.LocalCache(
+            max_items=settings.LOCAL_CACHE_MAX_ITEMS,
+            max_bytes=settings.LOCAL_CACHE_MAX_BYTES,
+            ttl=settings.LOCAL_CACHE_TTL,
+        )
+        invalidation_task = asyncio.create_task(
+            local_cache.listen_invalidations(redis.redis, local_cache.local_cache)
+        )
+
     yield
+
+    versions_task.cancel()
+    index_versions_task.cancel()
+    if invalidation_task is not None:
+        invalidation_task.cancel()
     await redis.redis.close()
     await elastic.es.close()
 
@@ -61,10 +85,13 @@ app = FastAPI(
 
 add_pagination(app)
 
+app.add_middleware(HTTPCacheMiddleware)
+
 
 app.include_router(films.router, prefix='/api/v1/films', tags=['films'])
 app.include_router(genres.router, prefix='/api/v1/genres', tags=['genres'])
 app.include_router(persons.router, prefix='/api/v1/persons', tags=['persons'])
+app.include_router(cache.router, prefix='/api/v1/cache', tags=['cache'])
 app.include_router(persons_v2.router, prefix="/api/v2/persons", tags=["persons"])
 app.include_router(films_v2.router, prefix="/api/v2/films", tags=["films"])
 app.include_router(genres_v2.router, prefix="/api/v2/genres", tags=["genres"])
@@ -4,10 +4,10 @@ from fastapi import Depends, status
 from fastapi.exceptions import HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from redis.asyncio import Redis
-from httpx.exceptions import ConnectError
 
 from ..db.elastic import get_elastic
 from ..db.redis import get_redis
+from ..repository.genre_registry import GenreRegistry, get_genre_registry
 from ..clients.auth.client import auth_client
 from ..clients.auth.schemas import UserRetrieveSchema
 from ..core.config import settings
@@ -21,7 +21,7 @@ def decode_jwt(token: str) -> dict | None:
         decoded_token = jwt.decode(
             token,
             settings.SECRET,
-            settings.AUDIENCE,
+            audience=settings.AUDIENCE,
             algorithms=[settings.JWT_ALGORITHM],
         )
     except jwt.PyJWTError:
@@ -33,12 +33,7 @@ async def check_user(token: str = Depends(oauth2_scheme)) -> UserRetrieveSchema:
     try:
         return await auth_client.check(token)
     except Exception:
-        data = decode_jwt(
-            token,
-            settings.SECRET,
-            settings.AUDIENCE,
-            algorithms=[settings.JWT_ALGORITHM],
-        )
+        data = decode_jwt(token)
 
         if not data:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
@@ -49,4 +44,5 @@ async def check_user(token: str = Depends(oauth2_scheme)) -> UserRetrieveSchema:
 RedisConnection = Annotated[Redis, Depends(get_redis)]
 ESConnection = Annotated[Redis, Depends(get_elastic)]
 UserData = Annotated[UserRetrieveSchema, Depends(check_user)]
+GenreRegistryDep = Annotated[GenreRegistry, Depends(get_genre_registry)]
 
@@ -0,0 +1,149 @@
+import hashlib
+from http import HTTPStatus
+from logging import getLogger
+from typing import NamedTuple
+
+from fastapi import Request, Response
+from fastapi.exceptions import HTTPException
+from redis.exceptions import RedisError
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+
+from ..repository import index_versions
+from .deps import check_user
+
+logger = getLogger(__name__)
+
+
+class CachePolicy(NamedTuple):
+    indices: tuple[str, ...]
+    max_age: int
+    stale_while_revalidate: int
+    private: bool = False
+
+    @property
+    def cache_control(self) -> str:
+        visibility = "private" if self.private else "public"
+        return (
+            f"{visibility}, max-age={self.max_age}, "
+            f"stale-while-revalidate={self.stale_while_revalidate}"
+        )
+
+
+# Префикс пути -> индексы, от версий которых зависит ответ, и заголовки кэша.
+# Ответы v2 зависят от авторизации, поэтому CDN их не кэширует.
+CACHE_POLICIES: tuple[tuple[str, CachePolicy], ...] = (
+    ("/api/v1/films", CachePolicy(("movies",), 60, 300)),
+    ("/api/v1/persons", CachePolicy(("persons",), 60, 300)),
+    ("/api/v1/genres", CachePolicy(("genres",), 300, 3600)),
+    ("/api/v2/films", CachePolicy(("movies",), 60, 300, private=True)),
+    ("/api/v2/persons", CachePolicy(("persons",), 60, 300, private=True)),
+    ("/api/v2/genres", CachePolicy(("genres",), 300, 3600, private=True)),
+)
+
+
+class HTTPCacheMiddleware(BaseHTTPMiddleware):
+    """Условные GET-запросы для каталога.
+
+    ETag строится из адреса запроса и версий индексов (``IndexVersions``),
+    поэтому ``If-None-Match`` проверяется до обращения к кэшу ответов и к
+    Elasticsearch. По тем же версиям строятся ключи кэша ответов в Redis,
+    так что ответ, закэшированный до обновления индекса, под новым тегом
+    не отдаётся.
+
+    Ответы v2 зависят от пользователя: их тег учитывает ``Authorization``,
+    а 304 отдаётся только после проверки токена той же зависимостью, что
+    у маршрутов. С неверным токеном запрос уходит в маршрут и получает 401.
+    """
+
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        policy = self._match_policy(request)
+
+        if policy is None or request.method not in ("GET", "HEAD"):
+            return await call_next(request)
+
+        versions = await self._get_versions(policy.indices)
+
+        if versions is None:
+            return await call_next(request)
+
+        headers = {
+            "ETag": self._compute_etag(request, versions, policy.private),
+            "Cache-Control": policy.cache_control,
+        }
+        if policy.private:
+            headers["Vary"] = "Authorization"
+
+        if self._is_not_modified(request, headers["ETag"]) and (
+            not policy.private or await self._is_authorized(request)
+        ):
+            return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+        response = await call_next(request)
+
+        if response.status_code == HTTPStatus.OK:
+            response.headers.update(headers)
+
+        return response
+
+    @staticmethod
+    def _match_policy(request: Request) -> CachePolicy | None:
+        path = request.url.path
+
+        for prefix, policy in CACHE_POLICIES:
+            if path.startswith(prefix):
+                return policy
+
+        return None
+
+    @staticmethod
+    async def _get_versions(indices: tuple[str, ...]) -> list[str] | None:
+        try:
+            versions = await index_versions.index_versions.get_many(indices)
+        except RedisError as err:
+            logger.warning(f"Не удалось получить версии индексов: {err}")
+            return None
+
+        if any(version is None for version in versions):
+            return None
+
+        return versions
+
+    @staticmethod
+    async def _is_authorized(request: Request) -> bool:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+
+        if scheme.lower() != "bearer" or not token:
+            return False
+
+        try:
+            await check_user(token)
+        except HTTPException:
+            return False
+
+        return True
+
+    @staticmethod
+    def _compute_etag(request: Request, versions: list[str], private: bool) -> str:
+        query = "&".join(
+            sorted(f"{key}={value}" for key, value in request.query_params.multi_items())
+        )
+
+        digest = hashlib.sha1(request.url.path.encode())
+        digest.update(query.encode())
+        digest.update("|".join(versions).encode())
+        if private:
+            digest.update(request.headers.get("authorization", "").encode())
+
+        return f'"{digest.hexdigest()}"'
+
+    @staticmethod
+    def _is_not_modified(request: Request, etag: str) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+
+        if not if_none_match:
+            return False
+
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
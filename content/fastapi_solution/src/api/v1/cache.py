@@ -0,0 +1,38 @@
+import logging
+
+from fastapi import APIRouter, Depends
+from redis.asyncio import Redis
+
+from ...db.redis import get_redis
+from ...repository.local_cache import LocalCache, get_local_cache
+from ...repository.redis import redis_stats
+from ..deps import check_user
+
+# Счётчики и статистика Redis - служебные данные, только с токеном
+router = APIRouter(dependencies=[Depends(check_user)])
+
+log = logging.getLogger("main")
+
+
+@router.get(
+    "/stats",
+    summary="Статистика кэша",
+    description="Попадания, промахи и вытеснения по уровням кэша",
+    response_description="Счётчики локального кэша и Redis",
+)
+async def cache_stats(
+    redis: Redis = Depends(get_redis),
+    local: LocalCache | None = Depends(get_local_cache),
+) -> dict[str, dict[str, int] | None]:
+    """
+    Получить статистику кэша текущего воркера.
+
+    - **local**: Локальный кэш воркера, `null`, если он выключен.
+    - **redis**: Попадания и промахи воркера в Redis, вытеснения по данным Redis.
+    """
+    info = await redis.info("stats")
+
+    return {
+        "local": local.info() if local is not None else None,
+        "redis": {**redis_stats.as_dict(), "evictions": info.get("evicted_keys", 0)},
+    }
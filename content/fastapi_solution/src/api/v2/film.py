@@ -1,18 +1,27 @@
 from typing import Annotated, Literal
 
-from fastapi import APIRouter, HTTPException, status, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
 
 from ...repository.elasticsearch import ESRepository
 from ...repository.redis import RedisRepository
 from ...service.film import FilmService
-from ..deps import ESConnection, RedisConnection, UserData
+from ..deps import ESConnection, RedisConnection, check_user
 from ..v2.schemas.film import FilmSchema
 
-router = APIRouter(dependencies=[UserData])
+router = APIRouter(dependencies=[Depends(check_user)])
+
+FilmFields = Annotated[
+    list[Literal["title", "imdb_rating"]] | None,
+    Query(
+        description="Поля фильма, которые нужно вернуть. Идентификатор возвращается всегда.",
+    ),
+]
 
 
 @router.get(
     "",
+    response_model=list[FilmSchema],
+    response_model_exclude_unset=True,
     summary="Список фильмов",
     description="Список фильмов с пагинацией, фильтрацией по жанрам и сортировкой по названию или рейтингу",
     response_description="Информация по фильмам",
@@ -31,6 +40,7 @@ async def get_all(
             title="Жанр",
             description="Фильтрует фильмы по жанру."
         ),
+        fields: FilmFields = None,
 ) -> list[FilmSchema]:
     """
     Получить список фильмов с возможностью фильтрации и сортировки.
@@ -41,17 +51,19 @@ async def get_all(
     - **page_number**: Номер мтраницы
     - **sort**: Сортировка
     - **genre**: Жанр
+    - **fields**: Поля фильма в ответе
     """
     service = FilmService(
         storage=ESRepository(es_conn),
         cache=RedisRepository(redis_conn, 60 * 5),
     )
-    return await service.get_all(sort, genre, page_size, page_number)
+    return await service.get_all(sort, genre, page_size, page_number, fields)
 
 
 @router.get(
     "/search",
     response_model=list[FilmSchema],
+    response_model_exclude_unset=True,
     summary="Полнотекстовый поиск по фильмам",
     description="Поиск по фильмам",
     response_description="Информация по фильмам",
@@ -66,6 +78,7 @@ async def search(
             title="Заголовок фильма для поиска",
             description="Заголовок фильма для поиска"
         ),
+        fields: FilmFields = None,
 ) -> list[FilmSchema]:
     """
     Возвращает пагинированный список фильмов по заданному названию.
@@ -74,12 +87,13 @@ async def search(
     - **page_size**: Количество элементов на странице
     - **page_number**: Номер мтраницы
     - **title**: Заголовок фильма для поиска
+    - **fields**: Поля фильма в ответе
     """
     service = FilmService(
         storage=ESRepository(es_conn),
         cache=RedisRepository(redis_conn, 60 * 5),
     )
-    return await service.search(title, page_size, page_number)
+    return await service.search(title, page_size, page_number, fields)
 
 
 @router.get(
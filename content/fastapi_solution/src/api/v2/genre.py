@@ -1,12 +1,10 @@
-from fastapi import APIRouter, HTTPException, status, Path
+from fastapi import APIRouter, Depends, HTTPException, status, Path
 
-from ...repository.elasticsearch import ESRepository
-from ...repository.redis import RedisRepository
 from ...service.genre import GenreService
-from ..deps import ESConnection, RedisConnection, UserData
+from ..deps import GenreRegistryDep, check_user
 from ..v2.schemas.genre import GenreSchema
 
-router = APIRouter(dependencies=[UserData])
+router = APIRouter(dependencies=[Depends(check_user)])
 
 
 @router.get(
@@ -17,8 +15,7 @@ router = APIRouter(dependencies=[UserData])
     response_description="Полная информация по жанру",
 )
 async def details(
-        es_conn: ESConnection,
-        redis_conn: RedisConnection,
+        registry: GenreRegistryDep,
         genre_id: str = Path(
             ...,
             title="Идентификатор жанров",
@@ -32,10 +29,7 @@ async def details(
 
     Возвращает полную информацию о жанре в случае успеха,
     """
-    service = GenreService(
-        storage=ESRepository(es_conn),
-        cache=RedisRepository(redis_conn, ttl=60 * 5),
-    )
+    service = GenreService(storage=registry)
 
     genre = await service.get(key=genre_id)
 
@@ -54,16 +48,12 @@ async def details(
     response_description="Информация по жанрам",
 )
 async def get_all(
-        es_conn: ESConnection,
-        redis_conn: RedisConnection
+        registry: GenreRegistryDep,
 ) -> list[GenreSchema]:
     """
     Получить список всех жанров.
     Возвращает пагинированный список жанров.
     """
-    service = GenreService(
-        storage=ESRepository(es_conn),
-        cache=RedisRepository(redis_conn, ttl=60 * 5),
-    )
+    service = GenreService(storage=registry)
 
     return await service.get_all()
@@ -1,14 +1,14 @@
 from typing import Annotated
 
-from fastapi import APIRouter, HTTPException, status, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
 
 from ...repository.elasticsearch import ESRepository
 from ...repository.redis import RedisRepository
 from ...service.person import PersonService
-from ..deps import ESConnection, RedisConnection, UserData
+from ..deps import ESConnection, RedisConnection, check_user
 from ..v2.schemas.person import PersonSchema
 
-router = APIRouter(dependencies=[UserData])
+router = APIRouter(dependencies=[Depends(check_user)])
 
 
 @router.get(
@@ -26,7 +26,19 @@ class Settings(BaseSettings):
     # RETRY POLICY
     MAX_TRIES: int = 10
 
-    AUTH_API_URL=""
+    # INDEX VERSIONS
+    INDEX_VERSIONS_CHECK_INTERVAL: int = 30
+
+    # LOCAL CACHE
+    LOCAL_CACHE_ENABLED: bool = False
+    LOCAL_CACHE_MAX_ITEMS: int = 10000
+    LOCAL_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    LOCAL_CACHE_TTL: int = 30
+
+    # GENRE REGISTRY
+    GENRE_REGISTRY_CHECK_INTERVAL: int = 30
+
+    AUTH_API_URL: str = ""
     JWT_ALGORITHM: str = "HS256"
     AUDIENCE: str = "fastapi"
     SECRET: str = "SECRET"
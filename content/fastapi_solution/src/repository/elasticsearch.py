@@ -52,6 +52,7 @@ class ESRepository(Repository):
         offset: int | None = None,
         query: dict[str, Any] | None = None,
         sort: dict[str, Any] | None = None,
+        source: list[str] | None = None,
     ) -> Coroutine[Any, Any, list[Any]]:
         body: dict[str, Any] = {}
 
@@ -67,4 +68,7 @@ class ESRepository(Repository):
         if sort:
             body["sort"] = sort
 
+        if source:
+            body["_source"] = source
+
         return await self._conn.search(index=index, body=body)
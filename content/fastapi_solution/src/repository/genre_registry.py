@@ -0,0 +1,132 @@
+import asyncio
+import time
+from logging import getLogger
+from typing import Any, Coroutine
+
+import backoff
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.exceptions import ConnectionError, ConnectionTimeout, NotFoundError
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError as RedisConError
+from redis.exceptions import RedisError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from ..core.config import settings
+from ..models.models import Genre
+from .local_cache import INVALIDATION_CHANNEL
+
+logger = getLogger(__name__)
+
+GENRES_INDEX = "genres"
+GENRES_VERSION_KEY = "index_version:genres"
+
+
+class GenreRegistry:
+    """Словарь жанров в памяти процесса.
+
+    Жанры целиком читаются из индекса ``genres`` и перечитываются только
+    тогда, когда ETL меняет версию индекса в Redis. Версия сверяется не на
+    каждый запрос, а по сигналу ETL из канала ``index_versions`` и раз в
+    ``check_interval`` секунд на случай потерянного сигнала.
+    """
+
+    def __init__(
+        self,
+        redis_conn: Redis,
+        es_conn: AsyncElasticsearch,
+        check_interval: float = settings.GENRE_REGISTRY_CHECK_INTERVAL,
+    ) -> None:
+        self._redis = redis_conn
+        self._es = es_conn
+        self._genres: dict[str, Genre] = {}
+        self._version: bytes | None = None
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._check_interval = check_interval
+        self._check_at = 0.0
+
+    async def get(self, key: str) -> Coroutine[Any, Any, Genre | None]:
+        await self._refresh_if_stale()
+        return self._genres.get(key)
+
+    async def get_all(self) -> Coroutine[Any, Any, list[Genre]]:
+        await self._refresh_if_stale()
+        return list(self._genres.values())
+
+    def mark_stale(self) -> None:
+        """Сверить версию индекса при следующем обращении."""
+        self._check_at = 0.0
+
+    async def listen_versions(self) -> None:
+        """Помечать словарь устаревшим, когда ETL обновляет индекс жанров."""
+        while True:
+            pubsub = self._redis.pubsub()
+
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Сигналы, пришедшие до подписки, потеряны
+                self.mark_stale()
+
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+
+                    if message["data"].decode() == GENRES_INDEX:
+                        self.mark_stale()
+            except RedisError as err:
+                logger.warning(f"Подписка на версии индексов прервана: {err}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    async def _refresh_if_stale(self) -> None:
+        if self._loaded and time.monotonic() < self._check_at:
+            return
+
+        version = await self._get_version()
+        self._check_at = time.monotonic() + self._check_interval
+
+        if self._loaded and version == self._version:
+            return
+
+        async with self._lock:
+            if self._loaded and version == self._version:
+                return
+
+            self._genres = await self._load()
+            self._version = version
+            self._loaded = True
+            logger.info(f"Загружено {len(self._genres)} жанров, версия {version}")
+
+    @backoff.on_exception(
+        backoff.expo,
+        (RedisConError, RedisTimeoutError),
+        max_tries=settings.MAX_TRIES,
+        logger=logger,
+    )
+    async def _get_version(self) -> bytes | None:
+        return await self._redis.get(GENRES_VERSION_KEY)
+
+    @backoff.on_exception(
+        backoff.expo,
+        (ConnectionError, ConnectionTimeout),
+        max_tries=settings.MAX_TRIES,
+        logger=logger,
+    )
+    async def _load(self) -> dict[str, Genre]:
+        try:
+            docs = await self._es.search(
+                index=GENRES_INDEX, size=10000, query={"match_all": {}}
+            )
+        except NotFoundError:
+            return {}
+
+        genres = (Genre(**hit["_source"]) for hit in docs["hits"]["hits"])
+        return {genre.id: genre for genre in genres}
+
+
+genre_registry: GenreRegistry | None = None
+
+
+async def get_genre_registry() -> GenreRegistry:
+    return genre_registry
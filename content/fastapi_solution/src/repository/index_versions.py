@@ -0,0 +1,108 @@
+import asyncio
+import time
+from logging import getLogger
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from ..core.config import settings
+from .local_cache import INDEX_TAGS, INVALIDATION_CHANNEL
+
+logger = getLogger(__name__)
+
+VERSION_KEY_PREFIX = "index_version"
+
+# Метка записей кэша -> индекс, из документов которого они построены
+TAG_INDICES = {tag: index for index, tag in INDEX_TAGS.items()}
+
+
+class IndexVersions:
+    """Версии индексов Elasticsearch, которые ETL хранит в Redis.
+
+    Версии входят в ETag ответов и в ключи кэша ответов: после обновления
+    индекса ответы строятся заново под новыми ключами, а записи, сделанные
+    до него, больше не читаются и истекают по TTL. Версии всех индексов
+    читаются одним MGET и перечитываются по сигналу ETL из канала
+    ``index_versions`` и раз в ``check_interval`` секунд на случай потерянного
+    сигнала, поэтому ETag и ключи кэша воркера строятся по одним версиям.
+    """
+
+    def __init__(
+        self,
+        redis_conn: Redis,
+        check_interval: float = settings.INDEX_VERSIONS_CHECK_INTERVAL,
+    ) -> None:
+        self._redis = redis_conn
+        self._versions: dict[str, str | None] | None = None
+        self._check_interval = check_interval
+        self._check_at = 0.0
+        self._generation = 0
+
+    async def get(self, index: str) -> str:
+        """Версия индекса для ключей кэша, ``0`` - ETL его ещё не загружал."""
+        versions = await self.get_many((index,))
+        return versions[0] or "0"
+
+    async def get_many(self, indices: tuple[str, ...]) -> list[str | None]:
+        """Версии индексов, ``None`` - ETL индекс ещё не загружал.
+
+        Если Redis недоступен, отдаются последние прочитанные версии, а пока
+        их нет, поднимается ``RedisError``.
+        """
+        if self._versions is None or time.monotonic() >= self._check_at:
+            await self._refresh()
+
+        return [self._versions.get(index) for index in indices]
+
+    def mark_stale(self) -> None:
+        """Перечитать версии при следующем обращении."""
+        self._generation += 1
+        self._check_at = 0.0
+
+    async def listen(self) -> None:
+        """Помечать версии устаревшими, когда ETL обновляет индекс."""
+        while True:
+            pubsub = self._redis.pubsub()
+
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Сигналы, пришедшие до подписки, потеряны
+                self.mark_stale()
+
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.mark_stale()
+            except RedisError as err:
+                logger.warning(f"Подписка на версии индексов прервана: {err}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    async def _refresh(self) -> None:
+        generation = self._generation
+
+        try:
+            values = await self._redis.mget(
+                [f"{VERSION_KEY_PREFIX}:{index}" for index in INDEX_TAGS]
+            )
+        except RedisError as err:
+            if self._versions is None:
+                raise
+            logger.warning(f"Не удалось обновить версии индексов: {err}")
+            return
+
+        self._versions = {
+            index: value.decode() if value is not None else None
+            for index, value in zip(INDEX_TAGS, values)
+        }
+
+        # Сигнал, пришедший во время чтения, мог относиться к новой версии
+        if generation == self._generation:
+            self._check_at = time.monotonic() + self._check_interval
+
+
+index_versions: IndexVersions | None = None
+
+
+async def get_index_versions() -> IndexVersions:
+    return index_versions
@@ -0,0 +1,130 @@
+import asyncio
+import time
+from collections import OrderedDict
+from logging import getLogger
+from typing import Any, NamedTuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = getLogger(__name__)
+
+INVALIDATION_CHANNEL = "index_versions"
+
+# Индекс Elasticsearch -> метка записей кэша, построенных по его документам
+INDEX_TAGS = {
+    "movies": "film",
+    "persons": "person",
+    "genres": "genre",
+}
+
+
+class TierStats:
+    """Счётчики попаданий, промахов и вытеснений одного уровня кэша."""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class _Entry(NamedTuple):
+    value: Any
+    size: int
+    tag: str
+    expires_at: float
+
+
+class LocalCache:
+    """LRU-кэш десериализованных объектов в памяти воркера.
+
+    Размер записи считается по длине сериализованного значения из Redis,
+    кэш ограничен и числом записей, и суммарным объёмом. Записи помечаются
+    меткой сущности, чтобы сбрасывать их по сигналу об обновлении индекса.
+    """
+
+    def __init__(self, max_items: int, max_bytes: int, ttl: float) -> None:
+        self._items: OrderedDict[str, _Entry] = OrderedDict()
+        self._max_items = max_items
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._bytes = 0
+        self.stats = TierStats()
+
+    def get(self, key: str) -> Any | None:
+        entry = self._items.get(key)
+
+        if entry is None or entry.expires_at < time.monotonic():
+            if entry is not None:
+                self._pop(key)
+            self.stats.misses += 1
+            return None
+
+        self._items.move_to_end(key)
+        self.stats.hits += 1
+        return entry.value
+
+    def set(self, key: str, value: Any, size: int, tag: str) -> None:
+        if size > self._max_bytes:
+            return
+
+        if key in self._items:
+            self._pop(key)
+
+        self._items[key] = _Entry(value, size, tag, time.monotonic() + self._ttl)
+        self._bytes += size
+
+        while len(self._items) > self._max_items or self._bytes > self._max_bytes:
+            _, entry = self._items.popitem(last=False)
+            self._bytes -= entry.size
+            self.stats.evictions += 1
+
+    def invalidate(self, tag: str) -> None:
+        """Удалить все записи с указанной меткой."""
+        for key in [key for key, entry in self._items.items() if entry.tag == tag]:
+            self._pop(key)
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._bytes = 0
+
+    def info(self) -> dict[str, int]:
+        return {**self.stats.as_dict(), "items": len(self._items), "bytes": self._bytes}
+
+    def _pop(self, key: str) -> None:
+        entry = self._items.pop(key)
+        self._bytes -= entry.size
+
+
+async def listen_invalidations(redis_conn: Redis, cache: LocalCache) -> None:
+    """Сбрасывать записи кэша, когда ETL сообщает об обновлении индекса."""
+    while True:
+        pubsub = redis_conn.pubsub()
+
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+
+                tag = INDEX_TAGS.get(message["data"].decode())
+                if tag:
+                    cache.invalidate(tag)
+        except RedisError as err:
+            # Пока подписки нет, сигналы теряются - безопаснее начать с пустого кэша
+            logger.warning(f"Подписка на обновления индексов прервана: {err}")
+            cache.clear()
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.aclose()
+
+
+local_cache: LocalCache | None = None
+
+
+async def get_local_cache() -> LocalCache | None:
+    return local_cache
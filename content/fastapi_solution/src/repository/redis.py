@@ -7,15 +7,31 @@ from redis.asyncio import Redis
 from redis.exceptions import ConnectionError, TimeoutError
 
 from ..core.config import settings
+from ..repository import local_cache
+from ..repository import index_versions
 from ..repository.base import InMemoryRepository
+from ..repository.index_versions import TAG_INDICES, IndexVersions
+from ..repository.local_cache import LocalCache, TierStats
 
 logger = getLogger(__name__)
 
+redis_stats = TierStats()
+
 
 class RedisRepository(InMemoryRepository):
-    def __init__(self, redis_conn: Redis, ttl: int | None = None) -> None:
+    def __init__(
+        self,
+        redis_conn: Redis,
+        ttl: int | None = None,
+        local: LocalCache | None = None,
+        versions: IndexVersions | None = None,
+    ) -> None:
         self._conn = redis_conn
         self._ttl = ttl
+        self._local = local if local is not None else local_cache.local_cache
+        self._versions = (
+            versions if versions is not None else index_versions.index_versions
+        )
 
     @backoff.on_exception(
         backoff.expo,
@@ -24,13 +40,26 @@ class RedisRepository(InMemoryRepository):
         logger=logger,
     )
     async def get(self, slug: str, **kwargs) -> Coroutine[Any, Any, Any | None]:
-        key = self._compute_key(slug=slug, **kwargs)
+        key = await self._versioned_key(slug, **kwargs)
+
+        if self._local is not None:
+            obj = self._local.get(key)
+            if obj is not None:
+                return obj
+
         value = await self._conn.get(key)
 
         if not value:
+            redis_stats.misses += 1
             return None
 
-        return pickle.loads(value)
+        redis_stats.hits += 1
+        obj = pickle.loads(value)
+
+        if self._local is not None:
+            self._local.set(key, obj, size=len(value), tag=self._get_tag(slug))
+
+        return obj
 
     @backoff.on_exception(
         backoff.expo,
@@ -39,5 +68,23 @@ class RedisRepository(InMemoryRepository):
         logger=logger,
     )
     async def add(self, slug: str, value: Any, **kwargs) -> Coroutine[Any, Any, None]:
+        key = await self._versioned_key(slug, **kwargs)
+        data = pickle.dumps(value)
+        await self._conn.set(key, data, ex=self._ttl)
+
+        if self._local is not None:
+            self._local.set(key, value, size=len(data), tag=self._get_tag(slug))
+
+    @staticmethod
+    def _get_tag(slug: str) -> str:
+        return slug.split("/")[0]
+
+    async def _versioned_key(self, slug: str, **kwargs) -> str:
+        """Ключ записи с версией индекса, из документов которого она построена."""
         key = self._compute_key(slug=slug, **kwargs)
-        await self._conn.set(key, pickle.dumps(value), ex=self._ttl)
+
+        if self._versions is None:
+            return key
+
+        index = TAG_INDICES[self._get_tag(slug)]
+        return f"{index}:{await self._versions.get(index)}:{key}"
@@ -3,13 +3,16 @@ from typing import Any, Coroutine
 
 from elasticsearch.exceptions import NotFoundError
 
-from ..models.models import FilmRequest, Genre
+from ..models.models import FilmRequest, FilmResponse
 from ..repository.elasticsearch import ESRepository
 from ..repository.redis import RedisRepository
 from ..service.base import Service
 
 logger = getLogger(__name__)
 
+# Поля документа, которые нужны спискам и поиску фильмов
+FILM_LIST_FIELDS = ("id", "title", "imdb_rating")
+
 
 class FilmService(Service[FilmRequest]):
     def __init__(self, storage: ESRepository, cache: RedisRepository) -> None:
@@ -20,7 +23,7 @@ class FilmService(Service[FilmRequest]):
         film = await self._cache.get(slug="film/get", key=key)
 
         if not film:
-            film = await self._storage.get(index="film", key=key)
+            film = await self._storage.get(index="movies", key=key)
             await self._cache.add(slug="film/get", value=film, key=key)
 
         return film
@@ -31,23 +34,32 @@ class FilmService(Service[FilmRequest]):
         genre: str | None = None,
         limit: int | None = None,
         offset: int | None = None,
-    ) -> Coroutine[Any, Any, list[FilmRequest]]:
-        sort = self._assemble_sort_query(sort) if sort else None
-        genre = await self._assemble_genre_query(genre) if genre else None
+        fields: list[str] | None = None,
+    ) -> Coroutine[Any, Any, list[FilmResponse]]:
+        source = self._assemble_source(fields)
         films = await self._cache.get(
-            slug="film/get_all", sort=sort, genre=genre, limit=limit, offset=offset
+            slug="film/get_all",
+            sort=sort,
+            genre=genre,
+            limit=limit,
+            offset=offset,
+            fields=",".join(source),
         )
 
         if films is None:
             doc = await self._storage.get_all(
-                index="film",
+                index="movies",
                 limit=limit,
                 offset=offset,
-                sort=sort,
-                query=genre,
+                sort=self._assemble_sort_query(sort) if sort else None,
+                query=self._assemble_genre_query(genre) if genre else None,
+                source=source,
             )
 
-            films = [FilmRequest(**hit["_source"]) for hit in doc["hits"]["hits"]]
+            films = [
+                FilmResponse.model_construct(**hit["_source"])
+                for hit in doc["hits"]["hits"]
+            ]
 
             await self._cache.add(
                 slug="film/get_all",
@@ -56,10 +68,26 @@ class FilmService(Service[FilmRequest]):
                 genre=genre,
                 limit=limit,
                 offset=offset,
+                fields=",".join(source),
             )
 
         return films
 
+    def _assemble_source(self, fields: list[str] | None) -> list[str]:
+        """Список полей документа, которые нужно получить из Elastic.
+
+        Идентификатор запрашивается всегда, остальные поля сужаются до
+        пересечения с ``FILM_LIST_FIELDS``.
+        """
+        if not fields:
+            return list(FILM_LIST_FIELDS)
+
+        return [
+            field
+            for field in FILM_LIST_FIELDS
+            if field == "id" or field in fields
+        ]
+
     def _assemble_sort_query(self, sort: str) -> dict[str, Any]:
         if sort.startswith("-"):
             sort_key = sort[1:]
@@ -72,38 +100,61 @@ class FilmService(Service[FilmRequest]):
 
         return {sort_key: {"order": order, "mode": mode}}
 
-    async def _assemble_genre_query(
-        self, genre: str
-    ) -> Coroutine[Any, Any, dict[str, Any] | None]:
-        genre = await self._storage.get(index="genres", key=genre)
-
-        if not genre:
-            return None
-
-        genre_name = Genre(**genre["_source"]).name
-
-        return {"bool": {"filter": {"term": {"genre": genre_name}}}}
+    def _assemble_genre_query(self, genre: str) -> dict[str, Any]:
+        """Фильтр по идентификатору жанра.
+
+        Жанры хранятся в документе фильма вложенными объектами вместе с id,
+        поэтому переводить id в название через отдельный запрос не нужно.
+        """
+        return {
+            "bool": {
+                "filter": {
+                    "nested": {
+                        "path": "genres",
+                        "query": {"term": {"genres.id": genre}},
+                    }
+                }
+            }
+        }
 
     async def search(
-        self, title: str, limit: int, offset: int
-    ) -> Coroutine[Any, Any, list[FilmRequest]]:
+        self,
+        title: str,
+        limit: int,
+        offset: int,
+        fields: list[str] | None = None,
+    ) -> Coroutine[Any, Any, list[FilmResponse]]:
+        source = self._assemble_source(fields)
         films = await self._cache.get(
-            slug="film/search", title=title, limit=limit, offset=offset
+            slug="film/search",
+            title=title,
+            limit=limit,
+            offset=offset,
+            fields=",".join(source),
         )
 
         if not films:
             try:
                 films = await self._storage.get_all(
-                    index="films",
+                    index="movies",
                     query={"match": {"title": title}},
                     limit=limit,
                     offset=offset,
+                    source=source,
                 )
             except NotFoundError:
                 films = {"hits": {"hits": []}}
 
             await self._cache.add(
-                slug="film/search", value=films, title=title, limit=limit, offset=offset
+                slug="film/search",
+                value=films,
+                title=title,
+                limit=limit,
+                offset=offset,
+                fields=",".join(source),
             )
 
-        return [FilmRequest(**hit["_source"]) for hit in films["hits"]["hits"]]
+        return [
+            FilmResponse.model_construct(**hit["_source"])
+            for hit in films["hits"]["hits"]
+        ]
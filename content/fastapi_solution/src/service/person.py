@@ -17,7 +17,7 @@ class PersonService(Service[Person]):
         person = await self._cache.get(slug="person/get", key=key)
 
         if not person:
-            person = await self._storage.get(index="person", key="key")
+            person = await self._storage.get(index="persons", key="key")
             await self._cache.add(slug="person/get", value=person, key=key)
 
         return person
@@ -28,7 +28,7 @@ class PersonService(Service[Person]):
 
         if not persons:
             query["query"]["bool"]["must"].append({"match_all": {}})
-            persons = await self._storage.list(index="person")
+            persons = await self._storage.list(index="persons")
 
             await self._cache.add(slug="person/get_all", value=persons)
 
@@ -74,7 +74,7 @@ class PersonService(Service[Person]):
 
         if not persons:
             try:
-                persons = await self._storage.get_all(index="person", query=query)
+                persons = await self._storage.get_all(index="persons", query=query)
             except NotFoundError:
                 persons = {"hits": {"hits": []}}
 
@@ -12,14 +12,25 @@ from ..core.config import settings
 from ..db.elastic import get_elastic
 from ..db.redis import get_redis
 from ..models.models import FilmRequest
+from ..repository.index_versions import IndexVersions, get_index_versions
+from ..repository.local_cache import LocalCache, get_local_cache
+from ..repository.redis import redis_stats
 
 FILM_CACHE_EXPIRE_IN_SECONDS = 60 * 5  # 5 минут
 
 
 class FilmService:
-    def __init__(self, redis: Redis, elastic: AsyncElasticsearch):
+    def __init__(
+        self,
+        redis: Redis,
+        elastic: AsyncElasticsearch,
+        local: LocalCache | None = None,
+        versions: IndexVersions | None = None,
+    ):
         self.redis = redis
         self.elastic = elastic
+        self.local = local
+        self.versions = versions
         self.index = "movies"
         self.log = logging.getLogger("main")
 
@@ -124,19 +135,32 @@ class FilmService:
 
     @backoff.on_exception(backoff.expo, RedisConError, max_tries=settings.MAX_TRIES)
     async def _film_from_cache(self, film_id: str) -> FilmRequest | None:
-        data = await self.redis.get(f"film:{film_id}")
+        key = f"{await self._key_prefix()}:{film_id}"
+
+        if self.local is not None:
+            film = self.local.get(key)
+            if film is not None:
+                return film
+
+        data = await self.redis.get(key)
         # self.log.info(f"redis: {data}")
         if not data:
+            redis_stats.misses += 1
             self.log.info("redis: 0")
             return None
 
+        redis_stats.hits += 1
         film = FilmRequest.parse_raw(data)
         self.log.info(f"redis: get {film.id} film")
+
+        if self.local is not None:
+            self.local.set(key, film, size=len(data), tag="film")
+
         return film
 
     @backoff.on_exception(backoff.expo, RedisConError, max_tries=settings.MAX_TRIES)
     async def _all_films_from_cache(self):
-        keys = await self.redis.keys(f"film:*")
+        keys = await self.redis.keys(f"{await self._key_prefix()}:*")
         self.log.info(f'redis_keys: {len(keys)}')
 
         if not keys:
@@ -160,7 +184,7 @@ class FilmService:
 
     @backoff.on_exception(backoff.expo, RedisConError, max_tries=settings.MAX_TRIES)
     async def _all_films_from_cache_by_search(self, search_text: str):
-        keys = await self.redis.keys(f"film:*")
+        keys = await self.redis.keys(f"{await self._key_prefix()}:*")
         self.log.info(f'redis_keys: {len(keys)}')
 
         if not keys:
@@ -184,20 +208,39 @@ class FilmService:
     @backoff.on_exception(backoff.expo, RedisConError, max_tries=settings.MAX_TRIES)
     async def _put_film_to_cache(self, film: FilmRequest):
         await self.redis.set(
-            f"film:{film.id}", film.json(), FILM_CACHE_EXPIRE_IN_SECONDS
+            f"{await self._key_prefix()}:{film.id}",
+            film.json(),
+            FILM_CACHE_EXPIRE_IN_SECONDS,
         )
         self.log.info(f'set 1 film to redis')
 
     @backoff.on_exception(backoff.expo, RedisConError, max_tries=settings.MAX_TRIES)
     async def _put_all_films_to_cache(self, films):
-        data = {f"film:{film.id}": film.json() for film in films}
-        await self.redis.mset(data)
+        prefix = await self._key_prefix()
+        data = {f"{prefix}:{film.id}": film.json() for film in films}
+        await self._set_many(data)
         self.log.info(f'set {len(data)} films to redis')
 
+    async def _key_prefix(self) -> str:
+        """Префикс ключей кэша с версией индекса: старые записи не читаются."""
+        if self.versions is None:
+            return "film"
+
+        return f"film:{await self.versions.get(self.index)}"
+
+    async def _set_many(self, data: dict[str, str]) -> None:
+        # Записи старых версий не перезаписываются и должны истечь сами
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for key, value in data.items():
+                pipeline.set(key, value, ex=FILM_CACHE_EXPIRE_IN_SECONDS)
+            await pipeline.execute()
+
 
 @lru_cache()
 def get_film_service(
     redis: Redis = Depends(get_redis),
     elastic: AsyncElasticsearch = Depends(get_elastic),
+    local: LocalCache | None = Depends(get_local_cache),
+    versions: IndexVersions | None = Depends(get_index_versions),
 ) -> FilmService:
-    return FilmService(redis, elastic)
+    return FilmService(redis, elastic, local, versions)
@@ -12,14 +12,25 @@ from ..core.config import settings
 from ..db.elastic import get_elastic
 from ..db.redis import get_redis
 from ..models.models import Person
+from ..repository.index_versions import IndexVersions, get_index_versions
+from ..repository.local_cache import LocalCache, get_local_cache
+from ..repository.redis import redis_stats
 
 FILM_CACHE_EXPIRE_IN_SECONDS = 60 * 5
 
 
 class PersonService:
-    def __init__(self, redis: Redis, elastic: AsyncElasticsearch):
+    def __init__(
+        self,
+        redis: Redis,
+        elastic: AsyncElasticsearch,
+        local: LocalCache | None = None,
+        versions: IndexVersions | None = None,
+    ):
         self.redis = redis
         self.elastic = elastic
+        self.local = local
+        self.versions = versions
         self.index = 'persons'
         self.log = logging.getLogger('main')
 
@@ -100,18 +111,31 @@ class PersonService:
 
     @backoff.on_exception(backoff.expo, ConnectionError, max_tries=settings.MAX_TRIES)
     async def _person_from_cache(self, person_id: str) -> Person | None:
-        data = await self.redis.get(f"person:{person_id}")
+        key = f"{await self._key_prefix()}:{person_id}"
+
+        if self.local is not None:
+            person = self.local.get(key)
+            if person is not None:
+                return person
+
+        data = await self.redis.get(key)
         if not data:
+            redis_stats.misses += 1
             self.log.info(f"redis: 0")
             return None
 
+        redis_stats.hits += 1
         person = Person.parse_raw(data)
         self.log.info(f"redis: {len(data)}")
+
+        if self.local is not None:
+            self.local.set(key, person, size=len(data), tag="person")
+
         return person
 
     @backoff.on_exception(backoff.expo, RedisConError, max_tries=settings.MAX_TRIES)
     async def _all_persons_from_cache(self):
-        keys = await self.redis.keys('person:*')
+        keys = await self.redis.keys(f"{await self._key_prefix()}:*")
         self.log.info(f'redis keys: {len(keys)}')
 
         if not keys:
@@ -125,7 +149,7 @@ class PersonService:
 
     @backoff.on_exception(backoff.expo, RedisConError, max_tries=settings.MAX_TRIES)
     async def _all_person_from_cache_by_search(self, search_text: str):
-        keys = await self.redis.keys(f"person:*")
+        keys = await self.redis.keys(f"{await self._key_prefix()}:*")
         self.log.info(f'redis_keys: {len(keys)}')
 
         if not keys:
@@ -148,19 +172,40 @@ class PersonService:
 
     @backoff.on_exception(backoff.expo, RedisConError, max_tries=settings.MAX_TRIES)
     async def _put_person_to_cache(self, person: Person):
-        await self.redis.set(f"person:{person.id}", person.json(), FILM_CACHE_EXPIRE_IN_SECONDS)
+        await self.redis.set(
+            f"{await self._key_prefix()}:{person.id}",
+            person.json(),
+            FILM_CACHE_EXPIRE_IN_SECONDS,
+        )
         self.log.info(f'set 1 person to redis')
 
     @backoff.on_exception(backoff.expo, RedisConError, max_tries=settings.MAX_TRIES)
     async def _put_all_persons_to_cache(self, persons: list[Person]):
-        data = {f"person:{person.id}": person.json() for person in persons}
-        await self.redis.mset(data)
+        prefix = await self._key_prefix()
+        data = {f"{prefix}:{person.id}": person.json() for person in persons}
+        await self._set_many(data)
         self.log.info(f'set {len(data)} persons to redis')
 
+    async def _key_prefix(self) -> str:
+        """Префикс ключей кэша с версией индекса: старые записи не читаются."""
+        if self.versions is None:
+            return "person"
+
+        return f"person:{await self.versions.get(self.index)}"
+
+    async def _set_many(self, data: dict[str, str]) -> None:
+        # Записи старых версий не перезаписываются и должны истечь сами
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for key, value in data.items():
+                pipeline.set(key, value, ex=FILM_CACHE_EXPIRE_IN_SECONDS)
+            await pipeline.execute()
+
 
 @lru_cache()
 def get_person_service(
         redis: Redis = Depends(get_redis),
         elastic: AsyncElasticsearch = Depends(get_elastic),
+        local: LocalCache | None = Depends(get_local_cache),
+        versions: IndexVersions | None = Depends(get_index_versions),
 ) -> PersonService:
-    return PersonService(redis, elastic)
+    return PersonService(redis, elastic, local, versions)
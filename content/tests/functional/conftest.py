@@ -178,6 +178,37 @@ async def generate_es_data_for_persons_index():
     return inner
 
 
+@pytest_asyncio.fixture()
+async def generate_es_data_for_genres_index():
+    async def inner() -> list[dict]:
+        bulk_query: list[dict] = []
+
+        genres_list = await generate_genres_info()
+
+        for genre in genres_list:
+            dict_ = {
+                '_index': test_settings.genres_index_name,
+                '_id': genre['id']
+            }
+            dict_.update(genre)
+            bulk_query.append(dict_)
+
+        return bulk_query
+
+    return inner
+
+
+@pytest_asyncio.fixture()
+async def bump_index_version(redis_client):
+    async def inner(index_name: str) -> None:
+        await redis_client.incr(f'index_version:{index_name}')
+        # Как ETL: сигнал воркерам API, которые сверяют версию по подписке
+        await redis_client.publish('index_versions', index_name)
+        await asyncio.sleep(0.1)
+
+    return inner
+
+
 @pytest_asyncio.fixture()
 async def generate_redis_data():
     async def inner(key_prefix: str, items_number: int) -> dict[str, dict]:
@@ -227,12 +258,12 @@ async def redis_write_data(redis_client):
 
 @pytest_asyncio.fixture()
 async def make_get_request(aiohttp_client):
-    async def inner(url: str, params: dict = None) -> ClientResponse:
+    async def inner(url: str, params: dict = None, headers: dict = None) -> ClientResponse:
         url = test_settings.service_url + url
         response = None
 
         try:
-            response = await aiohttp_client.get(url, params=params)
+            response = await aiohttp_client.get(url, params=params, headers=headers)
             status = response.status
             if status == HTTPNotFound.status_code:
                 print(f'Status: {status} Not Found')
@@ -10,6 +10,7 @@ class TestSettings(BaseSettings):
     es_port: int
     movies_index_name: str
     persons_index_name: str
+    genres_index_name: str = 'genres'
 
     redis_host: str
     redis_port: str
@@ -0,0 +1,11 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_cache_stats_requires_token(make_get_request):
+    for headers in (None, {'Authorization': 'Bearer invalid'}):
+        resp = await make_get_request('/api/v1/cache/stats', headers=headers)
+
+        assert resp.status == HTTPStatus.UNAUTHORIZED
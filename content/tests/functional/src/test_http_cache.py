@@ -0,0 +1,74 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.functional.settings import test_settings
+
+
+@pytest.mark.asyncio
+async def test_film_not_modified(generate_es_data_for_movies_index, es_write_data, make_get_request,
+                                 del_all_redis_keys, bump_index_version):
+    films = await generate_es_data_for_movies_index(films_number=1)
+
+    await del_all_redis_keys()
+    await es_write_data(test_settings.movies_index_name, films)
+    await bump_index_version(test_settings.movies_index_name)
+
+    film_id = films[0]['id']
+
+    resp = await make_get_request(f'/api/v1/films/{film_id}')
+    etag = resp.headers.get('ETag')
+
+    assert resp.status == HTTPStatus.OK
+    assert etag is not None
+    assert 'max-age' in resp.headers.get('Cache-Control')
+
+    resp = await make_get_request(f'/api/v1/films/{film_id}', headers={'If-None-Match': etag})
+
+    assert resp.status == HTTPStatus.NOT_MODIFIED
+
+    await del_all_redis_keys()
+
+
+@pytest.mark.asyncio
+async def test_film_modified_after_version_bump(generate_es_data_for_movies_index, es_write_data,
+                                                make_get_request, del_all_redis_keys, bump_index_version):
+    films = await generate_es_data_for_movies_index(films_number=1)
+
+    await del_all_redis_keys()
+    await es_write_data(test_settings.movies_index_name, films)
+    await bump_index_version(test_settings.movies_index_name)
+
+    film_id = films[0]['id']
+
+    resp = await make_get_request(f'/api/v1/films/{film_id}')
+    etag = resp.headers.get('ETag')
+
+    await bump_index_version(test_settings.movies_index_name)
+
+    resp = await make_get_request(f'/api/v1/films/{film_id}', headers={'If-None-Match': etag})
+
+    assert resp.status == HTTPStatus.OK
+    assert resp.headers.get('ETag') != etag
+
+    await del_all_redis_keys()
+
+
+@pytest.mark.asyncio
+async def test_private_not_modified_requires_token(generate_es_data_for_movies_index, es_write_data,
+                                                   make_get_request, del_all_redis_keys,
+                                                   bump_index_version):
+    films = await generate_es_data_for_movies_index(films_number=1)
+
+    await del_all_redis_keys()
+    await es_write_data(test_settings.movies_index_name, films)
+    await bump_index_version(test_settings.movies_index_name)
+
+    # '*' совпадает с любым тегом: без проверки токена ответ был бы 304
+    for headers in ({'If-None-Match': '*'},
+                    {'If-None-Match': '*', 'Authorization': 'Bearer invalid'}):
+        resp = await make_get_request('/api/v2/films', headers=headers)
+
+        assert resp.status == HTTPStatus.UNAUTHORIZED
+
+    await del_all_redis_keys()
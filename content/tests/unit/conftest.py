@@ -0,0 +1,6 @@
+import os
+
+# Настройки API читаются при импорте модулей: Redis и Elasticsearch
+# юнит-тестам не нужны, но без адресов настройки не создаются
+os.environ.setdefault('REDIS_HOST', 'localhost')
+os.environ.setdefault('ELASTIC_HOST', 'localhost')
@@ -0,0 +1,143 @@
+from types import SimpleNamespace
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConError
+
+from fastapi_solution.src.repository import index_versions
+from fastapi_solution.src.repository.index_versions import IndexVersions
+from fastapi_solution.src.repository.local_cache import LocalCache
+from fastapi_solution.src.repository.redis import RedisRepository
+
+
+class FakeRedis:
+    """Версии индексов и ключи кэша в словаре, считает чтения версий."""
+
+    def __init__(self, **versions: int) -> None:
+        self.data = {
+            f'index_version:{index}': str(version).encode()
+            for index, version in versions.items()
+        }
+        self.mget_calls = 0
+        self.fail = False
+        self.on_mget = None
+
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        self.mget_calls += 1
+        if self.fail:
+            raise RedisConError('redis is down')
+        values = [self.data.get(key) for key in keys]
+        if self.on_mget is not None:
+            self.on_mget()
+        return values
+
+    async def get(self, key: str) -> bytes | None:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: bytes, ex: int | None = None) -> None:
+        self.data[key] = value
+
+    def bump(self, index: str) -> None:
+        key = f'index_version:{index}'
+        self.data[key] = str(int(self.data.get(key, b'0')) + 1).encode()
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(index_versions, 'time', SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+@pytest.mark.asyncio
+async def test_versions_are_read_once_per_interval(clock):
+    redis = FakeRedis(movies=3, persons=1)
+    versions = IndexVersions(redis, check_interval=30)
+
+    assert await versions.get_many(('movies', 'persons', 'genres')) == ['3', '1', None]
+    assert await versions.get('genres') == '0'
+
+    redis.bump('movies')
+    clock.now += 29
+    assert await versions.get('movies') == '3'
+    assert redis.mget_calls == 1
+
+    clock.now += 1
+    assert await versions.get('movies') == '4'
+    assert redis.mget_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_signal_rereads_versions(clock):
+    redis = FakeRedis(movies=3)
+    versions = IndexVersions(redis, check_interval=30)
+    await versions.get('movies')
+
+    redis.bump('movies')
+    versions.mark_stale()
+
+    assert await versions.get('movies') == '4'
+
+
+@pytest.mark.asyncio
+async def test_signal_during_read_is_not_lost(clock):
+    redis = FakeRedis(movies=3)
+    versions = IndexVersions(redis, check_interval=30)
+
+    # ETL обновил индекс, пока MGET читал старую версию
+    def bump_during_read():
+        redis.on_mget = None
+        redis.bump('movies')
+        versions.mark_stale()
+
+    redis.on_mget = bump_during_read
+    assert await versions.get('movies') == '3'
+    assert await versions.get('movies') == '4'
+
+
+@pytest.mark.asyncio
+async def test_redis_error_keeps_last_versions(clock):
+    redis = FakeRedis(movies=3)
+    versions = IndexVersions(redis, check_interval=30)
+
+    redis.fail = True
+    with pytest.raises(RedisConError):
+        await versions.get('movies')
+
+    redis.fail = False
+    await versions.get('movies')
+
+    redis.fail = True
+    clock.now += 30
+    assert await versions.get('movies') == '3'
+
+
+@pytest.mark.asyncio
+async def test_cache_keys_change_with_index_version(clock):
+    redis = FakeRedis(movies=3)
+    versions = IndexVersions(redis, check_interval=30)
+    cache = RedisRepository(redis, ttl=300, versions=versions)
+
+    await cache.add(slug='film/get', value='old film', key='1')
+    assert await cache.get(slug='film/get', key='1') == 'old film'
+
+    # Ответ, закэшированный до обновления индекса, больше не читается
+    redis.bump('movies')
+    versions.mark_stale()
+    assert await cache.get(slug='film/get', key='1') is None
+
+
+@pytest.mark.asyncio
+async def test_local_tier_does_not_refill_from_old_redis_entries(clock):
+    redis = FakeRedis(movies=3)
+    versions = IndexVersions(redis, check_interval=30)
+    local = LocalCache(max_items=10, max_bytes=1000, ttl=30)
+    cache = RedisRepository(redis, ttl=300, local=local, versions=versions)
+    await cache.add(slug='film/get', value='old film', key='1')
+
+    # Сигнал сбрасывает локальный уровень, запись в Redis остаётся
+    redis.bump('movies')
+    versions.mark_stale()
+    local.invalidate('film')
+
+    assert await cache.get(slug='film/get', key='1') is None
+    assert local.info()['items'] == 0
@@ -0,0 +1,113 @@
+from types import SimpleNamespace
+
+import pytest
+
+from fastapi_solution.src.repository import local_cache
+from fastapi_solution.src.repository.local_cache import LocalCache
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(local_cache, 'time', SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def make_cache(max_items: int = 10, max_bytes: int = 1000, ttl: float = 30) -> LocalCache:
+    return LocalCache(max_items=max_items, max_bytes=max_bytes, ttl=ttl)
+
+
+def test_get_counts_hits_and_misses(clock):
+    cache = make_cache()
+    cache.set('film:1', 'value', size=10, tag='film')
+
+    assert cache.get('film:1') == 'value'
+    assert cache.get('film:2') is None
+    assert cache.info() == {'hits': 1, 'misses': 1, 'evictions': 0, 'items': 1, 'bytes': 10}
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = make_cache(ttl=30)
+    cache.set('film:1', 'value', size=10, tag='film')
+
+    clock.now += 30
+    assert cache.get('film:1') == 'value'
+
+    clock.now += 1
+    assert cache.get('film:1') is None
+    # Просроченная запись удаляется и не занимает место
+    assert cache.info()['items'] == 0
+    assert cache.info()['bytes'] == 0
+    assert cache.stats.misses == 1
+
+
+def test_item_limit_evicts_least_recently_used(clock):
+    cache = make_cache(max_items=2)
+    cache.set('film:1', 1, size=1, tag='film')
+    cache.set('film:2', 2, size=1, tag='film')
+
+    cache.get('film:1')
+    cache.set('film:3', 3, size=1, tag='film')
+
+    assert cache.get('film:2') is None
+    assert cache.get('film:1') == 1
+    assert cache.get('film:3') == 3
+    assert cache.stats.evictions == 1
+
+
+def test_byte_limit_evicts_until_fits(clock):
+    cache = make_cache(max_bytes=100)
+    cache.set('film:1', 1, size=40, tag='film')
+    cache.set('film:2', 2, size=40, tag='film')
+    cache.set('film:3', 3, size=50, tag='film')
+
+    assert cache.get('film:1') is None
+    assert cache.get('film:2') == 2
+    assert cache.info()['bytes'] == 90
+    assert cache.stats.evictions == 1
+
+
+def test_oversized_value_is_not_cached(clock):
+    cache = make_cache(max_bytes=100)
+    cache.set('film:1', 1, size=10, tag='film')
+    cache.set('film:2', 2, size=101, tag='film')
+
+    assert cache.get('film:2') is None
+    assert cache.get('film:1') == 1
+    assert cache.stats.evictions == 0
+
+
+def test_overwrite_replaces_size(clock):
+    cache = make_cache()
+    cache.set('film:1', 1, size=10, tag='film')
+    cache.set('film:1', 2, size=30, tag='film')
+
+    assert cache.get('film:1') == 2
+    assert cache.info()['items'] == 1
+    assert cache.info()['bytes'] == 30
+
+
+def test_invalidate_drops_only_tag(clock):
+    cache = make_cache()
+    cache.set('film:1', 1, size=10, tag='film')
+    cache.set('film:2', 2, size=10, tag='film')
+    cache.set('person:1', 3, size=5, tag='person')
+
+    cache.invalidate('film')
+
+    assert cache.get('film:1') is None
+    assert cache.get('film:2') is None
+    assert cache.get('person:1') == 3
+    assert cache.info()['bytes'] == 5
+    # Сброс по метке - не вытеснение
+    assert cache.stats.evictions == 0
+
+
+def test_clear_keeps_counters(clock):
+    cache = make_cache()
+    cache.set('film:1', 1, size=10, tag='film')
+    cache.get('film:1')
+
+    cache.clear()
+
+    assert cache.info() == {'hits': 1, 'misses': 0, 'evictions': 0, 'items': 0, 'bytes': 0}